@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Throughput / loss / duplication benchmark for tracing_hook.py.
+
+Simulates a long session: for each turn it appends a user prompt, assistant
+tool calls, tool results and a final answer to a synthetic transcript, then
+runs the Stop hook exactly as Claude Code would (a fresh process with the
+hook payload on stdin). Uploads go to fake_trace_server.py running in-process,
+optionally failing a share of batches.
+
+After the run it waits for the spool to drain and checks the server against
+the span ids the transcript should produce:
+
+    python3 bench_tracing_hook.py --turns 500 --fail-rate 0.2
+
+Reports hook latency (p50/p99, first vs last 10% of turns, to show it does
+not grow with the transcript), drain time, lost span ids and duplicate ids.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime, timedelta, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+HOOK = os.path.join(HERE, "tracing_hook.py")
+sys.path.insert(0, HERE)
+
+import fake_trace_server  # noqa: E402
+
+
+def load_hook():
+    spec = importlib.util.spec_from_file_location("tracing_hook", HOOK)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def turn_lines(session_id, turn, tools, padding, clock):
+    def stamp():
+        clock[0] += timedelta(milliseconds=250)
+        return clock[0].isoformat().replace("+00:00", "Z")
+
+    def line(kind, message):
+        return {"type": kind, "uuid": str(uuid.uuid4()), "sessionId": session_id,
+                "timestamp": stamp(), "message": message}
+
+    usage = {"input_tokens": 10, "output_tokens": 50, "cache_read_input_tokens": 20000}
+    lines = [line("user", {"role": "user", "content": "Task %d: do the thing" % turn})]
+    for index in range(tools):
+        message_id = "msg_%d_%d" % (turn, index)
+        tool_id = "toolu_%d_%d" % (turn, index)
+        lines.append(line("assistant", {"id": message_id, "role": "assistant", "model": "claude-bench",
+                                        "usage": usage, "content": [{"type": "text", "text": "Running step %d" % index}]}))
+        lines.append(line("assistant", {"id": message_id, "role": "assistant", "model": "claude-bench",
+                                        "usage": usage, "content": [{"type": "tool_use", "id": tool_id,
+                                                                     "name": "Bash", "input": {"command": "ls"}}]}))
+        lines.append(line("user", {"role": "user", "content": [{"type": "tool_result", "tool_use_id": tool_id,
+                                                               "content": "x" * padding}]}))
+    lines.append(line("assistant", {"id": "msg_%d_final" % turn, "role": "assistant", "model": "claude-bench",
+                                    "usage": usage, "content": [{"type": "text", "text": "Done with %d" % turn}]}))
+    return lines
+
+
+def get_stats(port):
+    with urllib.request.urlopen("http://127.0.0.1:%d/stats" % port) as response:
+        return json.load(response)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--tools", type=int, default=3, help="tool calls per turn")
+    parser.add_argument("--padding", type=int, default=4000, help="bytes per tool result")
+    parser.add_argument("--backend", choices=("langfuse", "langsmith", "both"), default="both")
+    parser.add_argument("--fail-rate", type=float, default=0.1)
+    parser.add_argument("--latency-ms", type=int, default=20)
+    parser.add_argument("--drain-timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    server = fake_trace_server.serve(0, args.fail_rate, args.latency_ms)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    workdir = tempfile.mkdtemp(prefix="tracing-bench-")
+    transcript = os.path.join(workdir, "session.jsonl")
+    session_id = "bench-session"
+    env = dict(
+        os.environ,
+        CC_TRACING_STATE_DIR=os.path.join(workdir, "state"),
+        CC_TRACING_LINGER="0.5",
+        CC_TRACING_MAX_ATTEMPTS="8",
+        TRACE_TO_LANGFUSE="true" if args.backend in ("langfuse", "both") else "false",
+        TRACE_TO_LANGSMITH="true" if args.backend in ("langsmith", "both") else "false",
+        LANGFUSE_HOST="http://127.0.0.1:%d" % port,
+        CC_LANGSMITH_ENDPOINT="http://127.0.0.1:%d" % port,
+    )
+    payload = json.dumps({"session_id": session_id, "transcript_path": transcript}).encode()
+
+    clock = [datetime(2026, 1, 1, tzinfo=timezone.utc)]
+    all_lines = []
+    latencies = []
+    for turn in range(args.turns):
+        lines = turn_lines(session_id, turn, args.tools, args.padding, clock)
+        all_lines.extend(lines)
+        with open(transcript, "a") as handle:
+            handle.write("".join(json.dumps(line) + "\n" for line in lines))
+        started = time.perf_counter()
+        subprocess.run([sys.executable, HOOK], input=payload, env=env, check=True)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    drain_started = time.perf_counter()
+    state_dir = env["CC_TRACING_STATE_DIR"]
+    while time.perf_counter() - drain_started < args.drain_timeout:
+        leftover = [name for root, _, files in os.walk(os.path.join(state_dir, "spool"))
+                    for name in files if os.path.getsize(os.path.join(root, name)) > 0]
+        if not leftover:
+            break
+        # Batches a worker gave up on wait for the next hook; flush them here.
+        subprocess.run([sys.executable, HOOK, "--flush"], env=env, check=True)
+        time.sleep(0.2)
+    drain_ms = (time.perf_counter() - drain_started) * 1000
+    time.sleep(0.5)
+
+    hook = load_hook()
+    expected = set()
+    for span in hook.build_spans(all_lines, {}, session_id):
+        for backend in ("langfuse", "langsmith"):
+            if env["TRACE_TO_" + backend.upper()] == "true":
+                expected.add("%s:%s" % (backend, span["id"]))
+
+    stats = get_stats(port)
+    received = set(stats["ids"])
+    tenth = max(1, len(latencies) // 10)
+
+    print("transcript: %d turns, %.1f MB" % (args.turns, os.path.getsize(transcript) / 1e6))
+    print("hook latency ms: p50 %.1f  p99 %.1f  max %.1f" % (
+        percentile(latencies, 50), percentile(latencies, 99), max(latencies)))
+    print("hook latency p50 first 10%%: %.1f ms, last 10%%: %.1f ms" % (
+        percentile(latencies[:tenth], 50), percentile(latencies[-tenth:], 50)))
+    print("drain after last turn: %.0f ms" % drain_ms)
+    print("server: %d accepted requests, %d injected failures, %d root patches" % (
+        stats["requests"], stats["rejected"], stats["patches"]))
+    print("spans: expected %d, received %d unique (%d total)" % (len(expected), len(received), stats["items"]))
+    print("lost: %d  unexpected: %d  duplicate ids: %d" % (
+        len(expected - received), len(received - expected), stats["duplicate_ids"]))
+
+    server.shutdown()
+    return 1 if expected - received else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Langfuse ingestion and LangSmith batch APIs.
+
+Records every span id it receives so uploads can be checked for loss and
+duplication without a real account:
+
+    python3 fake_trace_server.py --port 8787 --fail-rate 0.2 --latency-ms 50
+
+    LANGFUSE_HOST=http://127.0.0.1:8787 CC_LANGSMITH_ENDPOINT=http://127.0.0.1:8787 ...
+
+Endpoints:
+
+- ``POST /api/public/ingestion``  Langfuse batch (``{"batch": [events]}``)
+- ``POST /runs/batch``            LangSmith batch (``{"post": [...], "patch": [...]}``)
+- ``GET  /stats``                 counters and duplicate ids as JSON
+- ``POST /reset``                 clear all counters
+
+``--fail-rate`` answers that share of batches with HTTP 503 (before recording
+anything) to exercise the uploader's retry path.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class Store:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.rejected = 0
+        self.received = {}
+        self.patches = 0
+
+    def record(self, backend, ids, patches=0):
+        with self.lock:
+            self.requests += 1
+            self.patches += patches
+            for item_id in ids:
+                key = "%s:%s" % (backend, item_id)
+                self.received[key] = self.received.get(key, 0) + 1
+
+    def stats(self):
+        with self.lock:
+            duplicates = {key: count for key, count in self.received.items() if count > 1}
+            return {
+                "requests": self.requests,
+                "rejected": self.rejected,
+                "items": sum(self.received.values()),
+                "unique": len(self.received),
+                "patches": self.patches,
+                "duplicate_ids": len(duplicates),
+                "duplicates": dict(list(duplicates.items())[:20]),
+                "ids": sorted(self.received),
+            }
+
+
+class Handler(BaseHTTPRequestHandler):
+    store = None
+    fail_rate = 0.0
+    latency = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self.reply(200, self.store.stats())
+        else:
+            self.reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path == "/reset":
+            with self.store.lock:
+                self.store.reset()
+            self.reply(200, {})
+            return
+
+        if self.latency:
+            time.sleep(self.latency)
+        if random.random() < self.fail_rate:
+            with self.store.lock:
+                self.store.rejected += 1
+            self.reply(503, {"error": "injected failure"})
+            return
+
+        if self.path == "/api/public/ingestion":
+            # Trace events are upserts (one per hook run for a long turn);
+            # count the trace id, not the event id.
+            ids = []
+            for event in body.get("batch", []):
+                if event["type"] == "trace-create":
+                    continue
+                ids.append(event["body"]["id"])
+            traces = {event["body"]["id"] for event in body.get("batch", []) if event["type"] == "trace-create"}
+            self.store.record("langfuse", ids + sorted(traces))
+            self.reply(207, {"successes": [{"id": event["id"], "status": 201} for event in body.get("batch", [])], "errors": []})
+        elif self.path == "/runs/batch":
+            self.store.record("langsmith", [run["id"] for run in body.get("post", [])], len(body.get("patch", [])))
+            self.reply(202, {})
+        else:
+            self.reply(404, {"error": "not found"})
+
+
+def serve(port, fail_rate=0.0, latency_ms=0):
+    Handler.store = Store()
+    Handler.fail_rate = fail_rate
+    Handler.latency = latency_ms / 1000.0
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Langfuse/LangSmith ingestion server.")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    args = parser.parse_args()
+    server = serve(args.port, args.fail_rate, args.latency_ms)
+    print("listening on http://127.0.0.1:%d" % server.server_address[1], flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
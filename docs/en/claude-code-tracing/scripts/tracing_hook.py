@@ -0,0 +1,645 @@
+#!/usr/bin/env python3
+"""Incremental Claude Code Stop hook that spools spans and uploads them in batches.
+
+The Stop hook runs after every assistant response. Instead of re-reading the
+whole transcript and uploading inline, this hook:
+
+1. Keeps a byte offset and inode per transcript (``offsets.json``) and only
+   parses lines appended since the last run. A rotated or truncated
+   transcript (new inode or smaller size) is read from the start again.
+   Entries for transcripts that were deleted or not modified for
+   ``CC_TRACING_OFFSET_TTL_DAYS`` (default 7) are pruned.
+2. Turns the new lines into backend-neutral spans (turn -> llm / tool) with
+   deterministic ids, so a re-read or a retried upload never creates new
+   objects on the backend.
+3. Appends the spans to an on-disk spool per enabled backend and starts a
+   detached flush worker if one is not already running, then returns.
+
+The flush worker (``--flush``) rotates the spool into batch files, uploads
+them in bulk with retry and exponential backoff, and deletes a batch only
+after the backend accepted it. Batches that keep failing stay on disk for the
+next worker, so spans are not lost when the backend is down. A 4xx response
+(bad credentials, wrong host) also keeps the batch, without retrying in the
+same worker; only a 400 or 422, which resending cannot fix, drops it.
+
+Backends (enabled through the same env vars as the SDK-based hooks):
+
+- Langfuse: ``TRACE_TO_LANGFUSE=true``, ``LANGFUSE_PUBLIC_KEY``,
+  ``LANGFUSE_SECRET_KEY``, ``LANGFUSE_HOST``; posts to ``/api/public/ingestion``.
+- LangSmith: ``TRACE_TO_LANGSMITH=true``, ``CC_LANGSMITH_API_KEY``,
+  ``CC_LANGSMITH_PROJECT``, ``CC_LANGSMITH_ENDPOINT``; posts to ``/runs/batch``.
+
+Only the standard library is used, so the hook starts in tens of milliseconds.
+
+Usage (``~/.claude/settings.json``)::
+
+    {"hooks": {"Stop": [{"hooks": [{"type": "command",
+        "command": "python3 ~/.claude/hooks/tracing_hook.py"}]}]}}
+
+    python3 tracing_hook.py --status   # spool depth and tracked transcripts
+"""
+
+import argparse
+import base64
+import fcntl
+import glob
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+STATE_DIR = os.path.expanduser(os.environ.get("CC_TRACING_STATE_DIR", "~/.claude/state/tracing"))
+PROJECTS_DIR = os.path.expanduser("~/.claude/projects")
+DEBUG = os.environ.get("CC_TRACING_DEBUG", "").lower() == "true"
+
+BATCH_SIZE = int(os.environ.get("CC_TRACING_BATCH_SIZE", "200"))
+MAX_ATTEMPTS = int(os.environ.get("CC_TRACING_MAX_ATTEMPTS", "5"))
+# The worker waits this long for more spans before exiting, so back-to-back
+# turns share one worker process.
+LINGER_SECONDS = float(os.environ.get("CC_TRACING_LINGER", "2"))
+TIMEOUT_SECONDS = 10
+OFFSET_TTL_DAYS = float(os.environ.get("CC_TRACING_OFFSET_TTL_DAYS", "7"))
+# Malformed payloads: resending them cannot succeed.
+DROP_STATUSES = (400, 422)
+MAX_TEXT = 20000
+
+ID_NAMESPACE = uuid.UUID("6f1c7c1e-5b0e-4d55-9a55-2b8a1c3c9e10")
+
+
+# --- state -------------------------------------------------------------------
+
+
+def log(message):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    with open(os.path.join(STATE_DIR, "hook.log"), "a") as handle:
+        handle.write("%s [%d] %s\n" % (datetime.now().isoformat(timespec="seconds"), os.getpid(), message))
+
+
+def debug(message):
+    if DEBUG:
+        log(message)
+
+
+@contextmanager
+def locked(name, blocking=True):
+    """Exclusive flock on STATE_DIR/<name>; yields False if non-blocking and busy."""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    handle = open(os.path.join(STATE_DIR, name), "a")
+    try:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        yield True
+    finally:
+        handle.close()
+
+
+def read_json(path, default):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json(path, data):
+    tmp = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp, "w") as handle:
+        json.dump(data, handle)
+    os.replace(tmp, path)
+
+
+def enabled_backends():
+    backends = []
+    if os.environ.get("TRACE_TO_LANGFUSE", "").lower() == "true":
+        backends.append("langfuse")
+    if os.environ.get("TRACE_TO_LANGSMITH", "").lower() == "true":
+        backends.append("langsmith")
+    return backends
+
+
+def spool_dir(backend):
+    return os.path.join(STATE_DIR, "spool", backend)
+
+
+# --- incremental transcript reader -------------------------------------------
+
+
+def read_new_lines(path, entry):
+    """Return (lines, entry) for complete lines appended since entry["offset"].
+
+    A trailing partial line is left for the next run. The offset is reset when
+    the inode changes or the file shrank (rotation / truncation).
+    """
+    stat = os.stat(path)
+    offset = entry.get("offset", 0)
+    if entry.get("inode") != stat.st_ino or stat.st_size < offset:
+        entry = {"inode": stat.st_ino, "offset": 0}
+        offset = 0
+    if stat.st_size == offset:
+        return [], entry
+
+    with open(path, "rb") as handle:
+        handle.seek(offset)
+        data = handle.read(stat.st_size - offset)
+    end = data.rfind(b"\n")
+    if end < 0:
+        return [], entry
+
+    entry = dict(entry, inode=stat.st_ino, offset=offset + end + 1)
+    lines = []
+    for raw in data[: end + 1].splitlines():
+        try:
+            lines.append(json.loads(raw))
+        except ValueError:
+            continue
+    return lines, entry
+
+
+def prune_offsets(offsets, keep):
+    """Drop entries whose transcript is gone or untouched for OFFSET_TTL_DAYS."""
+    cutoff = time.time() - OFFSET_TTL_DAYS * 86400
+    for path in list(offsets):
+        if path == keep:
+            continue
+        try:
+            if os.path.getmtime(path) >= cutoff:
+                continue
+        except OSError:
+            pass
+        del offsets[path]
+
+
+def latest_transcript():
+    files = glob.glob(os.path.join(PROJECTS_DIR, "*", "*.jsonl"))
+    return max(files, key=os.path.getmtime) if files else None
+
+
+# --- spans -------------------------------------------------------------------
+
+
+def span_id(*parts):
+    return str(uuid.uuid5(ID_NAMESPACE, ":".join(str(part) for part in parts)))
+
+
+def clip(value):
+    if isinstance(value, str) and len(value) > MAX_TEXT:
+        return value[:MAX_TEXT] + "...[truncated]"
+    return value
+
+
+def text_of(content):
+    if isinstance(content, str):
+        return content
+    parts = [block.get("text", "") for block in content or [] if block.get("type") == "text"]
+    return "\n".join(part for part in parts if part)
+
+
+def is_prompt(line):
+    """A user line that starts a new turn (not a tool result or meta message)."""
+    if line.get("type") != "user" or line.get("isMeta"):
+        return False
+    content = (line.get("message") or {}).get("content")
+    if isinstance(content, str):
+        return True
+    return any(block.get("type") == "text" for block in content or [])
+
+
+def dotted(timestamp, run_id):
+    stamp = timestamp.replace("-", "").replace(":", "").replace("Z", "").replace("+0000", "")
+    date, _, rest = stamp.partition("T")
+    seconds, _, fraction = rest.partition(".")
+    return "%sT%s%sZ%s" % (date, seconds, (fraction + "000000")[:6], run_id)
+
+
+def build_spans(lines, entry, session_id):
+    """Convert transcript lines into spans; turn/tool context persists in entry.
+
+    Each turn's root span is emitted ahead of its children. A turn that began
+    in an earlier run is re-emitted with ``update: True`` so backends patch
+    its output and end time instead of creating it again.
+    """
+    spans = []
+    turn = entry.get("turn")
+    if turn is not None:
+        turn.update(touched=False, update=True, index=0)
+    pending = entry.get("pending_tools", {})
+    llm = {}
+
+    def emit_root():
+        if turn is None or not turn["touched"]:
+            return
+        spans.insert(turn["index"], {
+            "id": turn["id"],
+            "trace_id": turn["id"],
+            "parent_id": None,
+            "kind": "turn",
+            "name": "Claude Code turn",
+            "session_id": session_id,
+            "start_time": turn["start_time"],
+            "end_time": turn["end_time"],
+            "dotted_order": turn["dotted_order"],
+            "input": turn["input"],
+            "output": turn["output"],
+            "update": turn["update"],
+        })
+
+    def child(kind, key, name, start, end, **fields):
+        run_id = span_id(session_id, kind, key)
+        span = {
+            "id": run_id,
+            "trace_id": turn["id"],
+            "parent_id": turn["id"],
+            "kind": kind,
+            "name": name,
+            "session_id": session_id,
+            "start_time": start,
+            "end_time": end,
+            "dotted_order": turn["dotted_order"] + "." + dotted(start, run_id),
+        }
+        span.update(fields)
+        return span
+
+    for line in lines:
+        timestamp = line.get("timestamp") or datetime.now(timezone.utc).isoformat()
+        message = line.get("message") or {}
+
+        if is_prompt(line):
+            emit_root()
+            turn_id = span_id(session_id, "turn", line.get("uuid"))
+            turn = {
+                "id": turn_id,
+                "start_time": timestamp,
+                "dotted_order": dotted(timestamp, turn_id),
+                "input": clip(text_of(message.get("content"))),
+                "output": "",
+                "end_time": timestamp,
+                "touched": True,
+                "update": False,
+                "index": len(spans),
+            }
+            pending = {}
+            llm = {}
+            continue
+        if turn is None:
+            continue
+
+        if line.get("type") == "assistant":
+            key = message.get("id") or line.get("uuid")
+            current = llm.get(key)
+            if current is None:
+                current = child(
+                    "llm", key, message.get("model", "claude"), timestamp, timestamp,
+                    input=None, output="", model=message.get("model", ""),
+                    usage=message.get("usage") or {},
+                )
+                llm[key] = current
+                spans.append(current)
+            current["end_time"] = timestamp
+            for block in message.get("content") or []:
+                if block.get("type") == "text":
+                    current["output"] = clip((current["output"] + "\n" + block.get("text", "")).strip())
+                    turn["output"] = current["output"]
+                elif block.get("type") == "tool_use":
+                    pending[block.get("id")] = {
+                        "name": block.get("name", "tool"),
+                        "input": block.get("input"),
+                        "start_time": timestamp,
+                    }
+            turn["end_time"] = timestamp
+            turn["touched"] = True
+        elif line.get("type") == "user":
+            for block in message.get("content") or []:
+                if block.get("type") != "tool_result":
+                    continue
+                use = pending.pop(block.get("tool_use_id"), None)
+                if use is None:
+                    continue
+                output = block.get("content")
+                spans.append(child(
+                    "tool", block.get("tool_use_id"), use["name"], use["start_time"], timestamp,
+                    input=use["input"], output=clip(text_of(output) if isinstance(output, list) else output),
+                    is_error=bool(block.get("is_error")),
+                ))
+                turn["end_time"] = timestamp
+                turn["touched"] = True
+
+    emit_root()
+    entry["turn"] = turn
+    entry["pending_tools"] = pending
+    return spans
+
+
+def spool(spans, backends):
+    payload = "".join(json.dumps(span) + "\n" for span in spans)
+    with locked("spool.lock"):
+        for backend in backends:
+            os.makedirs(spool_dir(backend), exist_ok=True)
+            with open(os.path.join(spool_dir(backend), "spool.jsonl"), "a") as handle:
+                handle.write(payload)
+
+
+def start_worker():
+    import subprocess
+
+    with locked("flush.lock", blocking=False) as acquired:
+        if not acquired:
+            return
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--flush"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def run_hook(payload):
+    backends = enabled_backends()
+    if not backends:
+        return
+
+    path = payload.get("transcript_path") or latest_transcript()
+    if not path or not os.path.exists(path):
+        debug("no transcript found")
+        return
+    path = os.path.realpath(path)
+
+    offsets_path = os.path.join(STATE_DIR, "offsets.json")
+    with locked("offsets.lock"):
+        offsets = read_json(offsets_path, {})
+        prune_offsets(offsets, path)
+        lines, entry = read_new_lines(path, offsets.get(path, {}))
+        if not lines:
+            offsets[path] = entry
+            write_json(offsets_path, offsets)
+            return
+        session_id = payload.get("session_id") or lines[-1].get("sessionId") or os.path.basename(path)[:-6]
+        spans = build_spans(lines, entry, session_id)
+        if spans:
+            spool(spans, backends)
+        offsets[path] = entry
+        write_json(offsets_path, offsets)
+
+    debug("read %d lines, spooled %d spans from %s" % (len(lines), len(spans), path))
+    if spans:
+        start_worker()
+
+
+# --- exporters ---------------------------------------------------------------
+
+
+class RetryableError(Exception):
+    pass
+
+
+class HoldError(Exception):
+    """Rejected for a reason retrying right away will not fix (auth, config)."""
+
+
+def post_json(url, body, headers):
+    # Imported here: urllib.request costs ~30 ms and the hook itself never uploads.
+    import urllib.error
+    import urllib.request
+
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode(),
+        headers=dict(headers, **{"Content-Type": "application/json"}),
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=TIMEOUT_SECONDS) as response:
+            return response.status
+    except urllib.error.HTTPError as error:
+        if error.code == 429 or error.code >= 500:
+            raise RetryableError("HTTP %d from %s" % (error.code, url))
+        if error.code == 409:
+            # Already ingested by an earlier attempt; ids are deterministic.
+            return error.code
+        detail = error.read()[:500]
+        if error.code not in DROP_STATUSES:
+            raise HoldError("HTTP %d from %s: %s" % (error.code, url, detail))
+        log("dropping batch: HTTP %d from %s: %s" % (error.code, url, detail))
+        return error.code
+    except (urllib.error.URLError, OSError) as error:
+        raise RetryableError("%s: %s" % (url, error))
+
+
+def langfuse_events(spans):
+    events = []
+    for span in spans:
+        if span["kind"] == "turn":
+            events.append({
+                "id": span_id(span["id"], "trace-event", span["end_time"]),
+                "type": "trace-create",
+                "timestamp": span["start_time"],
+                "body": {
+                    "id": span["id"],
+                    "name": span["name"],
+                    "sessionId": span["session_id"],
+                    "timestamp": span["start_time"],
+                    "input": span["input"],
+                    "output": span["output"],
+                    "tags": ["claude-code"],
+                },
+            })
+            continue
+        body = {
+            "id": span["id"],
+            "traceId": span["trace_id"],
+            "name": span["name"],
+            "startTime": span["start_time"],
+            "endTime": span["end_time"],
+            "input": span.get("input"),
+            "output": span.get("output"),
+        }
+        kind = "span-create"
+        if span["kind"] == "llm":
+            kind = "generation-create"
+            usage = span.get("usage") or {}
+            body["model"] = span.get("model")
+            body["usageDetails"] = {
+                key: value for key, value in usage.items() if isinstance(value, int)
+            }
+        elif span.get("is_error"):
+            body["level"] = "ERROR"
+        events.append({
+            "id": span_id(span["id"], "event"),
+            "type": kind,
+            "timestamp": span["start_time"],
+            "body": body,
+        })
+    return events
+
+
+def send_langfuse(spans):
+    host = os.environ.get("LANGFUSE_HOST", "https://cloud.langfuse.com").rstrip("/")
+    token = "%s:%s" % (os.environ.get("LANGFUSE_PUBLIC_KEY", ""), os.environ.get("LANGFUSE_SECRET_KEY", ""))
+    headers = {"Authorization": "Basic " + base64.b64encode(token.encode()).decode()}
+    post_json(host + "/api/public/ingestion", {"batch": langfuse_events(spans)}, headers)
+
+
+def send_langsmith(spans):
+    endpoint = os.environ.get("CC_LANGSMITH_ENDPOINT", "https://api.smith.langchain.com").rstrip("/")
+    project = os.environ.get("CC_LANGSMITH_PROJECT", "claude-code")
+    runs = []
+    patches = []
+    for span in spans:
+        if span.get("update"):
+            patches.append({
+                "id": span["id"],
+                "trace_id": span["trace_id"],
+                "dotted_order": span["dotted_order"],
+                "end_time": span["end_time"],
+                "outputs": {"output": span.get("output")},
+            })
+            continue
+        run_type = {"turn": "chain", "llm": "llm", "tool": "tool"}[span["kind"]]
+        metadata = {"thread_id": span["session_id"]}
+        if span["kind"] == "llm":
+            metadata["usage_metadata"] = span.get("usage") or {}
+            metadata["ls_model_name"] = span.get("model")
+        runs.append({
+            "id": span["id"],
+            "trace_id": span["trace_id"],
+            "parent_run_id": span["parent_id"],
+            "dotted_order": span["dotted_order"],
+            "name": span["name"],
+            "run_type": run_type,
+            "start_time": span["start_time"],
+            "end_time": span["end_time"],
+            "inputs": {"input": span.get("input")},
+            "outputs": {"output": span.get("output")},
+            "session_name": project,
+            "extra": {"metadata": metadata},
+            "error": "tool error" if span.get("is_error") else None,
+        })
+    headers = {"x-api-key": os.environ.get("CC_LANGSMITH_API_KEY", "")}
+    post_json(endpoint + "/runs/batch", {"post": runs, "patch": patches}, headers)
+
+
+SENDERS = {"langfuse": send_langfuse, "langsmith": send_langsmith}
+
+
+# --- flush worker ------------------------------------------------------------
+
+
+def rotate_spool(backend):
+    """Move spool.jsonl aside as a batch file; returns True if it had data."""
+    source = os.path.join(spool_dir(backend), "spool.jsonl")
+    with locked("spool.lock"):
+        if not os.path.exists(source) or os.path.getsize(source) == 0:
+            return False
+        target = os.path.join(spool_dir(backend), "batch-%d-%d.jsonl" % (time.time_ns(), os.getpid()))
+        os.rename(source, target)
+    return True
+
+
+def send_batch_file(backend, path):
+    """Upload one batch file; delete it only once every chunk was accepted."""
+    with open(path) as handle:
+        spans = [json.loads(line) for line in handle if line.strip()]
+    # Send in chunks; a partially sent file is resent whole, which is safe
+    # because span ids are deterministic.
+    for start in range(0, len(spans), BATCH_SIZE):
+        chunk = spans[start:start + BATCH_SIZE]
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                SENDERS[backend](chunk)
+                break
+            except RetryableError as error:
+                if attempt == MAX_ATTEMPTS:
+                    log("giving up for now on %s (%s); will retry on next flush" % (path, error))
+                    return False
+                time.sleep(min(30, 0.5 * 2 ** (attempt - 1)) * (0.5 + random.random()))
+            except HoldError as error:
+                log("keeping %s (%s); will retry on next flush" % (path, error))
+                return False
+    os.remove(path)
+    debug("sent %d spans to %s" % (len(spans), backend))
+    return True
+
+
+def spool_pending():
+    return any(
+        os.path.exists(path) and os.path.getsize(path) > 0
+        for path in (os.path.join(spool_dir(backend), "spool.jsonl") for backend in enabled_backends())
+    )
+
+
+def drain():
+    """Upload until the spool stays empty for LINGER_SECONDS; False on failure."""
+    idle_since = time.monotonic()
+    while True:
+        progressed = False
+        for backend in enabled_backends():
+            rotate_spool(backend)
+            for path in sorted(glob.glob(os.path.join(spool_dir(backend), "batch-*.jsonl"))):
+                if not send_batch_file(backend, path):
+                    return False
+                progressed = True
+        if progressed:
+            idle_since = time.monotonic()
+        elif time.monotonic() - idle_since >= LINGER_SECONDS:
+            return True
+        else:
+            time.sleep(0.2)
+
+
+def run_worker():
+    while True:
+        with locked("flush.lock", blocking=False) as acquired:
+            if not acquired:
+                return
+            if not drain():
+                return
+        # A hook may have spooled spans after the last check while it still
+        # saw this worker holding the lock; pick them up instead of leaving
+        # them for the next turn.
+        if not spool_pending():
+            return
+
+
+def status():
+    offsets = read_json(os.path.join(STATE_DIR, "offsets.json"), {})
+    print("state dir: %s" % STATE_DIR)
+    print("tracked transcripts: %d" % len(offsets))
+    for backend in sorted(SENDERS):
+        files = glob.glob(os.path.join(spool_dir(backend), "*.jsonl"))
+        count = 0
+        for path in files:
+            with open(path) as handle:
+                count += sum(1 for _ in handle)
+        print("%s: %d spooled spans in %d files" % (backend, count, len(files)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental Claude Code tracing Stop hook.")
+    parser.add_argument("--flush", action="store_true", help="run the upload worker in the foreground")
+    parser.add_argument("--status", action="store_true", help="show spool depth and tracked transcripts")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        status()
+        return 0
+    try:
+        if args.flush:
+            run_worker()
+        else:
+            raw = sys.stdin.read() if not sys.stdin.isatty() else ""
+            run_hook(json.loads(raw) if raw.strip() else {})
+    except Exception as error:  # a hook must never break the session
+        log("error: %r" % (error,))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
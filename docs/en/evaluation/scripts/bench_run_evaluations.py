@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Throughput / resume / memoization benchmark for run_evaluations.py.
+
+Generates a JSONL dataset of arithmetic questions and runs the evaluation
+runner against fake_model_server.py (in-process, --latency-ms per call):
+
+- once per --concurrency value on a fresh checkpoint and cache; the serial
+  run (concurrency 1) only evaluates --serial-sample examples and is
+  extrapolated to the full dataset
+- an interrupted run (SIGINT part-way through) followed by a resume, checking
+  that every example ends up in the checkpoint exactly once and that the
+  server never answered the same prompt twice
+- a run with a new checkpoint but the same cache, which should make no model
+  calls at all
+
+    python3 bench_run_evaluations.py --examples 2000 --latency-ms 200 --concurrency 1 16 64 256
+
+API credentials are removed from the runner's environment, so nothing ever
+reaches a real endpoint.
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RUNNER = os.path.join(HERE, "run_evaluations.py")
+sys.path.insert(0, HERE)
+
+import fake_model_server  # noqa: E402
+
+
+def write_dataset(path, size):
+    with open(path, "w") as handle:
+        for index in range(size):
+            a, b = index, index * 7 % 1000
+            handle.write(json.dumps({"id": "q-%06d" % index, "input": "What is %d + %d?" % (a, b),
+                                     "expected": str(a + b), "metadata": {"bucket": index % 10}}) + "\n")
+
+
+def server_call(base_url, path, method="GET"):
+    request = urllib.request.Request(base_url + path, data=b"{}" if method == "POST" else None, method=method)
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def run_runner(args, env, interrupt_after=None):
+    """Run the evaluation runner; return (wall seconds, exit status, max RSS MB)."""
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, RUNNER] + args, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if interrupt_after is not None:
+        time.sleep(interrupt_after)
+        process.send_signal(signal.SIGINT)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return time.perf_counter() - started, process.returncode, usage.ru_maxrss / 1024.0
+
+
+def checkpoint_ids(path):
+    ids = []
+    with open(path) as handle:
+        for line in handle:
+            record = json.loads(line)
+            if not record["error"]:
+                ids.append(record["id"])
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--examples", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=int, default=200)
+    parser.add_argument("--jitter-ms", type=int, default=50)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64, 256])
+    parser.add_argument("--serial-sample", type=int, default=50)
+    args = parser.parse_args()
+
+    server = fake_model_server.serve(0, args.latency_ms, args.jitter_ms, args.fail_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = "http://127.0.0.1:%d" % server.server_address[1]
+    env = {key: value for key, value in os.environ.items() if not key.startswith("ANTHROPIC_")}
+
+    workdir = tempfile.mkdtemp(prefix="eval-bench-")
+    dataset = os.path.join(workdir, "dataset.jsonl")
+    write_dataset(dataset, args.examples)
+
+    def runner_args(name, concurrency, cache=None, extra=()):
+        return [dataset, "--base-url", base_url, "--model", "fake-model", "--concurrency", str(concurrency),
+                "--results", os.path.join(workdir, name + ".jsonl"),
+                "--cache", cache or os.path.join(workdir, name + ".sqlite"), "--progress-interval", "3600"] + list(extra)
+
+    print("%d examples, fake model %d+-%d ms per call, workdir %s" % (
+        args.examples, args.latency_ms, args.jitter_ms, workdir))
+    print("%11s %9s %11s %9s %9s %8s %8s %8s" % (
+        "concurrency", "wall s", "examples/s", "speedup", "requests", "peak", "RSS MB", "check"))
+    serial = None
+    walls = {}
+    for concurrency in args.concurrency:
+        server_call(base_url, "/reset", "POST")
+        name = "c%d" % concurrency
+        sample = min(args.serial_sample, args.examples) if concurrency == 1 else args.examples
+        extra = ["--limit", str(sample)] if sample < args.examples else []
+        wall, code, rss = run_runner(runner_args(name, concurrency, extra=extra), env)
+        wall = wall * args.examples / sample
+        stats = server_call(base_url, "/stats")
+        ids = checkpoint_ids(os.path.join(workdir, name + ".jsonl"))
+        ok = code == 0 and len(ids) == len(set(ids)) == sample and stats["peak_in_flight"] <= concurrency
+        serial = serial or wall
+        walls[concurrency] = wall
+        print("%11s %9.1f %11.1f %8.1fx %9d %8d %8.0f %8s" % (
+            concurrency if sample == args.examples else "%d (est)" % concurrency, wall, args.examples / wall,
+            serial / wall, stats["requests"], stats["peak_in_flight"], rss, "ok" if ok else "FAILED"))
+
+    concurrency = max(args.concurrency)
+    server_call(base_url, "/reset", "POST")
+    first, first_code, _ = run_runner(runner_args("resume", concurrency), env, interrupt_after=walls[concurrency] * 0.4)
+    done_first = len(checkpoint_ids(os.path.join(workdir, "resume.jsonl")))
+    second, second_code, _ = run_runner(runner_args("resume", concurrency), env)
+    stats = server_call(base_url, "/stats")
+    ids = checkpoint_ids(os.path.join(workdir, "resume.jsonl"))
+    ok = (first_code == 130 and second_code == 0 and len(ids) == len(set(ids)) == args.examples
+          and stats["repeated_prompts"] == 0)
+    print("\nresume at concurrency %d: interrupted after %.1fs with %d done, resumed in %.1fs; "
+          "%d results, %d repeated model calls: %s" % (
+              concurrency, first, done_first, second, len(ids), stats["repeated_prompts"], "ok" if ok else "FAILED"))
+
+    server_call(base_url, "/reset", "POST")
+    wall, code, _ = run_runner(runner_args("memo", concurrency, cache=os.path.join(workdir, "resume.sqlite")), env)
+    stats = server_call(base_url, "/stats")
+    memo_ok = code == 0 and stats["requests"] == 0 and len(checkpoint_ids(os.path.join(workdir, "memo.jsonl"))) == args.examples
+    print("memoized re-run (new checkpoint, same cache): %.1fs, %d model calls: %s" % (
+        wall, stats["requests"], "ok" if memo_ok else "FAILED"))
+    server.shutdown()
+    return 0 if ok and memo_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Anthropic Messages API.
+
+Answers ``POST /v1/messages`` after a configurable delay so evaluation runs can
+be tested and benchmarked without an API key or token costs:
+
+    python3 fake_model_server.py --port 8788 --latency-ms 200 --jitter-ms 50
+
+    python3 run_evaluations.py dataset.jsonl --base-url http://127.0.0.1:8788 ...
+
+Replies are deterministic. A prompt containing ``What is A + B?`` is answered
+with the sum; anything else is echoed back. ``--wrong-rate`` answers that share
+of prompts (picked by prompt hash, so always the same ones) off by one.
+
+Endpoints:
+
+- ``POST /v1/messages``  Messages API subset: text reply and ``usage``
+- ``GET  /stats``        request counters, peak concurrent requests, and
+                         (model, prompt) pairs answered more than once
+- ``POST /reset``        clear all counters
+
+``--fail-rate`` answers that share of requests with HTTP 529 (overloaded) to
+exercise the client's retry path.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUM = re.compile(r"What is (-?\d+) \+ (-?\d+)\?")
+
+
+class Store:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.prompts = {}
+
+    def enter(self):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def leave(self, prompt_hash=None):
+        with self.lock:
+            self.in_flight -= 1
+            if prompt_hash:
+                self.prompts[prompt_hash] = self.prompts.get(prompt_hash, 0) + 1
+
+    def stats(self):
+        with self.lock:
+            repeated = sum(1 for count in self.prompts.values() if count > 1)
+            return {
+                "requests": self.requests,
+                "rejected": self.rejected,
+                "answered": sum(self.prompts.values()),
+                "unique_prompts": len(self.prompts),
+                "repeated_prompts": repeated,
+                "peak_in_flight": self.peak_in_flight,
+            }
+
+
+def prompt_text(body):
+    """Text of the last user message (string or content blocks)."""
+    for message in reversed(body.get("messages", [])):
+        if message.get("role") != "user":
+            continue
+        content = message.get("content", "")
+        if isinstance(content, list):
+            return "\n".join(block.get("text", "") for block in content if block.get("type") == "text")
+        return content
+    return ""
+
+
+def answer(prompt, wrong_rate):
+    match = SUM.search(prompt)
+    if not match:
+        return prompt
+    value = int(match.group(1)) + int(match.group(2))
+    digest = int(hashlib.sha256(prompt.encode()).hexdigest()[:8], 16)
+    if digest / 0xFFFFFFFF < wrong_rate:
+        value += 1
+    return str(value)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; with Nagle on, every reply
+    # on a keep-alive connection waits for the client's delayed ACK.
+    disable_nagle_algorithm = True
+    store = None
+    latency = 0.0
+    jitter = 0.0
+    fail_rate = 0.0
+    wrong_rate = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self.reply(200, self.store.stats())
+        else:
+            self.reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path == "/reset":
+            with self.store.lock:
+                self.store.reset()
+            self.reply(200, {})
+            return
+        if self.path != "/v1/messages":
+            self.reply(404, {"error": "not found"})
+            return
+
+        self.store.enter()
+        prompt_hash = None
+        try:
+            delay = self.latency + random.uniform(-self.jitter, self.jitter)
+            if delay > 0:
+                time.sleep(delay)
+            if random.random() < self.fail_rate:
+                with self.store.lock:
+                    self.store.rejected += 1
+                self.reply(529, {"type": "error", "error": {"type": "overloaded_error", "message": "injected"}})
+                return
+            prompt = prompt_text(body)
+            prompt_hash = hashlib.sha256((body.get("model", "") + "\0" + prompt).encode()).hexdigest()
+            text = answer(prompt, self.wrong_rate)
+            self.reply(200, {
+                "id": "msg_fake_" + prompt_hash[:16],
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model", "fake"),
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": len(prompt.split()) + 8, "output_tokens": len(text.split()) + 1},
+            })
+        finally:
+            self.store.leave(prompt_hash)
+
+
+def serve(port, latency_ms=0, jitter_ms=0, fail_rate=0.0, wrong_rate=0.0):
+    Handler.store = Store()
+    Handler.latency = latency_ms / 1000.0
+    Handler.jitter = jitter_ms / 1000.0
+    Handler.fail_rate = fail_rate
+    Handler.wrong_rate = wrong_rate
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Anthropic Messages API server.")
+    parser.add_argument("--port", type=int, default=8788)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--jitter-ms", type=int, default=0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--wrong-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = serve(args.port, args.latency_ms, args.jitter_ms, args.fail_rate, args.wrong_rate)
+    print("listening on http://127.0.0.1:%d" % server.server_address[1], flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,884 @@
+#!/usr/bin/env python3
+"""Concurrent, resumable evaluation runner.
+
+Runs every example of an evaluation dataset (the `EvaluationDataset` JSONL
+format from ../building-your-own.md, or a skill-pipeline `test-cases.json`)
+against one or more models, scores the outputs and writes a summary:
+
+- **Streaming**: JSONL datasets are read one line at a time through a bounded
+  queue, so inputs and outputs are never all in memory; only ids and scores
+  are kept for the summary. `.json` files are small test-case lists and are
+  loaded whole.
+- **Concurrency**: at most --concurrency model calls are in flight. Calls to
+  the Messages API reuse one keep-alive connection per worker thread; the
+  `cmd` backend runs that many agent processes at once. Custom scorers run in
+  threads, or in a process pool with --scorer-processes.
+- **Checkpoint**: each result is appended to --results (JSONL) as soon as it
+  is scored. Re-running with the same --results skips every (example, model)
+  pair already recorded without an error for the same input, expected,
+  context and metadata, so an interrupted run picks up where it stopped. A
+  changed example is evaluated again, and a record missing a requested scorer
+  is re-scored (its output comes from the memo cache). The summary covers
+  only the pairs of this run's dataset and --limit. Ctrl-C finishes the calls
+  in flight first; press it again to abort them.
+- **Memoization**: model outputs and custom-scorer scores are cached in SQLite
+  (--cache) by a hash of their inputs (model, request settings, input; scorer,
+  model, input, output, expected, context, metadata). Re-running unchanged
+  examples, or re-scoring old outputs with a new scorer, costs no model calls;
+  identical inputs within a run share one call. A scorer's key includes its
+  `version` attribute and the source file it was loaded from; bump `version`
+  when code it imports from elsewhere changes.
+
+Examples (one JSON object per line):
+
+    {"id": "q-17", "input": "What is 2 + 3?", "expected": "5",
+     "context": ["..."], "metadata": {"topic": "math"}}
+
+`input` may also be a list of Messages API messages. Skill-pipeline test cases
+(`test_id`, `query`, `expected_behavior`, `success_criteria`, `models`) are
+accepted too; their criteria are passed to scorers in `metadata`. An example's
+`models` list restricts it to the --model values it names (`haiku` matches
+`claude-haiku-4-5`).
+
+Scorers (--scorer, repeatable, default `exact`):
+
+    exact | contains | regex                   built in, against `expected`
+    path/to/metrics.py:RelevanceMetric         BaseMetric instance, or class taking no arguments
+    package.module:score_fn                    function(example) -> float
+
+A scorer gets the example with `output` and `model` added and returns a score
+in [0, 1] (or a dict with a `score` key), or None when it does not apply.
+
+Usage:
+
+    python3 run_evaluations.py dataset.jsonl --model claude-haiku-4-5 --model claude-sonnet-4-5 \\
+        --concurrency 32 --results results.jsonl
+    python3 run_evaluations.py evaluations/test-cases.json --backend cmd \\
+        --agent-cmd 'claude -p --output-format json --model {model}' --scorer checks.py:must_pass
+    python3 run_evaluations.py dataset.jsonl --baseline baseline.summary.json
+
+The Messages API backend reads ANTHROPIC_API_KEY and --base-url (default
+$ANTHROPIC_BASE_URL or https://api.anthropic.com); fake_model_server.py serves
+a local stand-in. Exit status: 0 all results scored and no regressions, 1
+results with errors or regressions against --baseline, 2 bad input, 130
+interrupted (re-run to resume). Only the standard library is used.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import http.client
+import importlib
+import importlib.util
+import json
+import os
+import random
+import re
+import shlex
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+DEFAULT_BASE_URL = "https://api.anthropic.com"
+DEFAULT_MODEL = "claude-sonnet-4-20250514"
+ANTHROPIC_VERSION = "2023-06-01"
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504, 529)
+SKILL_FIELDS = ("expected_behavior", "success_criteria", "skills", "files")
+
+
+class EvalError(Exception):
+    """Unusable dataset, scorer or option (exit status 2)."""
+
+
+class ModelError(Exception):
+    """A model call that failed after its retries; recorded on the result."""
+
+
+def log(message):
+    print("[%s] %s" % (time.strftime("%H:%M:%S"), message), file=sys.stderr, flush=True)
+
+
+def input_hash(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def example_digest(example):
+    """Short hash of what a result depends on besides the model; stored on each record."""
+    return input_hash("example", example["input"], example.get("expected"), example.get("context"),
+                      example.get("metadata"))[:16]
+
+
+def prompt_text(value):
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+# -- dataset ------------------------------------------------------------
+
+
+def normalize(record, number):
+    """Map a dataset record to {id, input, expected, context, metadata[, models]}."""
+    if not isinstance(record, dict):
+        raise EvalError("example %d is not a JSON object" % number)
+    if "input" in record:
+        value = record["input"]
+    elif "query" in record:
+        value = record["query"]
+    else:
+        raise EvalError("example %d has no input (or query)" % number)
+    metadata = dict(record.get("metadata") or {})
+    for field in SKILL_FIELDS:
+        if field in record:
+            metadata[field] = record[field]
+    example = {
+        "id": str(record.get("id", record.get("test_id", "example-%d" % number))),
+        "input": value,
+        "expected": record.get("expected"),
+        "context": record.get("context"),
+        "metadata": metadata,
+    }
+    if isinstance(record.get("models"), list):
+        example["models"] = [str(model) for model in record["models"]]
+    return example
+
+
+def _jsonl_records(path):
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield number, json.loads(line)
+            except ValueError as exc:
+                raise EvalError("%s:%d: %s" % (path, number, exc))
+
+
+def iter_examples(path, limit=None):
+    """Yield normalized examples lazily; stop after `limit` of them."""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as handle:
+            try:
+                data = json.load(handle)
+            except ValueError as exc:
+                raise EvalError("%s: %s" % (path, exc))
+        if isinstance(data, dict):
+            data = data.get("test_cases", data.get("examples", [data]))
+        records = enumerate(data, 1)
+    else:
+        records = _jsonl_records(path)
+    seen = set()
+    for number, record in records:
+        if limit and len(seen) >= limit:
+            return
+        example = normalize(record, number)
+        if example["id"] in seen:
+            raise EvalError("%s: duplicate example id %r (line %d)" % (path, example["id"], number))
+        seen.add(example["id"])
+        yield example
+
+
+# -- memo cache and checkpoint ------------------------------------------
+
+
+class MemoCache:
+    """SQLite key/value store for model results and scores, keyed by input hash."""
+
+    def __init__(self, path):
+        self.conn = None
+        self.hits = self.misses = 0
+        self.pending = 0
+        self.committed = time.monotonic()
+        if not path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS memo (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL)")
+
+    def get(self, key):
+        if self.conn is None:
+            return None
+        row = self.conn.execute("SELECT value FROM memo WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        if self.conn is None:
+            return
+        self.conn.execute("INSERT OR REPLACE INTO memo VALUES (?, ?, ?)", (key, json.dumps(value), time.time()))
+        self.pending += 1
+        # Commit in batches: one fsync per write would cap throughput.
+        if self.pending >= 200 or time.monotonic() - self.committed > 1.0:
+            self.commit()
+
+    def commit(self):
+        if self.conn is not None and self.pending:
+            self.conn.commit()
+            self.pending = 0
+            self.committed = time.monotonic()
+
+    def close(self):
+        if self.conn is not None:
+            self.commit()
+            self.conn.close()
+            self.conn = None
+
+
+class Checkpoint:
+    """Append-only JSONL of results; the last record per (id, model) wins."""
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+
+    def load(self):
+        """Return {(id, model): record} without outputs, skipping a torn last line."""
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                record.pop("output", None)
+                record.pop("expected", None)
+                records[(record["id"], record["model"])] = record
+        return records
+
+    def open(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self.handle = open(self.path, "a+", encoding="utf-8")
+        if self.handle.tell():
+            self.handle.seek(self.handle.tell() - 1)
+            if self.handle.read(1) != "\n":
+                self.handle.write("\n")
+
+    def append(self, record):
+        self.handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.handle.flush()
+
+    def close(self):
+        if self.handle:
+            self.handle.close()
+            self.handle = None
+
+
+# -- models -------------------------------------------------------------
+
+
+class HttpModel:
+    """Anthropic Messages API, one keep-alive connection per worker thread."""
+
+    def __init__(self, base_url, api_key, max_tokens, temperature, system, timeout, retries, threads):
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip("/")
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path.rstrip("/") + "/v1/messages"
+        self.api_key = api_key
+        self.settings = {"max_tokens": max_tokens, "temperature": temperature}
+        if system:
+            self.settings["system"] = system
+        self.timeout = timeout
+        self.retries = retries
+        self.local = threading.local()
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="model")
+
+    def identity(self):
+        return ["http", self.base_url, self.settings]
+
+    async def complete(self, model, example):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, self.request, model, example)
+
+    def connection(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            factory = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = self.local.conn = factory(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def drop(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    def request(self, model, example):
+        value = example["input"]
+        if isinstance(value, list):
+            messages = value
+        else:
+            messages = [{"role": "user", "content": prompt_text(value)}]
+        body = json.dumps(dict(self.settings, model=model, messages=messages))
+        headers = {"content-type": "application/json", "anthropic-version": ANTHROPIC_VERSION}
+        if self.api_key:
+            headers["x-api-key"] = self.api_key
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                conn = self.connection()
+                conn.request("POST", self.path, body, headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as exc:
+                self.drop()
+                error = "%s: %s" % (type(exc).__name__, exc)
+            else:
+                if response.status == 200:
+                    reply = json.loads(data)
+                    text = "".join(block.get("text", "") for block in reply.get("content", [])
+                                   if block.get("type") == "text")
+                    usage = reply.get("usage", {})
+                    return {"output": text, "attempts": attempt + 1,
+                            "usage": {"input_tokens": usage.get("input_tokens", 0),
+                                      "output_tokens": usage.get("output_tokens", 0)}}
+                error = "HTTP %d: %s" % (response.status, data[:300].decode("utf-8", "replace"))
+                if response.status not in RETRY_STATUSES:
+                    raise ModelError(error)
+                retry_after = response.getheader("retry-after")
+            if attempt == self.retries:
+                raise ModelError("%s (after %d attempts)" % (error, attempt + 1))
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = min(30.0, 0.5 * 2 ** attempt)
+            time.sleep(delay * random.uniform(0.8, 1.2))
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class CommandModel:
+    """Any CLI that reads the prompt on stdin, e.g. `claude -p --output-format json`.
+
+    `{model}` in the command is replaced with the model name. JSON output with
+    a `result` field (claude's json format) is unwrapped; anything else is
+    taken as the answer verbatim.
+    """
+
+    def __init__(self, command, timeout):
+        self.command = command
+        self.timeout = timeout
+
+    def identity(self):
+        return ["cmd", self.command]
+
+    async def complete(self, model, example):
+        argv = [part.replace("{model}", model) for part in shlex.split(self.command)]
+        process = await asyncio.create_subprocess_exec(
+            *argv, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(prompt_text(example["input"]).encode()), self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise ModelError("%s timed out after %ss" % (argv[0], self.timeout))
+        if process.returncode:
+            raise ModelError("%s exited %d: %s" % (argv[0], process.returncode,
+                                                   stderr.decode("utf-8", "replace").strip()[-300:]))
+        text = stdout.decode("utf-8", "replace").strip()
+        usage = {}
+        try:
+            reply = json.loads(text)
+        except ValueError:
+            reply = None
+        if isinstance(reply, dict) and "result" in reply:
+            text = reply["result"]
+            usage = {key: value for key, value in (reply.get("usage") or {}).items()
+                     if key in ("input_tokens", "output_tokens")}
+        return {"output": text, "usage": usage, "attempts": 1}
+
+    def close(self):
+        pass
+
+
+# -- scorers ------------------------------------------------------------
+
+
+def _expected_list(example):
+    expected = example.get("expected")
+    if expected is None:
+        return None
+    return expected if isinstance(expected, list) else [expected]
+
+
+class ExactMatch:
+    name = "exact"
+    inline = True
+
+    def compute(self, example):
+        expected = example.get("expected")
+        if expected is None:
+            return None
+        return float(str(example["output"]).strip() == str(expected).strip())
+
+
+class Contains:
+    """Share of the expected strings found in the output (case-insensitive)."""
+
+    name = "contains"
+    inline = True
+
+    def compute(self, example):
+        expected = _expected_list(example)
+        if not expected:
+            return None
+        output = str(example["output"]).casefold()
+        return sum(str(item).casefold() in output for item in expected) / len(expected)
+
+
+class RegexMatch:
+    """Share of the expected patterns that match the output."""
+
+    name = "regex"
+    inline = True
+
+    def compute(self, example):
+        expected = _expected_list(example)
+        if not expected:
+            return None
+        return sum(bool(re.search(str(item), str(example["output"]))) for item in expected) / len(expected)
+
+
+class FunctionScorer:
+    def __init__(self, name, function):
+        self.name = name
+        self.function = function
+
+    def compute(self, example):
+        return self.function(example)
+
+
+BUILTIN_SCORERS = {scorer.name: scorer for scorer in (ExactMatch, Contains, RegexMatch)}
+
+
+def load_scorer(spec):
+    """Build a scorer from `exact`, `path/to/file.py:Name` or `module:name`."""
+    if spec in BUILTIN_SCORERS:
+        scorer = BUILTIN_SCORERS[spec]()
+        scorer.spec = spec
+        return scorer
+    if ":" not in spec:
+        raise EvalError("unknown scorer %r (expected one of %s, or module:name)"
+                        % (spec, ", ".join(sorted(BUILTIN_SCORERS))))
+    location, attribute = spec.rsplit(":", 1)
+    try:
+        if location.endswith(".py"):
+            module_spec = importlib.util.spec_from_file_location(
+                os.path.splitext(os.path.basename(location))[0], location)
+            module = importlib.util.module_from_spec(module_spec)
+            module_spec.loader.exec_module(module)
+        else:
+            module = importlib.import_module(location)
+        target = getattr(module, attribute)
+    except (ImportError, OSError, AttributeError) as exc:
+        raise EvalError("cannot load scorer %r: %s" % (spec, exc))
+    if isinstance(target, type):
+        target = target()
+    if not hasattr(target, "compute"):
+        if not callable(target):
+            raise EvalError("scorer %r is neither a metric nor a function" % spec)
+        target = FunctionScorer(attribute, target)
+    target.spec = spec
+    target.source_digest = _source_digest(module)
+    return target
+
+
+def _source_digest(module):
+    """Hash of the file a scorer was loaded from, so edits invalidate memoized scores."""
+    path = getattr(module, "__file__", None)
+    if not path:
+        return None
+    try:
+        with open(path, "rb") as handle:
+            return hashlib.sha256(handle.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def as_score(value):
+    if isinstance(value, dict):
+        value = value.get("score")
+    return None if value is None else float(value)
+
+
+_process_scorers = {}
+
+
+def _score_in_process(spec, example):
+    """Process-pool entry point: load each scorer once per worker process."""
+    if spec not in _process_scorers:
+        _process_scorers[spec] = load_scorer(spec)
+    return as_score(_process_scorers[spec].compute(example))
+
+
+# -- runner -------------------------------------------------------------
+
+
+class Runner:
+    def __init__(self, client, models, scorers, cache, checkpoint, concurrency,
+                 scorer_processes=0, progress_interval=5.0):
+        self.client = client
+        self.models = models
+        self.scorers = scorers
+        self.cache = cache
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+        self.process_pool = ProcessPoolExecutor(scorer_processes) if scorer_processes else None
+        self.done = {}
+        self.covered = set()
+        self.in_flight = {}
+        self.counts = {"evaluated": 0, "cached": 0, "errors": 0, "skipped": 0}
+        self.stop = None
+        self.interrupted = False
+
+    def models_for(self, example):
+        wanted = example.get("models")
+        if not wanted:
+            return self.models
+        return [model for model in self.models if any(name == model or name in model for name in wanted)]
+
+    async def run(self, examples):
+        self.stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        main = asyncio.current_task()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self.interrupt, main)
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        workers = [asyncio.create_task(self.worker(queue)) for _ in range(self.concurrency)]
+        progress = asyncio.create_task(self.progress())
+        started = time.monotonic()
+        try:
+            for example in examples:
+                digest = example_digest(example)
+                for model in self.models_for(example):
+                    saved = self.done.get((example["id"], model))
+                    if (saved is not None and saved.get("example_hash") == digest
+                            and all(scorer.name in saved.get("scores", {}) for scorer in self.scorers)):
+                        self.counts["skipped"] += 1
+                        self.covered.add((example["id"], model))
+                        continue
+                    await queue.put((example, model))
+                if self.stop.is_set():
+                    break
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers + [progress]:
+                task.cancel()
+            await asyncio.gather(*workers, progress, return_exceptions=True)
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(signum)
+            self.cache.commit()
+            if self.process_pool:
+                self.process_pool.shutdown(cancel_futures=True)
+        self.counts["elapsed_s"] = round(time.monotonic() - started, 2)
+        return self.counts
+
+    def interrupt(self, main):
+        if self.stop.is_set():
+            log("aborting the calls in flight")
+            main.cancel()
+            return
+        self.interrupted = True
+        self.stop.set()
+        log("stopping: finishing the calls in flight (Ctrl-C again to abort them)")
+
+    async def worker(self, queue):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if self.stop.is_set():
+                continue
+            record = await self.evaluate(*item)
+            self.checkpoint.append(record)
+            self.covered.add((record["id"], record["model"]))
+            self.counts["evaluated"] += 1
+            self.counts["cached"] += record["cached"]
+            self.counts["errors"] += record["error"] is not None
+
+    async def evaluate(self, example, model):
+        started = time.perf_counter()
+        key = input_hash("model", self.client.identity(), model, example["input"])
+        record = {"id": example["id"], "model": model, "input_hash": key[:16],
+                  "example_hash": example_digest(example), "output": None,
+                  "expected": example.get("expected"), "scores": {}, "usage": {},
+                  "latency_ms": None, "cached": False, "error": None}
+        try:
+            result, record["cached"] = await self.model_result(key, model, example)
+            if not record["cached"]:
+                record["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            record["output"] = result["output"]
+            record["usage"] = result.get("usage", {})
+            scored = dict(example, output=result["output"], model=model)
+            for scorer in self.scorers:
+                record["scores"][scorer.name] = await self.score(scorer, scored)
+        except ModelError as exc:
+            record["error"] = str(exc)
+        except Exception as exc:  # a scorer bug must not stall the queue
+            record["error"] = "%s: %s" % (type(exc).__name__, exc)
+        return record
+
+    async def model_result(self, key, model, example):
+        """Return (result, reused): from the cache, from an identical call in flight, or a new call."""
+        result = self.cache.get(key)
+        if result is not None:
+            return result, True
+        pending = self.in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending), True
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self.in_flight[key] = future
+        try:
+            result = await self.client.complete(model, example)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            del self.in_flight[key]
+        self.cache.put(key, result)
+        future.set_result(result)
+        return result, False
+
+    async def score(self, scorer, example):
+        if getattr(scorer, "inline", False):
+            return as_score(scorer.compute(example))
+        key = input_hash("score", scorer.spec, getattr(scorer, "version", None),
+                         getattr(scorer, "source_digest", None), example["model"], example["input"],
+                         example["output"], example.get("expected"), example.get("context"),
+                         example.get("metadata"))
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit["score"]
+        if self.process_pool:
+            value = await asyncio.get_running_loop().run_in_executor(
+                self.process_pool, _score_in_process, scorer.spec, example)
+        else:
+            value = as_score(await asyncio.to_thread(scorer.compute, example))
+        self.cache.put(key, {"score": value})
+        return value
+
+    async def progress(self):
+        started = time.monotonic()
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            elapsed = time.monotonic() - started
+            log("%d evaluated (%d cached, %d errors, %d already done), %.1f/s" % (
+                self.counts["evaluated"], self.counts["cached"], self.counts["errors"],
+                self.counts["skipped"], self.counts["evaluated"] / elapsed))
+
+
+# -- summary ------------------------------------------------------------
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def summarize(records, pass_threshold):
+    """Aggregate the latest record per (id, model) into per-model statistics."""
+    models = {}
+    for record in records.values():
+        entry = models.setdefault(record["model"], {
+            "examples": 0, "errors": 0, "cached": 0, "input_tokens": 0, "output_tokens": 0,
+            "latencies": [], "scores": {}})
+        entry["examples"] += 1
+        if record.get("error"):
+            entry["errors"] += 1
+            continue
+        entry["cached"] += bool(record.get("cached"))
+        entry["input_tokens"] += record.get("usage", {}).get("input_tokens", 0)
+        entry["output_tokens"] += record.get("usage", {}).get("output_tokens", 0)
+        if record.get("latency_ms") is not None:
+            entry["latencies"].append(record["latency_ms"])
+        for name, value in record.get("scores", {}).items():
+            if value is not None:
+                entry["scores"].setdefault(name, []).append(value)
+    summary = {}
+    for model, entry in sorted(models.items()):
+        latencies = entry.pop("latencies")
+        entry["latency_ms_p50"] = percentile(latencies, 50)
+        entry["latency_ms_p95"] = percentile(latencies, 95)
+        entry["scores"] = {name: {
+            "n": len(values),
+            "mean": round(sum(values) / len(values), 4),
+            "min": min(values),
+            "max": max(values),
+            "pass_rate": round(sum(value >= pass_threshold for value in values) / len(values), 4),
+        } for name, values in sorted(entry["scores"].items())}
+        summary[model] = entry
+    return summary
+
+
+def detect_regressions(current, baseline, threshold):
+    """Scorer means that dropped more than `threshold` below the baseline."""
+    regressions = []
+    for model, entry in current.items():
+        for name, stats in entry["scores"].items():
+            before = baseline.get(model, {}).get("scores", {}).get(name)
+            if before is None:
+                continue
+            delta = before["mean"] - stats["mean"]
+            if delta > threshold:
+                regressions.append({"model": model, "scorer": name, "current": stats["mean"],
+                                    "baseline": before["mean"], "delta": round(delta, 4)})
+    return regressions
+
+
+def print_report(summary, regressions):
+    names = sorted({name for entry in summary.values() for name in entry["scores"]})
+    header = "%-32s %7s %6s %7s %8s %8s %10s %9s" % (
+        "model", "n", "errors", "cached", "p50 ms", "p95 ms", "in tok", "out tok")
+    print(header + "".join(" %16s" % name[:16] for name in names))
+    for model, entry in summary.items():
+        row = "%-32s %7d %6d %7d %8s %8s %10d %9d" % (
+            model[:32], entry["examples"], entry["errors"], entry["cached"],
+            "-" if entry["latency_ms_p50"] is None else "%.0f" % entry["latency_ms_p50"],
+            "-" if entry["latency_ms_p95"] is None else "%.0f" % entry["latency_ms_p95"],
+            entry["input_tokens"], entry["output_tokens"])
+        for name in names:
+            stats = entry["scores"].get(name)
+            row += " %16s" % ("-" if stats is None else "%.3f (%3.0f%%)" % (stats["mean"], stats["pass_rate"] * 100))
+        print(row)
+    for regression in regressions:
+        print("REGRESSION %(model)s %(scorer)s: %(current).3f vs baseline %(baseline).3f" % regression)
+
+
+# -- main ---------------------------------------------------------------
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", help="JSONL dataset or test-cases .json")
+    parser.add_argument("--model", action="append", help="model to evaluate (repeatable, default %s or "
+                        "$ANTHROPIC_MODEL)" % DEFAULT_MODEL)
+    parser.add_argument("--backend", choices=("http", "cmd"), default="http")
+    parser.add_argument("--base-url", default=os.environ.get("ANTHROPIC_BASE_URL", DEFAULT_BASE_URL))
+    parser.add_argument("--agent-cmd", help="command for --backend cmd; prompt on stdin, {model} substituted")
+    parser.add_argument("--system", help="file with a system prompt (http backend)")
+    parser.add_argument("--max-tokens", type=int, default=1024)
+    parser.add_argument("--temperature", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds per model call")
+    parser.add_argument("--retries", type=int, default=4, help="retries on 429/5xx/529 and connection errors")
+    parser.add_argument("--scorer", action="append", help="exact | contains | regex | file.py:name | module:name")
+    parser.add_argument("--scorer-processes", type=int, default=0, help="run custom scorers in N processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="model calls in flight")
+    parser.add_argument("--limit", type=int, help="only the first N examples")
+    parser.add_argument("--results", default="eval-results.jsonl", help="append-only results / checkpoint file")
+    parser.add_argument("--summary", help="summary JSON (default: next to --results)")
+    parser.add_argument("--cache", default=os.path.join(".eval_cache", "memo.sqlite"))
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--baseline", help="summary JSON of an earlier run to compare scorer means against")
+    parser.add_argument("--regression-threshold", type=float, default=0.05)
+    parser.add_argument("--pass-threshold", type=float, default=0.5, help="score counted as a pass")
+    parser.add_argument("--progress-interval", type=float, default=5.0)
+    args = parser.parse_args(argv)
+    args.model = args.model or [os.environ.get("ANTHROPIC_MODEL", DEFAULT_MODEL)]
+    args.scorer = args.scorer or ["exact"]
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.backend == "cmd" and not args.agent_cmd:
+        parser.error("--backend cmd needs --agent-cmd")
+    if not args.summary:
+        stem = args.results[:-len(".jsonl")] if args.results.endswith(".jsonl") else args.results
+        args.summary = stem + ".summary.json"
+    return args
+
+
+def build_client(args):
+    if args.backend == "cmd":
+        return CommandModel(args.agent_cmd, args.timeout)
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key and args.base_url == DEFAULT_BASE_URL:
+        raise EvalError("ANTHROPIC_API_KEY is not set (or point --base-url at fake_model_server.py)")
+    system = None
+    if args.system:
+        with open(args.system, encoding="utf-8") as handle:
+            system = handle.read()
+    return HttpModel(args.base_url, api_key, args.max_tokens, args.temperature, system,
+                     args.timeout, args.retries, args.concurrency)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        if not os.path.exists(args.dataset):
+            raise EvalError("%s: no such file" % args.dataset)
+        scorers = [load_scorer(spec) for spec in args.scorer]
+        client = build_client(args)
+    except EvalError as exc:
+        print("error: %s" % exc, file=sys.stderr)
+        return 2
+
+    checkpoint = Checkpoint(args.results)
+    cache = MemoCache(None if args.no_cache else args.cache)
+    runner = Runner(client, args.model, scorers, cache, checkpoint, args.concurrency,
+                    args.scorer_processes, args.progress_interval)
+    runner.done = {key: record for key, record in checkpoint.load().items() if not record.get("error")}
+    if runner.done:
+        log("resuming: %d result(s) already in %s" % (len(runner.done), args.results))
+    checkpoint.open()
+    aborted = False
+    try:
+        counts = asyncio.run(runner.run(iter_examples(args.dataset, args.limit)))
+    except EvalError as exc:
+        print("error: %s" % exc, file=sys.stderr)
+        return 2
+    except (asyncio.CancelledError, KeyboardInterrupt):
+        aborted = True
+        counts = runner.counts
+    finally:
+        checkpoint.close()
+        cache.close()
+        client.close()
+
+    # Only this run's pairs and scorers: the file may hold examples since
+    # removed from the dataset, outside --limit, or scored by other scorers.
+    names = {scorer.name for scorer in scorers}
+    records = {key: dict(record, scores={name: value for name, value in record.get("scores", {}).items()
+                                         if name in names})
+               for key, record in checkpoint.load().items() if key in runner.covered}
+    summary = summarize(records, args.pass_threshold)
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = detect_regressions(summary, json.load(handle)["models"], args.regression_threshold)
+    with open(args.summary, "w", encoding="utf-8") as handle:
+        json.dump({"dataset": args.dataset, "results": args.results, "run": counts, "models": summary,
+                   "regressions": regressions}, handle, indent=2)
+        handle.write("\n")
+    print_report(summary, regressions)
+    log("%d evaluated (%d from cache, %d errors), %d already done; summary in %s" % (
+        counts["evaluated"], counts["cached"], counts["errors"], counts["skipped"], args.summary))
+    if aborted or runner.interrupted:
+        log("interrupted: re-run the same command to resume")
+        return 130
+    errors = sum(entry["errors"] for entry in summary.values())
+    return 1 if errors or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,6 +25,8 @@ else
 fi
 
 ITERATION=0
+# Logs live under .git so the agent's `git add -A` never commits them.
+LOG_DIR="${LOG_DIR:-$(git rev-parse --git-dir)/ralph-logs}"
 CURRENT_BRANCH=$(git branch --show-current)
 
 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
@@ -40,6 +42,18 @@ if [ ! -f "$PROMPT_FILE" ]; then
     exit 1
 fi
 
+# Single-pass stream processor: renders assistant text and logs raw JSON and
+# per-turn usage. Without python3 the raw stream-json is printed as before.
+if [ -z "$STREAM_EVENTS" ] && command -v python3 >/dev/null 2>&1; then
+    for candidate in "$(dirname "$0")/stream_events.py" "$(dirname "$0")/../../../shared-scripts/stream_events.py"; do
+        if [ -f "$candidate" ]; then
+            STREAM_EVENTS="$candidate"
+            break
+        fi
+    done
+fi
+[ -n "$STREAM_EVENTS" ] && mkdir -p "$LOG_DIR"
+
 while true; do
     if [ $MAX_ITERATIONS -gt 0 ] && [ $ITERATION -ge $MAX_ITERATIONS ]; then
         echo "Reached max iterations: $MAX_ITERATIONS"
@@ -53,11 +67,23 @@ while true; do
     # --model opus: Primary agent uses Opus for complex reasoning (task selection, prioritization)
     #               Can use 'sonnet' in build mode for speed if plan is clear and tasks well-defined
     # --verbose: Detailed execution logging
-    cat "$PROMPT_FILE" | claude -p \
-        --dangerously-skip-permissions \
-        --output-format=stream-json \
-        --model opus \
-        --verbose
+    if [ -n "$STREAM_EVENTS" ]; then
+        RUN_LOG="$LOG_DIR/$MODE-$(date +%Y%m%d-%H%M%S)-$ITERATION"
+        cat "$PROMPT_FILE" | claude -p \
+            --dangerously-skip-permissions \
+            --output-format=stream-json \
+            --model opus \
+            --verbose \
+        | python3 "$STREAM_EVENTS" \
+            --raw "$RUN_LOG.json" --log "$RUN_LOG.events.log" \
+            --summary "$RUN_LOG.summary.json"
+    else
+        cat "$PROMPT_FILE" | claude -p \
+            --dangerously-skip-permissions \
+            --output-format=stream-json \
+            --model opus \
+            --verbose
+    fi
 
     # Push changes after each iteration
     git push origin "$CURRENT_BRANCH" || {
@@ -12,6 +12,17 @@ stream_text='select(.type == "assistant").message.content[]? | select(.type == "
 # jq filter to extract final result
 final_result='select(.type == "result").result // empty'
 
+# Single-pass stream processor: renders text and detects the promise as the
+# result event arrives. Falls back to grep | tee | jq without python3.
+if [ -z "$STREAM_EVENTS" ] && command -v python3 >/dev/null 2>&1; then
+  for candidate in "$(dirname "$0")/stream_events.py" "$(dirname "$0")/../../../../shared-scripts/stream_events.py"; do
+    if [ -f "$candidate" ]; then
+      STREAM_EVENTS="$candidate"
+      break
+    fi
+  done
+fi
+
 for ((i=1; i<=$1; i++)); do
   tmpfile=$(mktemp)
   trap "rm -f $tmpfile" EXIT
@@ -19,18 +30,31 @@ for ((i=1; i<=$1; i++)); do
   issues=$(gh issue list --state open --json number,title,body,comments)
   ralph_commits=$(git log --grep="RALPH" -n 10 --format="%H%n%ad%n%B---" --date=short 2>/dev/null || echo "No RALPH commits found")
 
-  docker sandbox run --credentials host claude \
-    --verbose \
-    --print \
-    --output-format stream-json \
-    "$issues Previous RALPH commits: $ralph_commits @plans/backlog/prompt.md" \
-  | grep --line-buffered '^{' \
-  | tee "$tmpfile" \
-  | jq --unbuffered -rj "$stream_text"
-
-  result=$(jq -r "$final_result" "$tmpfile")
+  if [ -n "$STREAM_EVENTS" ]; then
+    docker sandbox run --credentials host claude \
+      --verbose \
+      --print \
+      --output-format stream-json \
+      "$issues Previous RALPH commits: $ralph_commits @plans/backlog/prompt.md" \
+    | python3 "$STREAM_EVENTS" --signal-mode any --signal-file "$tmpfile"
+
+    signal=$(cat "$tmpfile")
+  else
+    docker sandbox run --credentials host claude \
+      --verbose \
+      --print \
+      --output-format stream-json \
+      "$issues Previous RALPH commits: $ralph_commits @plans/backlog/prompt.md" \
+    | grep --line-buffered '^{' \
+    | tee "$tmpfile" \
+    | jq --unbuffered -rj "$stream_text"
+
+    result=$(jq -r "$final_result" "$tmpfile")
+    signal=""
+    [[ "$result" == *"<promise>COMPLETE</promise>"* ]] && signal="COMPLETE"
+  fi
 
-  if [[ "$result" == *"<promise>COMPLETE</promise>"* ]]; then
+  if [ "$signal" = "COMPLETE" ]; then
     echo "Ralph complete after $i iterations."
     exit 0
   fi
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""End-to-end check and throughput benchmark for ralph_parallel.py.
+
+Builds a throwaway project whose remote is a local bare repository, with a
+synthetic prd.json, and a stub `claude` that implements the assigned story by
+committing one file after --work-seconds. Then runs the orchestrator once per
+worker count on a fresh clone and checks:
+
+- every story merged exactly once (one merge commit and one file per story)
+- every story ticked off (`passes: true`) in the remote's prd.json
+- the remote branch equals the local one after the final push
+
+    python3 bench_ralph_parallel.py --stories 24 --workers 1 4 8 --work-seconds 2
+
+With --conflict-every K, every K-th story also edits a shared file, so merge
+conflicts and retries on a fresh base are exercised.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ORCHESTRATOR = os.path.join(HERE, "ralph_parallel.py")
+
+STUB_CLAUDE = r'''#!/usr/bin/env python3
+import json, os, re, subprocess, sys, time
+prompt = sys.stdin.read()
+task = re.search(r"^Task (\S+): (.*)$", prompt, re.M)
+print(json.dumps({"type": "system", "subtype": "init", "session_id": "stub", "model": "stub"}), flush=True)
+time.sleep(float(os.environ.get("STUB_WORK_SECONDS", "1")))
+task_id = task.group(1)
+os.makedirs("work", exist_ok=True)
+with open(os.path.join("work", task_id + ".txt"), "w") as handle:
+    handle.write("implemented %s\n" % task_id)
+number = int(re.sub(r"\D", "", task_id) or 0)
+every = int(os.environ.get("STUB_CONFLICT_EVERY", "0"))
+if every and number % every == 0:
+    # Everyone appends to the same line: concurrent stories conflict.
+    with open("shared.txt", "w") as handle:
+        handle.write("last story: %s\n" % task_id)
+subprocess.run(["git", "add", "-A"], check=True)
+subprocess.run(["git", "commit", "-q", "-m", "RALPH: implement %s" % task_id], check=True)
+text = "Implemented %s" % task_id
+print(json.dumps({"type": "assistant", "message": {"id": "m1", "usage": {"input_tokens": 10, "output_tokens": 5},
+                                                   "content": [{"type": "text", "text": text}]}}), flush=True)
+print(json.dumps({"type": "result", "subtype": "success", "result": text, "num_turns": 1}), flush=True)
+'''
+
+
+def run(*command, cwd=None, env=None):
+    return subprocess.run(command, cwd=cwd, env=env, check=True, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, text=True).stdout.strip()
+
+
+def make_remote(workdir, stories):
+    bare = os.path.join(workdir, "remote.git")
+    seed = os.path.join(workdir, "seed")
+    run("git", "init", "-q", "--bare", "-b", "main", bare)
+    run("git", "clone", "-q", bare, seed)
+    run("git", "checkout", "-q", "-b", "main", cwd=seed)
+    prd = {"project": "Bench", "description": "Synthetic backlog", "userStories": [
+        {"id": "US-%03d" % n, "title": "Story %d" % n, "category": "backend",
+         "description": "Implement story %d." % n, "acceptanceCriteria": ["work/US-%03d.txt exists" % n],
+         "priority": n, "passes": False, "notes": ""} for n in range(1, stories + 1)]}
+    with open(os.path.join(seed, "prd.json"), "w") as handle:
+        json.dump(prd, handle, indent=2)
+        handle.write("\n")
+    with open(os.path.join(seed, "PROMPT_build.md"), "w") as handle:
+        handle.write("Implement the highest priority story from @prd.json.\n")
+    with open(os.path.join(seed, "shared.txt"), "w") as handle:
+        handle.write("last story: none\n")
+    with open(os.path.join(seed, ".gitignore"), "w") as handle:
+        handle.write("logs/\n")
+    run("git", "add", "-A", cwd=seed)
+    run("git", "commit", "-q", "-m", "Initial backlog", cwd=seed)
+    run("git", "push", "-q", "origin", "main", cwd=seed)
+    return bare
+
+
+def check(clone, bare, stories):
+    problems = []
+    merges = run("git", "log", "--merges", "--format=%s", "main", cwd=clone).splitlines()
+    merged_ids = [line.split()[3].rstrip(":") for line in merges if line.startswith("Merge ralph task")]
+    duplicates = sorted({task for task in merged_ids if merged_ids.count(task) > 1})
+    if duplicates:
+        problems.append("merged more than once: %s" % ", ".join(duplicates))
+    expected = {"US-%03d" % n for n in range(1, stories + 1)}
+    if set(merged_ids) != expected:
+        problems.append("not merged: %s" % ", ".join(sorted(expected - set(merged_ids))))
+    remote_prd = json.loads(run("git", "--git-dir", bare, "show", "main:prd.json"))
+    open_stories = [story["id"] for story in remote_prd["userStories"] if not story["passes"]]
+    if open_stories:
+        problems.append("not ticked off on the remote: %s" % ", ".join(open_stories))
+    if run("git", "rev-parse", "main", cwd=clone) != run("git", "--git-dir", bare, "rev-parse", "main"):
+        problems.append("remote main differs from local main")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stories", type=int, default=24)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--work-seconds", type=float, default=2.0, help="stub agent time per story")
+    parser.add_argument("--conflict-every", type=int, default=0, help="every K-th story edits a shared file")
+    parser.add_argument("--push-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ralph-parallel-bench-")
+    bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(bin_dir)
+    stub = os.path.join(bin_dir, "claude")
+    with open(stub, "w") as handle:
+        handle.write(STUB_CLAUDE)
+    os.chmod(stub, 0o755)
+    os.environ.update(GIT_AUTHOR_NAME="ralph", GIT_AUTHOR_EMAIL="ralph@example.com",
+                      GIT_COMMITTER_NAME="ralph", GIT_COMMITTER_EMAIL="ralph@example.com")
+    env = dict(os.environ, PATH=bin_dir + os.pathsep + os.environ["PATH"],
+               STUB_WORK_SECONDS=str(args.work_seconds), STUB_CONFLICT_EVERY=str(args.conflict_every))
+
+    print("%d stories, stub agent %.1fs per story, workdir %s" % (args.stories, args.work_seconds, workdir))
+    print("%7s %9s %13s %7s %9s %9s  %s" % ("workers", "wall s", "stories/min", "pushes", "conflicts", "speedup", "check"))
+    baseline = None
+    failed = False
+    for workers in args.workers:
+        run_dir = os.path.join(workdir, "w%d" % workers)
+        os.makedirs(run_dir)
+        bare = make_remote(run_dir, args.stories)
+        clone = os.path.join(run_dir, "clone")
+        run("git", "clone", "-q", bare, clone, env=env)
+
+        started = time.perf_counter()
+        subprocess.run([sys.executable, ORCHESTRATOR, "--workers", str(workers), "--tasks", "prd.json",
+                        "--prompt", "PROMPT_build.md", "--agent-cmd", "claude", "--poll", "0.2",
+                        "--push-interval", str(args.push_interval), "--max-attempts", "10"],
+                       cwd=clone, env=env, check=False, stdout=subprocess.DEVNULL)
+        wall = time.perf_counter() - started
+
+        logs = os.path.join(clone, "logs", "ralph")
+        with open(os.path.join(logs, sorted(os.listdir(logs))[-1], "summary.json")) as handle:
+            summary = json.load(handle)
+        problems = check(clone, bare, args.stories)
+        failed = failed or bool(problems)
+        baseline = baseline or wall
+        print("%7d %9.1f %13.1f %7d %9d %8.1fx  %s" % (
+            workers, wall, args.stories / wall * 60, summary["pushes"], summary["conflicts"], baseline / wall,
+            "ok" if not problems else "; ".join(problems)))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
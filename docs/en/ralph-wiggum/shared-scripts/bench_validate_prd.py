@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Benchmark validate_prd.py against the old one-jq-per-field validator.
+
+Generates synthetic PRDs (valid stories with dependsOn links to earlier
+stories) and times, per size:
+
+- validate_prd.py loading the whole file, and streaming it (--stream)
+- the jq fallback in validate_prd.sh (a single jq pass)
+- the old validator: one `jq '.userStories[i] | has("field")'` process per
+  story and required field. That is 7 x N processes, so it is timed on the
+  first --legacy-sample stories and extrapolated linearly.
+
+    python3 bench_validate_prd.py --sizes 10000 50000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+VALIDATOR = os.path.join(HERE, "validate_prd.py")
+WRAPPER = os.path.join(HERE, "validate_prd.sh")
+REQUIRED_FIELDS = ("id", "title", "priority", "category", "acceptanceCriteria", "passes", "description")
+
+
+def write_prd(path, size):
+    stories = []
+    for index in range(size):
+        story = {
+            "id": "US-%05d" % (index + 1),
+            "title": "Story %d" % (index + 1),
+            "category": ("database", "backend", "ui")[index % 3],
+            "description": "As a user, I want feature %d so that the backlog has realistic text in it." % index,
+            "acceptanceCriteria": ["Criterion %d.%d" % (index, n) for n in range(4)] + ["Typecheck passes"],
+            "priority": index + 1,
+            "passes": index % 2 == 0,
+            "notes": "",
+        }
+        if index >= 2 and index % 5 == 0:
+            story["dependsOn"] = ["US-%05d" % (index - 1), "US-%05d" % (index - 2)]
+        stories.append(story)
+    with open(path, "w") as handle:
+        json.dump({"project": "Bench", "description": "Synthetic PRD", "userStories": stories}, handle, indent=2)
+
+
+def timed(command):
+    started = time.perf_counter()
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    return (time.perf_counter() - started) * 1000, result
+
+
+def legacy_ms(path, sample):
+    """Time the old per-field loop over `sample` stories."""
+    started = time.perf_counter()
+    subprocess.run(["jq", "-r", ".userStories[].id", path], stdout=subprocess.PIPE, check=True)
+    subprocess.run(["jq", ".userStories | length", path], stdout=subprocess.PIPE, check=True)
+    for index in range(sample):
+        for field in REQUIRED_FIELDS:
+            subprocess.run(["jq", '.userStories[%d] | has("%s")' % (index, field), path],
+                           stdout=subprocess.PIPE, check=True)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--legacy-sample", type=int, default=10, help="stories to time the old validator on")
+    args = parser.parse_args()
+
+    have_jq = shutil.which("jq") is not None
+    workdir = tempfile.mkdtemp(prefix="prd-bench-")
+    print("%8s %8s %10s %10s %10s %14s" % ("stories", "MB", "load ms", "stream ms", "jq ms", "old jq s (est)"))
+    for size in args.sizes:
+        path = os.path.join(workdir, "prd-%d.json" % size)
+        write_prd(path, size)
+
+        load, result = timed([sys.executable, VALIDATOR, path, "--no-stream", "--format", "json"])
+        report = json.loads(result.stdout)
+        if not report["valid"] or report["stories"] != size:
+            print("unexpected result for %d stories: %s" % (size, result.stdout[:500]), file=sys.stderr)
+            return 1
+        stream, _ = timed([sys.executable, VALIDATOR, path, "--stream", "--format", "json"])
+
+        fallback = old = float("nan")
+        if have_jq:
+            # Run the wrapper's jq branch by hiding python3 from it.
+            env_path = os.path.join(workdir, "bin")
+            os.makedirs(env_path, exist_ok=True)
+            for tool in ("jq", "bash", "dirname"):
+                link = os.path.join(env_path, tool)
+                if not os.path.exists(link):
+                    os.symlink(shutil.which(tool), link)
+            started = time.perf_counter()
+            subprocess.run(["bash", WRAPPER, path], stdout=subprocess.PIPE, env={"PATH": env_path}, check=True)
+            fallback = (time.perf_counter() - started) * 1000
+            sample = min(size, args.legacy_sample)
+            old = legacy_ms(path, sample) * size / sample
+
+        print("%8d %8.1f %10.0f %10.0f %10.0f %14.0f" % (
+            size, os.path.getsize(path) / 1e6, load, stream, fallback, old / 1000))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
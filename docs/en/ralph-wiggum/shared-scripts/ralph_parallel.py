@@ -0,0 +1,666 @@
+#!/usr/bin/env python3
+"""Run N Ralph workers in parallel, one git worktree each.
+
+The single-agent loops (how2ralph `loop.sh`, matt `afk.sh`) pick one task,
+run one agent, push, and repeat. This orchestrator keeps N agents busy on
+the same backlog:
+
+- **Tasks** come from `prd.json` (`userStories` with `passes: false`, by
+  priority) or `IMPLEMENTATION_PLAN.md` (unchecked `- [ ]` items, in order).
+- **Leases** live in SQLite under the git dir (`<git-common-dir>/ralph/`).
+  A worker takes a task inside `BEGIN IMMEDIATE`, so two workers never get
+  the same one. Leases carry an expiry that a heartbeat extends while the
+  agent runs, so tasks of a crashed run are picked up again.
+- **Worktrees**: worker i works on branch `ralph/worker-i` in its own
+  worktree, reset to the tip of the integration branch before every task.
+- **Merges** are serialized: a finished task's commits are merged into the
+  integration branch (the branch checked out where this runs), then the
+  orchestrator ticks the task off in the task file. Agents are told not to
+  edit the task file, so parallel tasks do not conflict on it. A task whose
+  merge conflicts is retried on a fresh base, up to --max-attempts.
+- **Pushes** are batched: a background thread pushes the integration branch
+  at most every --push-interval seconds, fetching and merging the remote
+  first when the push is rejected. Nobody waits on a push.
+- **Context** commands (--context-cmd, default: recent commits) run in the
+  background after every merge, so the next prompt never waits on them.
+
+Usage (from the project root, on the branch to integrate into):
+
+    python3 ralph_parallel.py --workers 4 --tasks prd.json --prompt PROMPT_build.md
+    python3 ralph_parallel.py --workers 8 --tasks IMPLEMENTATION_PLAN.md \\
+        --context-cmd 'gh issue list --state open --json number,title'
+
+The agent command defaults to the one in loop.sh (`claude -p ... --output-format=stream-json`);
+its output is logged per task under --log-dir. Only the standard library is used.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shlex
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_AGENT = "claude -p --dangerously-skip-permissions --output-format=stream-json --model opus --verbose"
+DEFAULT_CONTEXT = "git log -n 15 --format='%h %ad %s' --date=short"
+_CHECKBOX = re.compile(r"^(\s*[-*]\s+\[)([ xX])(\]\s+)(.*?)\s*$")
+
+
+def load_stream_events():
+    """Import docs/en/shared-scripts/stream_events.py when it is around."""
+    for directory in (HERE, os.path.join(HERE, "..", "..", "shared-scripts")):
+        if os.path.exists(os.path.join(directory, "stream_events.py")):
+            sys.path.insert(0, os.path.abspath(directory))
+            import stream_events
+            return stream_events
+    return None
+
+
+def log(message):
+    sys.stdout.write("[%s] %s\n" % (time.strftime("%H:%M:%S"), message))
+    sys.stdout.flush()
+
+
+def git(*args, cwd, check=True):
+    result = subprocess.run(("git",) + args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if check and result.returncode != 0:
+        raise RuntimeError("git %s failed: %s" % (" ".join(args), result.stderr.strip()))
+    return result.stdout.strip() if check else result
+
+
+# --- task files ------------------------------------------------------------
+
+class TaskFile:
+    """Reads tasks from prd.json or IMPLEMENTATION_PLAN.md and ticks them off."""
+
+    def __init__(self, path):
+        self.path = path
+        self.kind = "prd" if path.endswith(".json") else "plan"
+
+    def tasks(self, text):
+        """Return dicts with id, title, detail, priority, done."""
+        if self.kind == "prd":
+            stories = json.loads(text).get("userStories") or []
+            tasks = []
+            for index, story in enumerate(stories):
+                criteria = "\n".join("- %s" % item for item in story.get("acceptanceCriteria") or [])
+                tasks.append({
+                    "id": str(story.get("id") or "story-%d" % index),
+                    "title": story.get("title", ""),
+                    "detail": "%s\n\nAcceptance criteria:\n%s" % (story.get("description", ""), criteria),
+                    "priority": story.get("priority", index + 1),
+                    "done": bool(story.get("passes")),
+                })
+            return tasks
+        tasks = []
+        for line in text.splitlines():
+            match = _CHECKBOX.match(line)
+            if match:
+                item = match.group(4)
+                tasks.append({
+                    "id": "plan-" + hashlib.sha1(item.encode()).hexdigest()[:10],
+                    "title": item,
+                    "detail": item,
+                    "priority": len(tasks) + 1,
+                    "done": match.group(2) != " ",
+                })
+        return tasks
+
+    def mark_done(self, text, task_id):
+        if self.kind == "prd":
+            prd = json.loads(text)
+            for story in prd.get("userStories") or []:
+                if str(story.get("id")) == task_id:
+                    story["passes"] = True
+            return json.dumps(prd, indent=2, ensure_ascii=False) + "\n"
+        lines = text.splitlines(True)
+        for number, line in enumerate(lines):
+            match = _CHECKBOX.match(line)
+            if match and match.group(2) == " " and \
+                    "plan-" + hashlib.sha1(match.group(4).encode()).hexdigest()[:10] == task_id:
+                lines[number] = _CHECKBOX.sub(r"\g<1>x\g<3>\g<4>", line.rstrip("\n")) + ("\n" if line.endswith("\n") else "")
+                break
+        return "".join(lines)
+
+
+# --- leases ----------------------------------------------------------------
+
+class LeaseStore:
+    """SQLite task leases shared by every worker (and every orchestrator) on the repo."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        detail TEXT NOT NULL,
+        priority REAL NOT NULL,
+        state TEXT NOT NULL DEFAULT 'pending',
+        owner TEXT,
+        lease_expires REAL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        merged_commit TEXT,
+        updated REAL
+    );
+    """
+
+    def __init__(self, path, max_attempts):
+        self.path = path
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _transaction(self, work):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            result = work(conn)
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def sync(self, tasks):
+        """Add new tasks; tasks ticked off in the file become done."""
+        def work(conn):
+            now = time.time()
+            for task in tasks:
+                conn.execute(
+                    "INSERT OR IGNORE INTO tasks (id, title, detail, priority, updated) VALUES (?, ?, ?, ?, ?)",
+                    (task["id"], task["title"], task["detail"], task["priority"], now))
+                if task["done"]:
+                    conn.execute("UPDATE tasks SET state = 'done', owner = NULL, updated = ? "
+                                 "WHERE id = ? AND state != 'done'", (now, task["id"]))
+                else:
+                    conn.execute("UPDATE tasks SET title = ?, detail = ?, priority = ? WHERE id = ?",
+                                 (task["title"], task["detail"], task["priority"], task["id"]))
+        self._transaction(work)
+
+    def reclaim(self, host):
+        """Release leases held by dead processes on this host."""
+        def work(conn):
+            released = 0
+            for row in conn.execute("SELECT id, owner FROM tasks WHERE state = 'leased'").fetchall():
+                owner_host, _, rest = (row["owner"] or "").partition(":")
+                pid = rest.split(":")[0]
+                if owner_host == host and pid.isdigit() and not _alive(int(pid)):
+                    conn.execute("UPDATE tasks SET state = 'pending', owner = NULL WHERE id = ?", (row["id"],))
+                    released += 1
+            return released
+        return self._transaction(work)
+
+    def acquire(self, owner, ttl):
+        def work(conn):
+            now = time.time()
+            row = conn.execute(
+                "SELECT * FROM tasks WHERE attempts < ? AND "
+                "(state = 'pending' OR (state = 'leased' AND lease_expires < ?)) "
+                "ORDER BY priority, rowid LIMIT 1", (self.max_attempts, now)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE tasks SET state = 'leased', owner = ?, lease_expires = ?, "
+                         "attempts = attempts + 1, updated = ? WHERE id = ?",
+                         (owner, now + ttl, now, row["id"]))
+            return dict(row)
+        return self._transaction(work)
+
+    def renew(self, task_id, owner, ttl):
+        def work(conn):
+            return conn.execute("UPDATE tasks SET lease_expires = ? WHERE id = ? AND owner = ? AND state = 'leased'",
+                                (time.time() + ttl, task_id, owner)).rowcount
+        return self._transaction(work) == 1
+
+    def finish(self, task_id, owner, state, commit=None):
+        """state: done, pending (retry) or failed. Retries past max_attempts become failed."""
+        def work(conn):
+            conn.execute(
+                "UPDATE tasks SET state = CASE WHEN ? = 'pending' AND attempts >= ? THEN 'failed' ELSE ? END, "
+                "owner = NULL, lease_expires = NULL, merged_commit = COALESCE(?, merged_commit), updated = ? "
+                "WHERE id = ? AND owner = ?",
+                (state, self.max_attempts, state, commit, time.time(), task_id, owner))
+        self._transaction(work)
+
+    def counts(self):
+        conn = self._connect()
+        try:
+            now = time.time()
+            counts = {state: n for state, n in conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state")}
+            counts["runnable"] = conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE attempts < ? AND "
+                "(state = 'pending' OR (state = 'leased' AND lease_expires < ?))",
+                (self.max_attempts, now)).fetchone()[0]
+            return counts
+        finally:
+            conn.close()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# --- background helpers ----------------------------------------------------
+
+class ContextPrefetcher:
+    """Runs the context commands in the background; prompts read the last snapshot."""
+
+    def __init__(self, commands, cwd, interval):
+        self.commands = commands
+        self.cwd = cwd
+        self.interval = interval
+        self.snapshot = ""
+        self.ready = threading.Event()
+        self.wake = threading.Event()
+        self.stop = threading.Event()
+
+    def refresh(self):
+        parts = []
+        for command in self.commands:
+            result = subprocess.run(command, shell=True, cwd=self.cwd, stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT, text=True)
+            parts.append("$ %s\n%s" % (command, result.stdout.strip()))
+        self.snapshot = "\n\n".join(parts)
+        self.ready.set()
+
+    def run(self):
+        while not self.stop.is_set():
+            self.refresh()
+            self.wake.wait(self.interval)
+            self.wake.clear()
+
+    def get(self):
+        self.ready.wait()
+        return self.snapshot
+
+
+class Pusher:
+    """Pushes the integration branch in batches, off the workers' critical path."""
+
+    def __init__(self, orchestrator, interval, remote):
+        self.orch = orchestrator
+        self.interval = interval
+        self.remote = remote
+        self.pending = 0
+        self.pushes = 0
+        self.pushed_merges = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stop = threading.Event()
+
+    def notify(self):
+        with self.lock:
+            self.pending += 1
+        self.wake.set()
+
+    def run(self):
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+            if not self.stop.is_set():
+                # Let more merges land so they go out in one push.
+                self.stop.wait(self.interval)
+            pushed = self.flush()
+            if self.stop.is_set():
+                break
+        # A merge can notify() while the last push is in flight; drain it.
+        while pushed and self.pending and self.remote:
+            pushed = self.flush()
+        if self.pending and self.remote:
+            log("WARNING: %d merged task(s) were NOT pushed and exist only on local branch %s; "
+                "push it to %s by hand" % (self.pending, self.orch.branch, self.remote))
+
+    def flush(self):
+        """Push the merges noted so far; False (batch kept in pending) if the push failed."""
+        with self.lock:
+            batch, self.pending = self.pending, 0
+        if not batch or not self.remote:
+            return True
+        branch = self.orch.branch
+        for attempt in range(5):
+            result = git("push", self.remote, "%s:refs/heads/%s" % (branch, branch), cwd=self.orch.root, check=False)
+            if result.returncode == 0:
+                self.pushes += 1
+                self.pushed_merges += batch
+                log("pushed %d merged task(s) to %s/%s" % (batch, self.remote, branch))
+                return True
+            self.failures += 1
+            log("push rejected (%s); merging %s/%s and retrying" % (result.stderr.strip().splitlines()[-1:], self.remote, branch))
+            with self.orch.merge_lock:
+                fetched = git("fetch", self.remote, branch, cwd=self.orch.root, check=False)
+                if fetched.returncode == 0:
+                    merged = git("merge", "--no-edit", "FETCH_HEAD", cwd=self.orch.root, check=False)
+                    if merged.returncode != 0:
+                        git("merge", "--abort", cwd=self.orch.root, check=False)
+                        log("remote changes conflict with merged tasks; resolve and push %s by hand" % branch)
+                        break
+            time.sleep(min(30, 2 ** attempt))
+        else:
+            log("giving up on push after 5 attempts; %d merged task(s) are local only" % batch)
+        with self.lock:
+            self.pending += batch
+        return False
+
+
+# --- orchestrator ----------------------------------------------------------
+
+class Orchestrator:
+    def __init__(self, args):
+        self.args = args
+        self.root = git("rev-parse", "--show-toplevel", cwd=os.getcwd())
+        common = git("rev-parse", "--git-common-dir", cwd=self.root)
+        self.state_dir = os.path.join(self.root, common) if not os.path.isabs(common) else common
+        self.state_dir = os.path.join(self.state_dir, "ralph")
+        os.makedirs(self.state_dir, exist_ok=True)
+        self.branch = git("branch", "--show-current", cwd=self.root)
+        if not self.branch:
+            raise SystemExit("Error: not on a branch (detached HEAD)")
+        if git("status", "--porcelain", "--untracked-files=no", cwd=self.root):
+            raise SystemExit("Error: the working tree has uncommitted changes; commit or stash them first")
+
+        self.task_file = TaskFile(args.tasks)
+        self.task_path = os.path.join(self.root, args.tasks)
+        self.prompt_path = os.path.join(self.root, args.prompt)
+        for path in (self.task_path, self.prompt_path):
+            if not os.path.isfile(path):
+                raise SystemExit("Error: %s not found" % path)
+
+        self.leases = LeaseStore(os.path.join(self.state_dir, "leases.sqlite"), args.max_attempts)
+        self.host = socket.gethostname()
+        self.merge_lock = threading.Lock()
+        self.git_lock = threading.Lock()
+        self.stop = threading.Event()
+        self.budget_lock = threading.Lock()
+        self.started_tasks = 0
+        self.stats = {"merged": 0, "no_changes": 0, "agent_failed": 0, "conflicts": 0, "errors": 0}
+        self.processes = {}
+
+        self.log_dir = os.path.join(self.root, args.log_dir, "parallel-" + time.strftime("%Y%m%d-%H%M%S"))
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.stream_events = load_stream_events()
+        self.context = ContextPrefetcher(args.context_cmd if args.context_cmd is not None else [DEFAULT_CONTEXT],
+                                         self.root, args.context_interval)
+        self.pusher = Pusher(self, args.push_interval, None if args.no_push else args.remote)
+
+    def sync_tasks(self):
+        with open(self.task_path, encoding="utf-8") as handle:
+            self.leases.sync(self.task_file.tasks(handle.read()))
+
+    # -- worker ---------------------------------------------------------
+
+    def take_budget(self):
+        with self.budget_lock:
+            if self.args.max_tasks and self.started_tasks >= self.args.max_tasks:
+                return False
+            self.started_tasks += 1
+            return True
+
+    def count(self, key):
+        with self.budget_lock:
+            self.stats[key] += 1
+
+    def worktree(self, number, base):
+        path = os.path.join(self.state_dir, "worktrees", "worker-%d" % number)
+        branch = "ralph/worker-%d" % number
+        with self.git_lock:
+            if not os.path.exists(os.path.join(path, ".git")):
+                git("worktree", "prune", cwd=self.root)
+                git("worktree", "add", "--force", "-B", branch, path, base, cwd=self.root)
+            else:
+                # A failed attempt can leave edits behind; drop them first or
+                # the checkout refuses to overwrite them.
+                git("reset", "-q", "--hard", cwd=path)
+                git("clean", "-qfd", cwd=path)
+                git("checkout", "-q", "-B", branch, base, cwd=path)
+        return path
+
+    def build_prompt(self, number, task):
+        with open(self.prompt_path, encoding="utf-8") as handle:
+            prompt = handle.read().rstrip()
+        return "\n".join([
+            prompt,
+            "",
+            "## Parallel worker assignment",
+            "",
+            "You are worker %d of %d. Other workers are implementing other tasks at the same time in separate "
+            "git worktrees." % (number, self.args.workers),
+            "",
+            "Task %s: %s" % (task["id"], task["title"]),
+            "",
+            task["detail"],
+            "",
+            "- Work ONLY on this task; ignore any instruction above to choose a task yourself.",
+            "- Do not edit %s. The orchestrator marks the task done once your commits are merged." % self.args.tasks,
+            "- Commit your work on the current branch. Do not push, create tags or switch branches: "
+            "the orchestrator merges and pushes in batches.",
+            "",
+            "## Recent context (prefetched)",
+            "",
+            self.context.get(),
+            "",
+        ])
+
+    def run_agent(self, number, task, cwd, prompt, run_log):
+        command = shlex.split(self.args.agent_cmd)
+        env = dict(os.environ, RALPH_WORKER=str(number), RALPH_TASK_ID=task["id"])
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, text=True)
+        self.processes[number] = process
+        writer = threading.Thread(target=_write_stdin, args=(process, prompt), daemon=True)
+        writer.start()
+        if self.stream_events:
+            with open(run_log + ".json", "w") as raw, open(run_log + ".events.log", "w") as events:
+                processor = self.stream_events.StreamProcessor(raw=raw, log=events, signal_mode="any")
+                for line in process.stdout:
+                    processor.feed(line)
+            with open(run_log + ".summary.json", "w") as handle:
+                json.dump(processor.summary(), handle, indent=2)
+                handle.write("\n")
+        else:
+            with open(run_log + ".log", "w") as handle:
+                for line in process.stdout:
+                    handle.write(line)
+        code = process.wait()
+        self.processes.pop(number, None)
+        return code
+
+    def heartbeat(self, task_id, owner, done):
+        while not done.wait(self.args.lease_ttl / 3.0):
+            self.leases.renew(task_id, owner, self.args.lease_ttl)
+
+    def merge(self, number, task, owner):
+        worker_branch = "ralph/worker-%d" % number
+        with self.merge_lock:
+            result = git("merge", "--no-ff", "--no-edit", "-m",
+                         "Merge ralph task %s: %s" % (task["id"], task["title"]), worker_branch,
+                         cwd=self.root, check=False)
+            if result.returncode != 0:
+                git("merge", "--abort", cwd=self.root, check=False)
+                self.count("conflicts")
+                self.leases.finish(task["id"], owner, "pending")
+                log("worker %d: %s conflicts with merged work; will retry on a fresh base" % (number, task["id"]))
+                return False
+            with open(self.task_path, encoding="utf-8") as handle:
+                text = handle.read()
+            with open(self.task_path, "w", encoding="utf-8") as handle:
+                handle.write(self.task_file.mark_done(text, task["id"]))
+            git("add", self.args.tasks, cwd=self.root)
+            if git("diff", "--cached", "--quiet", cwd=self.root, check=False).returncode != 0:
+                git("commit", "-q", "-m", "ralph: mark %s done" % task["id"], cwd=self.root)
+            commit = git("rev-parse", "HEAD", cwd=self.root)
+            self.leases.finish(task["id"], owner, "done", commit)
+            self.count("merged")
+        self.pusher.notify()
+        self.context.wake.set()
+        return True
+
+    def worker(self, number):
+        owner = "%s:%d:worker-%d" % (self.host, os.getpid(), number)
+        iteration = 0
+        while not self.stop.is_set():
+            if not self.take_budget():
+                return
+            task = self.leases.acquire(owner, self.args.lease_ttl)
+            if task is None:
+                with self.budget_lock:
+                    self.started_tasks -= 1
+                counts = self.leases.counts()
+                if not counts.get("leased") and not counts["runnable"]:
+                    return
+                # Another worker's task may still fail and come back; wait for it.
+                self.stop.wait(self.args.poll)
+                continue
+
+            iteration += 1
+            try:
+                if not self.run_task(number, task, owner, iteration):
+                    return
+            except Exception as error:
+                # One git or I/O failure must not orphan the lease or end the worker.
+                self.count("errors")
+                self.leases.finish(task["id"], owner, "pending")
+                log("worker %d: %s failed: %s" % (number, task["id"], error))
+
+    def run_task(self, number, task, owner, iteration):
+        """One attempt at a leased task; returns False when the run is stopping."""
+        started = time.time()
+        base = git("rev-parse", self.branch, cwd=self.root)
+        path = self.worktree(number, base)
+        log("worker %d: %s %s (attempt %d)" % (number, task["id"], task["title"], task["attempts"] + 1))
+
+        done = threading.Event()
+        beat = threading.Thread(target=self.heartbeat, args=(task["id"], owner, done), daemon=True)
+        beat.start()
+        run_log = os.path.join(self.log_dir, "worker-%d-%d-%s" % (number, iteration, re.sub(r"\W+", "_", task["id"])))
+        try:
+            code = self.run_agent(number, task, path, self.build_prompt(number, task), run_log)
+        finally:
+            done.set()
+
+        if self.stop.is_set():
+            self.leases.finish(task["id"], owner, "pending")
+            return False
+        head = git("rev-parse", "HEAD", cwd=path)
+        elapsed = time.time() - started
+        if code != 0:
+            self.count("agent_failed")
+            self.leases.finish(task["id"], owner, "pending")
+            log("worker %d: %s agent exited %d after %.1fs" % (number, task["id"], code, elapsed))
+        elif head == base:
+            self.count("no_changes")
+            self.leases.finish(task["id"], owner, "pending")
+            log("worker %d: %s produced no commits after %.1fs" % (number, task["id"], elapsed))
+        elif self.merge(number, task, owner):
+            log("worker %d: %s merged after %.1fs" % (number, task["id"], elapsed))
+        return True
+
+    # -- main -----------------------------------------------------------
+
+    def shutdown(self, *_):
+        if not self.stop.is_set():
+            log("stopping: waiting for agents to exit, releasing their tasks")
+        self.stop.set()
+        for process in list(self.processes.values()):
+            if process.poll() is None:
+                process.terminate()
+
+    def run(self):
+        released = self.leases.reclaim(self.host)
+        if released:
+            log("released %d lease(s) left by an earlier run" % released)
+        self.sync_tasks()
+        counts = self.leases.counts()
+        log("branch %s: %d runnable task(s), %d done, %d worker(s), logs in %s" % (
+            self.branch, counts["runnable"], counts.get("done", 0), self.args.workers, self.log_dir))
+
+        started = time.time()
+        helpers = [threading.Thread(target=self.context.run, daemon=True),
+                   threading.Thread(target=self.pusher.run, daemon=True)]
+        for thread in helpers:
+            thread.start()
+        workers = [threading.Thread(target=self.worker, args=(n,), name="worker-%d" % n)
+                   for n in range(1, self.args.workers + 1)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            while thread.is_alive():
+                thread.join(0.5)
+
+        self.context.stop.set()
+        self.context.wake.set()
+        self.pusher.stop.set()
+        self.pusher.wake.set()
+        helpers[1].join()
+
+        counts = self.leases.counts()
+        summary = dict(self.stats, elapsed_s=round(time.time() - started, 1), pushes=self.pusher.pushes,
+                       push_retries=self.pusher.failures, unpushed=self.pusher.pending, remaining=counts["runnable"] + counts.get("leased", 0),
+                       failed=counts.get("failed", 0))
+        with open(os.path.join(self.log_dir, "summary.json"), "w") as handle:
+            json.dump(summary, handle, indent=2)
+            handle.write("\n")
+        log("done: " + ", ".join("%s=%s" % item for item in summary.items()))
+        return 0 if not summary["failed"] else 1
+
+
+def _write_stdin(process, text):
+    try:
+        process.stdin.write(text)
+        process.stdin.close()
+    except (BrokenPipeError, ValueError):
+        pass
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run N Ralph workers in parallel git worktrees.")
+    parser.add_argument("--workers", type=int, default=max(1, min(8, (os.cpu_count() or 2) // 2)))
+    parser.add_argument("--tasks", default="prd.json", help="prd.json or IMPLEMENTATION_PLAN.md (relative to the repo root)")
+    parser.add_argument("--prompt", default="PROMPT_build.md", help="base prompt file (relative to the repo root)")
+    parser.add_argument("--agent-cmd", default=os.environ.get("RALPH_AGENT_CMD", DEFAULT_AGENT),
+                        help="agent command; the prompt is written to its stdin")
+    parser.add_argument("--context-cmd", action="append",
+                        help="command whose output is added to every prompt (repeatable; default: recent commits)")
+    parser.add_argument("--context-interval", type=float, default=300, help="refresh context at least this often (s)")
+    parser.add_argument("--max-tasks", type=int, default=0, help="stop after starting this many tasks (0: no limit)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="attempts per task before it is marked failed")
+    parser.add_argument("--lease-ttl", type=float, default=3600, help="lease lifetime in seconds, renewed while the agent runs")
+    parser.add_argument("--poll", type=float, default=5, help="idle workers re-check for tasks this often (s)")
+    parser.add_argument("--remote", default="origin")
+    parser.add_argument("--push-interval", type=float, default=30, help="batch merges for this long before pushing (s)")
+    parser.add_argument("--no-push", action="store_true")
+    parser.add_argument("--log-dir", default="logs/ralph")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def main(argv=None):
+    orchestrator = Orchestrator(parse_args(argv))
+    signal.signal(signal.SIGINT, orchestrator.shutdown)
+    signal.signal(signal.SIGTERM, orchestrator.shutdown)
+    return orchestrator.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""Single-pass validator for Ralph's prd.json.
+
+Reads the PRD once (or streams `userStories` one story at a time for large
+files) and reports every problem with its JSON path:
+
+- required fields and their types (id, title, priority, category,
+  acceptanceCriteria, passes, description; notes and dependsOn when present)
+- duplicate story ids
+- priority ordering: priorities must be unique; stories listed out of
+  priority order are a warning
+- references between stories (`dependsOn`): unknown ids, self references,
+  dependencies on a story with a later priority, and cycles
+
+Usage:
+    python3 validate_prd.py [prd.json] [--format text|json] [--strict] [--stream]
+
+Exit status: 0 valid, 1 invalid (errors, or warnings with --strict),
+2 the file cannot be read or is not JSON.
+
+Only the standard library is used so the loops can call it with any python3.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# field -> (type check, expected type for the error message)
+REQUIRED_FIELDS = {
+    "id": (lambda v: isinstance(v, str) and v.strip() != "", "a non-empty string"),
+    "title": (lambda v: isinstance(v, str) and v.strip() != "", "a non-empty string"),
+    "priority": (lambda v: isinstance(v, int) and not isinstance(v, bool) and v >= 1, "an integer >= 1"),
+    "category": (lambda v: isinstance(v, str) and v.strip() != "", "a non-empty string"),
+    "acceptanceCriteria": (lambda v: isinstance(v, list) and len(v) > 0, "a non-empty array"),
+    "passes": (lambda v: isinstance(v, bool), "a boolean"),
+    "description": (lambda v: isinstance(v, str), "a string"),
+}
+OPTIONAL_FIELDS = {
+    "notes": (lambda v: isinstance(v, str), "a string"),
+    "dependsOn": (lambda v: isinstance(v, list), "an array"),
+}
+
+# Files at least this large are streamed unless --stream/--no-stream says otherwise.
+STREAM_THRESHOLD = 64 * 1024 * 1024
+
+
+class PRDError(Exception):
+    """The file cannot be read or parsed at all."""
+
+
+class Report:
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+
+    def error(self, path, code, message):
+        self.errors.append({"path": path, "code": code, "message": message})
+
+    def warning(self, path, code, message):
+        self.warnings.append({"path": path, "code": code, "message": message})
+
+
+def story_path(index, field=None):
+    path = "$.userStories[%d]" % index
+    return path + "." + field if field else path
+
+
+class Validator:
+    """Checks stories one at a time; cross-story checks run in `finish`."""
+
+    def __init__(self):
+        self.report = Report()
+        self.count = 0
+        self.ids = {}          # id -> first index
+        self.priorities = {}   # priority -> first index
+        self.last_priority = None
+        self.depends = []      # (index, story id, priority, [(position, dep id)])
+
+    def check_top(self, key, value):
+        if key in ("project", "description") and not isinstance(value, str):
+            self.report.error("$." + key, "type", "%s must be a string" % key)
+
+    def add_story(self, index, story):
+        self.count += 1
+        if not isinstance(story, dict):
+            self.report.error(story_path(index), "type", "user story must be an object")
+            return
+
+        valid = {}
+        for field, (check, expected) in REQUIRED_FIELDS.items():
+            if field not in story:
+                self.report.error(story_path(index, field), "missing", "missing required field '%s'" % field)
+            elif not check(story[field]):
+                self.report.error(story_path(index, field), "type", "%s must be %s" % (field, expected))
+            else:
+                valid[field] = story[field]
+        for field, (check, expected) in OPTIONAL_FIELDS.items():
+            if field in story and not check(story[field]):
+                self.report.error(story_path(index, field), "type", "%s must be %s" % (field, expected))
+
+        if "acceptanceCriteria" in valid:
+            for position, criterion in enumerate(valid["acceptanceCriteria"]):
+                if not isinstance(criterion, str) or not criterion.strip():
+                    self.report.error("%s[%d]" % (story_path(index, "acceptanceCriteria"), position),
+                                      "type", "acceptance criterion must be a non-empty string")
+
+        story_id = valid.get("id")
+        if story_id is not None:
+            if story_id in self.ids:
+                self.report.error(story_path(index, "id"), "duplicate-id",
+                                  "duplicate id '%s' (first used at %s)" % (story_id, story_path(self.ids[story_id])))
+            else:
+                self.ids[story_id] = index
+
+        priority = valid.get("priority")
+        if priority is not None:
+            if priority in self.priorities:
+                self.report.error(story_path(index, "priority"), "duplicate-priority",
+                                  "priority %d is also used by %s" % (priority, story_path(self.priorities[priority])))
+            else:
+                self.priorities[priority] = index
+            if self.last_priority is not None and priority < self.last_priority:
+                self.report.warning(story_path(index, "priority"), "priority-order",
+                                    "priority %d is listed after priority %d" % (priority, self.last_priority))
+            self.last_priority = priority
+
+        depends = story.get("dependsOn")
+        if isinstance(depends, list) and depends:
+            refs = []
+            for position, dep in enumerate(depends):
+                if isinstance(dep, str):
+                    refs.append((position, dep))
+                else:
+                    self.report.error("%s[%d]" % (story_path(index, "dependsOn"), position),
+                                      "type", "dependsOn entries must be story ids")
+            self.depends.append((index, story_id, priority, refs))
+
+    def finish(self):
+        """Reference checks need every id, so they run after the last story."""
+        index_priority = {index: priority for priority, index in self.priorities.items()}
+        priority_of = {story_id: index_priority.get(index) for story_id, index in self.ids.items()}
+        graph = {}
+
+        for index, story_id, priority, refs in self.depends:
+            for position, dep in refs:
+                path = "%s[%d]" % (story_path(index, "dependsOn"), position)
+                if dep not in self.ids:
+                    self.report.error(path, "unknown-reference", "depends on unknown story '%s'" % dep)
+                elif dep == story_id:
+                    self.report.error(path, "self-reference", "story depends on itself")
+                else:
+                    dep_priority = priority_of.get(dep)
+                    if priority is not None and dep_priority is not None and dep_priority > priority:
+                        self.report.error(path, "reference-order",
+                                          "depends on '%s' (priority %d), which runs after this story (priority %d)"
+                                          % (dep, dep_priority, priority))
+                    if story_id is not None:
+                        graph.setdefault(story_id, []).append(dep)
+
+        for cycle in find_cycles(graph):
+            index = self.ids[cycle[0]]
+            self.report.error(story_path(index, "dependsOn"), "reference-cycle",
+                              "dependency cycle: %s" % " -> ".join(cycle + [cycle[0]]))
+
+
+def find_cycles(graph):
+    """Return one representative id list per dependency cycle (iterative DFS)."""
+    state = {}  # id -> 1 on stack, 2 done
+    cycles = []
+    for start in graph:
+        if state.get(start):
+            continue
+        stack = [(start, iter(graph.get(start, ())))]
+        path = [start]
+        state[start] = 1
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                path.pop()
+                state[node] = 2
+            elif state.get(child) == 1:
+                cycles.append(path[path.index(child):])
+            elif not state.get(child):
+                state[child] = 1
+                path.append(child)
+                stack.append((child, iter(graph.get(child, ()))))
+    return cycles
+
+
+def validate_document(prd, validator):
+    if not isinstance(prd, dict):
+        validator.report.error("$", "type", "PRD must be a JSON object")
+        return
+    for key, value in prd.items():
+        if key != "userStories":
+            validator.check_top(key, value)
+    stories = prd.get("userStories")
+    if stories is None:
+        validator.report.error("$.userStories", "missing", "missing required field 'userStories'")
+    elif not isinstance(stories, list):
+        validator.report.error("$.userStories", "type", "userStories must be an array")
+    else:
+        for index, story in enumerate(stories):
+            validator.add_story(index, story)
+
+
+class _Reader:
+    """Buffered reader that hands complete JSON values to raw_decode."""
+
+    WHITESPACE = " \t\n\r"
+
+    def __init__(self, handle, chunk_size=1 << 20):
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.handle.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in self.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise PRDError("expected '%s' at byte offset ~%d" % (char, self.pos))
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except ValueError as exc:
+                # Incomplete value at the end of the buffer: read more and retry.
+                if self._fill():
+                    continue
+                raise PRDError("invalid JSON: %s" % exc)
+            # A number can be cut at a chunk boundary; make sure it is complete.
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def validate_stream(handle, validator):
+    """Walk the top-level object, decoding one user story at a time."""
+    reader = _Reader(handle)
+    if reader.peek() != "{":
+        validate_document(reader.value(), validator)
+        return
+    reader.expect("{")
+    seen_stories = False
+    if reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            if key == "userStories" and reader.peek() == "[":
+                seen_stories = True
+                reader.expect("[")
+                index = 0
+                if reader.peek() == "]":
+                    reader.pos += 1
+                else:
+                    while True:
+                        validator.add_story(index, reader.value())
+                        index += 1
+                        if reader.peek() == ",":
+                            reader.pos += 1
+                            continue
+                        reader.expect("]")
+                        break
+            else:
+                value = reader.value()
+                if key == "userStories":
+                    seen_stories = True
+                    validator.report.error("$.userStories", "type", "userStories must be an array")
+                else:
+                    validator.check_top(key, value)
+            if reader.peek() == ",":
+                reader.pos += 1
+                continue
+            reader.expect("}")
+            break
+    if reader.peek():
+        raise PRDError("trailing data after the PRD object")
+    if not seen_stories:
+        validator.report.error("$.userStories", "missing", "missing required field 'userStories'")
+
+
+def validate_file(path, stream=None):
+    """Validate `path` and return a result dict (see `--format json`)."""
+    started = time.perf_counter()
+    if stream is None:
+        stream = os.path.getsize(path) >= STREAM_THRESHOLD
+    validator = Validator()
+    try:
+        with open(path, encoding="utf-8") as handle:
+            if stream:
+                validate_stream(handle, validator)
+            else:
+                try:
+                    prd = json.load(handle)
+                except ValueError as exc:
+                    raise PRDError("invalid JSON: %s" % exc)
+                validate_document(prd, validator)
+    except OSError as exc:
+        raise PRDError(str(exc))
+    validator.finish()
+    report = validator.report
+    return {
+        "file": path,
+        "valid": not report.errors,
+        "stories": validator.count,
+        "errors": report.errors,
+        "warnings": report.warnings,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def print_text(result, strict):
+    print("Validating PRD: %s" % result["file"])
+    print("-------------------------")
+    for item in result["errors"]:
+        print("FAIL: %s: %s" % (item["path"], item["message"]))
+    for item in result["warnings"]:
+        print("WARN: %s: %s" % (item["path"], item["message"]))
+    if result["errors"] or (strict and result["warnings"]):
+        print("FAIL: PRD validation failed (%d errors, %d warnings)" % (len(result["errors"]), len(result["warnings"])))
+    else:
+        print("SUCCESS: PRD is valid (%d stories)" % result["stories"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a Ralph prd.json in a single pass.")
+    parser.add_argument("file", nargs="?", default="prd.json")
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    parser.add_argument("--strict", action="store_true", help="treat warnings as failures")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--stream", dest="stream", action="store_true", default=None,
+                      help="decode userStories one at a time (default for files >= 64 MB)")
+    mode.add_argument("--no-stream", dest="stream", action="store_false", help="always load the whole file")
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.file):
+        message = "PRD file not found: %s" % args.file
+    else:
+        try:
+            result = validate_file(args.file, args.stream)
+            message = None
+        except PRDError as exc:
+            message = "%s: %s" % (args.file, exc)
+    if message:
+        if args.format == "json":
+            print(json.dumps({"file": args.file, "valid": False, "fatal": message}))
+        else:
+            print("FAIL: %s" % message)
+        return 2
+
+    failed = bool(result["errors"]) or (args.strict and bool(result["warnings"]))
+    result["valid"] = not failed
+    if args.format == "json":
+        print(json.dumps(result, indent=2))
+    else:
+        print_text(result, args.strict)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
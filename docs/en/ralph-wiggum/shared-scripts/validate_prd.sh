@@ -1,7 +1,37 @@
 #!/usr/bin/env bash
+# Validate a Ralph prd.json: validate_prd.sh [prd.json] [--format json] [--strict]
+#
+# Runs validate_prd.py (one pass over the file, every error with its JSON
+# path). Without python3 it falls back to a single jq pass that checks
+# required fields and duplicate ids only.
 set -e
 
-FILE=${1:-prd.json}
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+if command -v python3 >/dev/null 2>&1; then
+  for candidate in "$SCRIPT_DIR/validate_prd.py" "$SCRIPT_DIR/../../shared-scripts/validate_prd.py"; do
+    if [ -f "$candidate" ]; then
+      exec python3 "$candidate" "$@"
+    fi
+  done
+fi
+
+# Same arguments as validate_prd.py; the jq pass always prints text.
+FILE=""
+while [ $# -gt 0 ]; do
+  case "$1" in
+    --format)
+      shift
+      ;;
+    -*)
+      ;;
+    *)
+      [ -n "$FILE" ] || FILE="$1"
+      ;;
+  esac
+  [ $# -gt 0 ] && shift
+done
+FILE=${FILE:-prd.json}
 
 if [ ! -f "$FILE" ]; then
   echo "FAIL: PRD file not found: $FILE"
@@ -9,43 +39,27 @@ if [ ! -f "$FILE" ]; then
 fi
 
 if ! command -v jq >/dev/null 2>&1; then
-  echo "FAIL: jq is required but not installed"
+  echo "FAIL: python3 or jq is required"
   exit 1
 fi
 
-REQUIRED_FIELDS=("id" "title" "priority" "category" "acceptanceCriteria" "passes" "description")
-ERROR=0
-
 echo "Validating PRD: $FILE"
 echo "-------------------------"
 
-# Collect all user story IDs
-IDS=$(jq -r '.userStories[].id' "$FILE")
+ERRORS=$(jq -r '
+  ["id", "title", "priority", "category", "acceptanceCriteria", "passes", "description"] as $required
+  | (.userStories // []) as $stories
+  | ($stories | to_entries[] | .key as $i | .value as $story
+      | $required[] as $field | select(($story | type) != "object" or ($story | has($field) | not))
+      | "FAIL: $.userStories[\($i)].\($field): missing required field '"'"'\($field)'"'"'"),
+    ([$stories[] | objects | .id] | group_by(.)[] | select(length > 1)
+      | "FAIL: Duplicate userStory ID: \(.[0])")
+' "$FILE")
 
-# Check for duplicate IDs
-DUP_IDS=$(echo "$IDS" | sort | uniq -d)
-if [ -n "$DUP_IDS" ]; then
-  echo "FAIL: Duplicate userStory IDs:"
-  echo "$DUP_IDS"
-  ERROR=1
-fi
-
-# Validate each user story
-COUNT=$(jq '.userStories | length' "$FILE")
-
-for ((i=0; i<COUNT; i++)); do
-  for FIELD in "${REQUIRED_FIELDS[@]}"; do
-    EXISTS=$(jq ".userStories[$i] | has(\"$FIELD\")" "$FILE")
-    if [ "$EXISTS" != "true" ]; then
-      echo "FAIL: Missing field '$FIELD' in userStory index $i"
-      ERROR=1
-    fi
-  done
-done
-
-if [ "$ERROR" -eq 0 ]; then
+if [ -z "$ERRORS" ]; then
   echo "SUCCESS: PRD is valid"
 else
+  echo "$ERRORS"
   echo "FAIL: PRD validation failed"
   exit 1
-fi
\ No newline at end of file
+fi
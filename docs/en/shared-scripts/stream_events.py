@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Single-pass processor for `claude --output-format stream-json` output.
+
+Replaces the `grep '^{' | tee raw.json | jq stream_text` pipelines (and the
+extra `jq`/`grep` passes over raw.json afterwards) in the loop scripts. Each
+line is parsed exactly once to:
+
+- render assistant text live (same formatting as the loops' `stream_text` jq filter)
+- tee the raw JSON lines to `--raw` (existing log layout is unchanged)
+- write a compact one-line-per-event log to `--log`
+- detect the promise signal as soon as the `result` event arrives (`--signal-file`)
+- report per-turn token usage and latency (`--summary`, `--report`)
+
+Usage:
+    claude --print --verbose --output-format stream-json "$PROMPT" \\
+      | python3 stream_events.py --raw raw.json --signal-file signal.txt
+
+    signal="$(cat signal.txt)"   # COMPLETE / ALL_RESOLVED / ISSUES_REMAINING / empty
+
+Only the standard library is used so the loops can call it with any python3.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+
+# Checked in this order, matching check_control_signal in spec-review-loop.sh.
+SIGNALS = ("COMPLETE", "ALL_RESOLVED", "ISSUES_REMAINING")
+
+_LINE_PROMISE = re.compile(
+    r"^[ \t]*<promise>(%s)</promise>[ \t]*$" % "|".join(SIGNALS), re.MULTILINE
+)
+_ANY_PROMISE = re.compile(r"<promise>(%s)</promise>" % "|".join(SIGNALS))
+
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
+def detect_signal(text, mode="line"):
+    """Return the highest-priority promise signal in `text`, or "".
+
+    mode "line" only accepts a tag on its own line (the spec-review-loop
+    contract); mode "any" accepts it anywhere (the ralph loops' contract).
+    """
+    pattern = _LINE_PROMISE if mode == "line" else _ANY_PROMISE
+    found = set(pattern.findall(text or ""))
+    for signal in SIGNALS:
+        if signal in found:
+            return signal
+    return ""
+
+
+def render_text(text):
+    """Format assistant text like the loops' jq `stream_text` filter."""
+    return text.replace("\n", "\r\n") + "\r\n\n"
+
+
+class StreamProcessor:
+    """Consumes stream-json lines one at a time and keeps running totals.
+
+    A turn is one assistant message (one API call). Claude emits one
+    `assistant` event per content block, all sharing the message id and usage,
+    so usage is counted once per message id. Turn latency is the wall-clock
+    time from the previous event (prompt sent or tool result) to the first
+    event of the message.
+    """
+
+    def __init__(self, out=None, raw=None, log=None, signal_mode="line", on_signal=None):
+        self.out = out
+        self.raw = raw
+        self.log = log
+        self.signal_mode = signal_mode
+        self.on_signal = on_signal
+
+        self.started = time.monotonic()
+        self.last_event = self.started
+        self.session_id = ""
+        self.model = ""
+        self.turns = []
+        self._turn_index = {}
+        self.result = None
+        self.signal = ""
+        self.events = 0
+        self.skipped = 0
+
+    def _elapsed(self, now):
+        return now - self.started
+
+    def _log(self, now, kind, detail=""):
+        if self.log is not None:
+            self.log.write("%8.3f %s %s\n" % (self._elapsed(now), kind, detail))
+            self.log.flush()
+
+    def feed(self, line):
+        """Process one line of output. Non-JSON lines are dropped."""
+        if not line.startswith("{"):
+            return
+        try:
+            event = json.loads(line)
+        except ValueError:
+            self.skipped += 1
+            return
+
+        if self.raw is not None:
+            self.raw.write(line if line.endswith("\n") else line + "\n")
+            self.raw.flush()
+
+        now = time.monotonic()
+        self.events += 1
+        kind = event.get("type", "")
+
+        if kind == "system":
+            self.session_id = event.get("session_id", self.session_id)
+            self.model = event.get("model", self.model)
+            self._log(now, "system", event.get("subtype", ""))
+        elif kind == "assistant":
+            self._assistant(event, now)
+        elif kind == "user":
+            self._log(now, "user", "tool_result")
+        elif kind == "result":
+            self._result(event, now)
+        else:
+            self._log(now, kind or "unknown")
+
+        self.last_event = now
+
+    def _assistant(self, event, now):
+        message = event.get("message") or {}
+        message_id = message.get("id") or "turn-%d" % (len(self.turns) + 1)
+
+        if message_id not in self._turn_index:
+            usage = message.get("usage") or {}
+            turn = {
+                "turn": len(self.turns) + 1,
+                "message_id": message_id,
+                "latency_ms": int((now - self.last_event) * 1000),
+            }
+            for field in USAGE_FIELDS:
+                turn[field] = int(usage.get(field) or 0)
+            self._turn_index[message_id] = turn
+            self.turns.append(turn)
+            if not self.model:
+                self.model = message.get("model", "")
+
+        for block in message.get("content") or []:
+            block_type = block.get("type")
+            if block_type == "text":
+                text = block.get("text") or ""
+                if self.out is not None:
+                    self.out.write(render_text(text))
+                    self.out.flush()
+                self._log(now, "assistant", "text %d chars" % len(text))
+            elif block_type == "tool_use":
+                self._log(now, "assistant", "tool_use %s" % block.get("name", ""))
+            else:
+                self._log(now, "assistant", block_type or "")
+
+    def _result(self, event, now):
+        self.result = event
+        self.signal = detect_signal(event.get("result") or "", self.signal_mode)
+        self._log(
+            now,
+            "result",
+            "%s turns=%s signal=%s"
+            % (event.get("subtype", ""), event.get("num_turns", ""), self.signal or "-"),
+        )
+        if self.on_signal is not None:
+            self.on_signal(self.signal)
+
+    def totals(self):
+        totals = {field: 0 for field in USAGE_FIELDS}
+        for turn in self.turns:
+            for field in USAGE_FIELDS:
+                totals[field] += turn[field]
+        return totals
+
+    def summary(self):
+        result = self.result or {}
+        return {
+            "session_id": self.session_id or result.get("session_id", ""),
+            "model": self.model,
+            "signal": self.signal,
+            "is_error": bool(result.get("is_error", False)),
+            "num_turns": result.get("num_turns", len(self.turns)),
+            "duration_ms": result.get("duration_ms"),
+            "duration_api_ms": result.get("duration_api_ms"),
+            "total_cost_usd": result.get("total_cost_usd"),
+            "wall_ms": int((time.monotonic() - self.started) * 1000),
+            "events": self.events,
+            "turns": self.turns,
+            "totals": self.totals(),
+            "result": result.get("result"),
+        }
+
+
+def format_report(summary):
+    """Human-readable per-turn usage table."""
+    lines = ["turn  latency_ms   input  output  cache_write  cache_read"]
+    for turn in summary["turns"]:
+        lines.append(
+            "%4d  %10d  %6d  %6d  %11d  %10d"
+            % (
+                turn["turn"],
+                turn["latency_ms"],
+                turn["input_tokens"],
+                turn["output_tokens"],
+                turn["cache_creation_input_tokens"],
+                turn["cache_read_input_tokens"],
+            )
+        )
+    totals = summary["totals"]
+    lines.append(
+        "total %10d  %6d  %6d  %11d  %10d"
+        % (
+            summary["wall_ms"],
+            totals["input_tokens"],
+            totals["output_tokens"],
+            totals["cache_creation_input_tokens"],
+            totals["cache_read_input_tokens"],
+        )
+    )
+    lines.append("signal: %s" % (summary["signal"] or "-"))
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Render and summarize claude stream-json output in a single pass."
+    )
+    parser.add_argument("input", nargs="?", help="stream-json file (default: stdin)")
+    parser.add_argument("--raw", help="append the raw JSON lines to this file (replaces tee)")
+    parser.add_argument("--log", help="write a compact one-line-per-event log")
+    parser.add_argument("--summary", help="write a JSON summary (signal, per-turn usage and latency)")
+    parser.add_argument("--signal-file", help="write the promise signal here when the result event arrives")
+    parser.add_argument(
+        "--signal-mode",
+        choices=("line", "any"),
+        default="line",
+        help="line: tag must be on its own line (default); any: tag anywhere in the result",
+    )
+    parser.add_argument("--no-render", action="store_true", help="do not print assistant text")
+    parser.add_argument("--report", action="store_true", help="print the per-turn usage table to stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    def write_signal(signal):
+        if args.signal_file:
+            with open(args.signal_file, "w") as handle:
+                handle.write(signal + "\n" if signal else "")
+
+    source = open(args.input) if args.input else sys.stdin
+    raw = open(args.raw, "w") if args.raw else None
+    log = open(args.log, "w") if args.log else None
+    if args.signal_file:
+        write_signal("")
+
+    processor = StreamProcessor(
+        out=None if args.no_render else sys.stdout,
+        raw=raw,
+        log=log,
+        signal_mode=args.signal_mode,
+        on_signal=write_signal,
+    )
+    try:
+        for line in source:
+            processor.feed(line)
+    finally:
+        for handle in (raw, log):
+            if handle is not None:
+                handle.close()
+        if source is not sys.stdin:
+            source.close()
+
+    summary = processor.summary()
+    if args.summary:
+        with open(args.summary, "w") as handle:
+            json.dump(summary, handle, indent=2)
+            handle.write("\n")
+    if args.report:
+        print(format_report(summary), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""Persistent issue index for spec-review-loop.sh.
+
+Parses every file in the issues directory once (reports `vN.md`,
+`-feedback.md`, `-reraised.md` and `human-approved-declines.md`) into a
+SQLite database and keeps it in sync incrementally: a file is re-parsed only
+when its size or mtime changes. Each issue gets a MinHash fingerprint of its
+character shingles, bucketed with LSH, so similar issues can be found without
+comparing against the whole history.
+
+Subcommands (all take --issues-dir and --db):
+
+    reraise --curr C --feedback F --output O [--candidates FILE]
+                            pre-detect re-raised issues (see below)
+    similar TEXT            most similar indexed issues across the history
+    sync | stats            refresh the index / print counts
+
+`reraise` compares the issues the implementer declined (previous feedback
+file, plus human-approved declines) with the unresolved issues in the
+current report:
+
+- declined issue id still in the report as `Fixed` / `Declined-Accepted`:
+  settled, not a re-raise
+- same issue id re-raised by Codex (Status `Declined`), or a near-duplicate
+  fingerprint: confirmed re-raise
+- same issue id reworded: ambiguous
+- declined issue id gone from the report: ambiguous, paired with the most
+  similar open issue; a re-raise reworded under a new issue id can score
+  arbitrarily low, so a low score alone never rules one out
+- human-approved declines accumulate over the whole history, so they only
+  ever produce confirmed near-duplicate matches
+
+With no ambiguous pairs it writes the re-raise report itself (same format as
+the LLM prompt in spec-review-loop.sh) and exits 0. Otherwise it writes the
+confirmed and ambiguous pairs to --candidates and exits 3, and the loop falls
+back to the LLM for the final decision.
+
+Only the standard library is used.
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import struct
+import sys
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 5
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20260130)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_SIG = struct.Struct("<%dQ" % NUM_PERM)
+
+# Estimated Jaccard similarity of the fingerprints.
+NEAR_DUPLICATE = 0.6
+# Below this a pair is only the fallback candidate for an unmatched decline.
+UNRELATED = 0.25
+
+RESOLVED = ("fixed", "declined-accepted")
+AMBIGUOUS_EXIT = 3
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was "
+    "were will with without not no can".split()
+)
+_HEADER = re.compile(r"^(#{2,3})\s+(.*?)\s*$")
+_FIELD = re.compile(r"^\s*(?:[-*]\s+)?\*\*([^*]+?)\*\*\s*(?:\([^)]*\))?\s*:\s*(.*)$")
+_ISSUE_TITLE = re.compile(r"^\[?Issue\s+#?(\d+)\]?(?:\s*\([^)]*\))?\s*[:.\-]\s*(.*)$", re.IGNORECASE)
+_DATED_TITLE = re.compile(r"^\[?\d{4}-\d{2}-\d{2}\]?\s*:\s*(.*)$")
+_CURRENT_ISSUE = re.compile(r"Issue\s+\[?#?(\d+)\]?\s*[-:]\s*(.*)$", re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    sort_key TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_by_kind ON files (dir, kind, sort_key);
+CREATE TABLE IF NOT EXISTS issues (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    ordinal INTEGER NOT NULL,
+    issue_id TEXT,
+    title TEXT NOT NULL,
+    status TEXT,
+    location TEXT,
+    body TEXT,
+    reasoning TEXT,
+    title_sig BLOB NOT NULL,
+    body_sig BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS issues_by_path ON issues (path);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    issue INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_by_bucket ON bands (band, bucket);
+CREATE INDEX IF NOT EXISTS bands_by_issue ON bands (issue);
+"""
+
+
+# --- fingerprints ----------------------------------------------------------
+
+def normalize(text):
+    words = re.sub(r"[^a-z0-9]+", " ", (text or "").lower()).split()
+    return " ".join(word for word in words if word not in _STOPWORDS)
+
+
+def shingles(text):
+    text = normalize(text)
+    if len(text) <= SHINGLE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE] for i in range(len(text) - SHINGLE + 1)}
+
+
+def minhash(text):
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") for s in shingles(text)]
+    if not hashes:
+        return [_PRIME] * NUM_PERM
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+def similarity(sig_a, sig_b):
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / float(NUM_PERM)
+
+
+def band_buckets(sig):
+    for band in range(BANDS):
+        chunk = sig[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack("<%dQ" % ROWS, *chunk), digest_size=8).digest()
+        yield band, struct.unpack("<q", digest)[0]
+
+
+# --- parsing ---------------------------------------------------------------
+
+def file_kind(name):
+    if name == "human-approved-declines.md":
+        return "declines"
+    for suffix, kind in (("-feedback.md", "feedback"), ("-reraised.md", "reraised"), ("-summary.md", "summary")):
+        if name.endswith(suffix):
+            return kind
+    return "report"
+
+
+def sort_key(name):
+    """Zero-padded natural key: ordering by it matches `sort -V` on the names."""
+    return re.sub(r"\d+", lambda m: m.group(0).zfill(12), name)
+
+
+def split_sections(text):
+    """Yield (level, title, parent, fields) for each ## / ### section."""
+    level = parent = title = None
+    fields = {}
+    current = None
+    parents = {}
+    for line in text.splitlines():
+        header = _HEADER.match(line)
+        if header:
+            if title is not None:
+                yield level, title, parent, fields
+            level, title = len(header.group(1)), header.group(2)
+            parents[level] = title
+            parent = parents.get(2) if level == 3 else None
+            fields, current = {}, None
+            continue
+        if title is None:
+            continue
+        field = _FIELD.match(line)
+        if field:
+            current = field.group(1).strip().lower()
+            fields[current] = field.group(2).strip()
+        elif current is not None and line.strip() and line.strip() != "---":
+            fields[current] = (fields[current] + "\n" + line.strip()).strip()
+    if title is not None:
+        yield level, title, parent, fields
+
+
+def parse_issues(kind, text):
+    """Return issue dicts for one file; `kind` comes from file_kind()."""
+    issues = []
+    for level, title, parent, fields in split_sections(text):
+        item = None
+        if kind == "report":
+            match = _ISSUE_TITLE.match(title)
+            if match and ("status" in fields or "problem" in fields):
+                item = {
+                    "kind": "issue",
+                    "issue_id": match.group(1),
+                    "title": match.group(2),
+                    "status": fields.get("status", "Open"),
+                    "location": fields.get("location", ""),
+                    "body": " ".join(fields.get(key, "") for key in ("problem", "suggested fix", "remaining work")),
+                    "reasoning": "",
+                }
+            elif level == 3 and (parent or "").lower().startswith("feedback review"):
+                item = {
+                    "kind": "review",
+                    "issue_id": match.group(1) if match else None,
+                    "title": match.group(2) if match else title,
+                    "status": fields.get("assessment", ""),
+                    "location": "",
+                    "body": fields.get("implementer's reasoning", ""),
+                    "reasoning": fields.get("response", ""),
+                }
+        elif kind == "feedback":
+            decision = fields.get("decision", "")
+            if "decline" in decision.lower():
+                match = _ISSUE_TITLE.match(title.strip("[]"))
+                item = {
+                    "kind": "declined",
+                    "issue_id": match.group(1) if match else None,
+                    "title": match.group(2) if match else title.strip("[]"),
+                    "status": decision,
+                    "location": fields.get("location", ""),
+                    "body": fields.get("suggestion", ""),
+                    "reasoning": fields.get("reasoning", ""),
+                }
+        elif kind == "declines":
+            match = _DATED_TITLE.match(title)
+            if match and ("original problem" in fields or "human's decision" in fields):
+                item = {
+                    "kind": "human-declined",
+                    "issue_id": None,
+                    "title": match.group(1),
+                    "status": fields.get("human's decision", ""),
+                    "location": fields.get("location", ""),
+                    "body": fields.get("original problem", ""),
+                    "reasoning": fields.get("implementer's reasoning", "") + "\n" + fields.get("human's reasoning", ""),
+                }
+        elif kind == "reraised":
+            current = _CURRENT_ISSUE.search(fields.get("current report issue", ""))
+            if current:
+                item = {
+                    "kind": "reraise",
+                    "issue_id": current.group(1),
+                    "title": current.group(2),
+                    "status": "",
+                    "location": "",
+                    "body": fields.get("previous declined issue", ""),
+                    "reasoning": fields.get("why this is a re-raise", ""),
+                }
+        if item is not None:
+            item["title"] = item["title"].strip()
+            issues.append(item)
+    return issues
+
+
+# --- index -----------------------------------------------------------------
+
+class Index:
+    def __init__(self, db_path, issues_dir):
+        parent = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(parent, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.executescript(SCHEMA)
+        self.dir = os.path.abspath(issues_dir)
+
+    def sync(self):
+        """Re-parse new or changed files, drop deleted ones. Returns files parsed."""
+        known = {path: (mtime, size) for path, mtime, size in
+                 self.conn.execute("SELECT path, mtime_ns, size FROM files WHERE dir = ?", (self.dir,))}
+        seen = set()
+        parsed = 0
+        try:
+            entries = [entry for entry in os.scandir(self.dir) if entry.name.endswith(".md") and entry.is_file()]
+        except FileNotFoundError:
+            entries = []
+        with self.conn:
+            for entry in entries:
+                stat = entry.stat()
+                seen.add(entry.path)
+                if known.get(entry.path) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                self._index_file(entry.path, entry.name, stat)
+                parsed += 1
+            for path in set(known) - seen:
+                self._forget(path)
+                self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        return parsed
+
+    def _forget(self, path):
+        self.conn.execute("DELETE FROM bands WHERE issue IN (SELECT id FROM issues WHERE path = ?)", (path,))
+        self.conn.execute("DELETE FROM issues WHERE path = ?", (path,))
+
+    def _index_file(self, path, name, stat):
+        kind = file_kind(name)
+        self._forget(path)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, dir, kind, sort_key, mtime_ns, size) VALUES (?, ?, ?, ?, ?, ?)",
+            (path, self.dir, kind, sort_key(name), stat.st_mtime_ns, stat.st_size),
+        )
+        if kind == "summary":
+            return
+        with open(path, encoding="utf-8", errors="replace") as handle:
+            text = handle.read()
+        for ordinal, item in enumerate(parse_issues(kind, text)):
+            title_sig = minhash(item["title"])
+            body_sig = minhash(item["title"] + " " + item["body"])
+            cursor = self.conn.execute(
+                "INSERT INTO issues (path, kind, ordinal, issue_id, title, status, location, body, reasoning,"
+                " title_sig, body_sig) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, item["kind"], ordinal, item["issue_id"], item["title"], item["status"], item["location"],
+                 item["body"], item["reasoning"], _SIG.pack(*title_sig), _SIG.pack(*body_sig)),
+            )
+            self.conn.executemany("INSERT INTO bands (band, bucket, issue) VALUES (?, ?, ?)",
+                                  [(band, bucket, cursor.lastrowid) for band, bucket in band_buckets(body_sig)])
+
+    def issues(self, path, kinds):
+        rows = self.conn.execute(
+            "SELECT id, kind, issue_id, title, status, location, body, reasoning, title_sig, body_sig"
+            " FROM issues WHERE path = ? AND kind IN (%s) ORDER BY ordinal" % ",".join("?" * len(kinds)),
+            (os.path.abspath(path),) + tuple(kinds),
+        )
+        return [_row(row) for row in rows]
+
+    def similar(self, text, limit=10):
+        sig = minhash(text)
+        ids = set()
+        for band, bucket in band_buckets(sig):
+            ids.update(issue for (issue,) in self.conn.execute(
+                "SELECT issue FROM bands WHERE band = ? AND bucket = ?", (band, bucket)))
+        if not ids:
+            return []
+        rows = self.conn.execute(
+            "SELECT id, kind, issue_id, title, status, location, body, reasoning, title_sig, body_sig, path"
+            " FROM issues WHERE id IN (%s)" % ",".join(str(i) for i in ids))
+        scored = []
+        for row in rows:
+            item = _row(row[:10])
+            item["path"] = row[10]
+            scored.append((similarity(sig, item["body_sig"]), item))
+        scored.sort(key=lambda pair: -pair[0])
+        return scored[:limit]
+
+    def stats(self):
+        files = dict(self.conn.execute("SELECT kind, COUNT(*) FROM files WHERE dir = ? GROUP BY kind", (self.dir,)))
+        issues = dict(self.conn.execute(
+            "SELECT issues.kind, COUNT(*) FROM issues JOIN files ON files.path = issues.path"
+            " WHERE files.dir = ? GROUP BY issues.kind", (self.dir,)))
+        return files, issues
+
+
+def _row(row):
+    keys = ("rowid", "kind", "issue_id", "title", "status", "location", "body", "reasoning")
+    item = dict(zip(keys, row[:8]))
+    item["title_sig"] = _SIG.unpack(row[8])
+    item["body_sig"] = _SIG.unpack(row[9])
+    return item
+
+
+# --- re-raise pre-detection ------------------------------------------------
+
+def is_resolved(status):
+    return (status or "").strip().lower() in RESOLVED
+
+
+def match_score(declined, issue):
+    return max(similarity(declined["title_sig"], issue["title_sig"]),
+               similarity(declined["body_sig"], issue["body_sig"]))
+
+
+def judge(declined, issue, near=NEAR_DUPLICATE, unrelated=UNRELATED):
+    """Return (verdict, score, reason); verdict is "confirmed", "ambiguous" or None."""
+    score = match_score(declined, issue)
+    same_id = declined["kind"] == "declined" and declined["issue_id"] and declined["issue_id"] == issue["issue_id"]
+    if same_id:
+        # Issue ids are preserved through the inner loop.
+        if (issue["status"] or "").strip().lower() == "declined":
+            return "confirmed", score, "same issue ID %s, kept open by Codex with Status `Declined`" % issue["issue_id"]
+        if score >= unrelated:
+            return "confirmed", score, "same issue ID %s, fingerprint similarity %.2f" % (issue["issue_id"], score)
+        return "ambiguous", score, "same issue ID %s but reworded (similarity %.2f)" % (issue["issue_id"], score)
+    if score >= near:
+        return "confirmed", score, "near-duplicate title/problem text (similarity %.2f)" % score
+    if score >= unrelated:
+        return "ambiguous", score, "similar title/problem text (similarity %.2f)" % score
+    return None, score, ""
+
+
+def classify(declined_items, current_issues):
+    """Return (confirmed, ambiguous) lists of (declined, issue, score, reason).
+
+    Each declined item is matched to its best unresolved issue in the
+    current report; resolved issues (Fixed, Declined-Accepted) never count.
+    A declined issue whose id is gone from the report is still ambiguous
+    without a similar open issue: only the LLM can tell whether one of them
+    is the same point reworded.
+    """
+    confirmed, ambiguous = [], []
+    open_issues = [issue for issue in current_issues if not is_resolved(issue["status"])]
+    by_id = {issue["issue_id"]: issue for issue in current_issues if issue["issue_id"]}
+    rank = {"confirmed": 2, "ambiguous": 1}
+    for declined in declined_items:
+        human = declined["kind"] == "human-declined"
+        same = None if human else by_id.get(declined["issue_id"])
+        if same is not None and is_resolved(same["status"]):
+            continue  # Codex accepted the decline (or the issue got fixed)
+        best = None
+        for issue in open_issues:
+            verdict, score, reason = judge(declined, issue)
+            if verdict and (best is None or (rank[verdict], score) > (rank[best[0]], best[2])):
+                best = (verdict, issue, score, reason)
+        if human:
+            if best is not None and best[0] == "confirmed":
+                confirmed.append((declined, best[1], best[2], best[3]))
+        elif best is not None:
+            verdict, issue, score, reason = best
+            (confirmed if verdict == "confirmed" else ambiguous).append((declined, issue, score, reason))
+        elif open_issues and same is None:
+            score, issue = max(((match_score(declined, issue), issue) for issue in open_issues),
+                               key=lambda pair: pair[0])
+            ambiguous.append((declined, issue, score, "no similar open issue (best similarity %.2f); "
+                              "check for a re-raise reworded under a new ID" % score))
+    return confirmed, ambiguous
+
+
+def _declined_label(declined):
+    if declined["kind"] == "human-declined":
+        return "%s (human-approved decline)" % declined["title"]
+    if declined["issue_id"]:
+        return "Issue %s - %s" % (declined["issue_id"], declined["title"])
+    return declined["title"]
+
+
+def _counter_argument(issue, reviews):
+    for review in reviews:
+        if review["issue_id"] == issue["issue_id"] or normalize(review["title"]) == normalize(issue["title"]):
+            if review["reasoning"]:
+                return _one_line(review["reasoning"])
+    return _one_line(issue["body"]) or "None given"
+
+
+def _one_line(text):
+    return " ".join(line.strip().lstrip("-* ").strip() for line in (text or "").splitlines() if line.strip())
+
+
+def _quote(text):
+    text = (text or "").strip() or "None recorded"
+    return "\n".join("> " + line for line in text.splitlines())
+
+
+def render_reraise_report(confirmed, reviews):
+    if not confirmed:
+        return "No re-raised issues detected.\n"
+    lines = [
+        "# Re-raised Issues Detected",
+        "",
+        "Human review required. The following issues appear to be re-raises of previously declined items.",
+        "",
+    ]
+    for number, (declined, issue, score, reason) in enumerate(confirmed, 1):
+        lines += [
+            "## Re-raised Issue %d" % number,
+            "",
+            "**Current Report Issue**: Issue %s - %s" % (issue["issue_id"], issue["title"]),
+            "**Previous Declined Issue**: %s" % _declined_label(declined),
+            "**Why This Is a Re-raise**: Matched by the issue index: %s." % reason,
+            "**Claude Code's Original Reasoning**:",
+            _quote(declined["reasoning"]),
+            "**Codex's Counter-argument**: %s" % _counter_argument(issue, reviews),
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def render_candidates(confirmed, ambiguous):
+    lines = ["# Re-raise Candidates (issue index)", ""]
+    for title, pairs in (("Confirmed", confirmed), ("Ambiguous (decide these)", ambiguous)):
+        lines += ["## " + title, ""]
+        for declined, issue, score, reason in pairs:
+            lines.append("- Current Issue %s - %s <-> previously declined: %s. Reason: %s"
+                         % (issue["issue_id"], issue["title"], _declined_label(declined), reason))
+        lines += [] if pairs else ["None."]
+        lines.append("")
+    return "\n".join(lines)
+
+
+def detect_reraises(index, curr_report, feedback, declines_file=None):
+    declined = index.issues(feedback, ("declined",)) if feedback and os.path.exists(feedback) else []
+    declines_file = declines_file or os.path.join(index.dir, "human-approved-declines.md")
+    if os.path.exists(declines_file):
+        declined += index.issues(declines_file, ("human-declined",))
+    current = index.issues(curr_report, ("issue",))
+    reviews = index.issues(curr_report, ("review",))
+    confirmed, ambiguous = classify(declined, current)
+    return confirmed, ambiguous, reviews
+
+
+# --- CLI -------------------------------------------------------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Issue index and re-raise pre-detection for spec-review-loop.sh.")
+    parser.add_argument("--issues-dir", required=True)
+    parser.add_argument("--db", required=True)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync")
+    sub.add_parser("stats")
+    similar = sub.add_parser("similar")
+    similar.add_argument("text")
+    similar.add_argument("--limit", type=int, default=10)
+    reraise = sub.add_parser("reraise")
+    reraise.add_argument("--curr", required=True)
+    reraise.add_argument("--feedback", required=True)
+    reraise.add_argument("--output", required=True)
+    reraise.add_argument("--candidates", help="write confirmed/ambiguous pairs here when the LLM must decide")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    index = Index(args.db, args.issues_dir)
+    parsed = index.sync()
+
+    if args.command == "sync":
+        print("parsed %d changed files" % parsed)
+    elif args.command == "stats":
+        files, issues = index.stats()
+        print("files: %s" % ", ".join("%s=%d" % pair for pair in sorted(files.items())))
+        print("issues: %s" % ", ".join("%s=%d" % pair for pair in sorted(issues.items())))
+    elif args.command == "similar":
+        for score, item in index.similar(args.text, args.limit):
+            print("%.2f  %s  %s %s: %s" % (score, os.path.basename(item["path"]), item["kind"],
+                                           item["issue_id"] or "-", item["title"]))
+    elif args.command == "reraise":
+        confirmed, ambiguous, reviews = detect_reraises(index, args.curr, args.feedback)
+        print("issue index: %d confirmed re-raise(s), %d ambiguous" % (len(confirmed), len(ambiguous)),
+              file=sys.stderr)
+        if ambiguous:
+            if args.candidates:
+                with open(args.candidates, "w") as handle:
+                    handle.write(render_candidates(confirmed, ambiguous))
+            return AMBIGUOUS_EXIT
+        with open(args.output, "w") as handle:
+            handle.write(render_reraise_report(confirmed, reviews))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""Timing report and offline replay benchmark for spec-review-loop.sh.
+
+Every run of the loop writes $LOGS_DIR/timings.jsonl (one JSON event per
+line: run_start, agent, phase, iteration, run_end). This tool reads it.
+
+    report LOGS_DIR
+        wall time per phase and per inner iteration, split into agent time
+        and orchestration overhead (prompt rendering, globbing, greps,
+        shard merging, index lookups)
+
+    replay LOGS_DIR --specs-dir DIR --guide-path FILE --prompt-dir DIR
+           [--repeat N] [--agent-time zero|recorded|MS] [--script PATH]
+           [--save FILE] [--baseline FILE] [--threshold 0.2]
+        runs the loop again on a copy of the specs with stub `codex` and
+        `claude` executables that play back the recorded raw outputs and
+        the files each call wrote, so the same iterations happen without
+        any model calls. Prints overhead and latency per iteration;
+        --baseline exits 1 when overhead grew by more than --threshold.
+
+Replay needs the recorded LOGS_DIR and the specs directory the run worked
+on (its issues/ folder holds the reports, summaries and feedback the agents
+wrote). Files produced during the recorded run are removed from the copy
+and recreated by the stubs; date prefixes are moved to today so the loop's
+own file naming still matches. Human decisions are answered from the
+recorded human-review events. Edits the agents made to the spec files
+themselves are not replayed (the loop never inspects them), and neither
+are manual edits made at the [M] prompt.
+
+Shard calls run concurrently, so they are matched by the
+`NN-outer|inner-N-shard-I` name in their prompt; every other call is taken
+from the tape in recorded order, and a call of the wrong kind stops the
+replay. Replay runs with the cache off, so recorded cache hits are played
+back as calls (with their recorded agent time of 0 ms).
+
+    python3 replay_spec_review_loop.py report logs/spec-review-loop-20260301-101500
+    python3 replay_spec_review_loop.py replay logs/spec-review-loop-20260301-101500 \\
+        --specs-dir specs --guide-path references/SPEC_GENERATION_GUIDE.md \\
+        --prompt-dir spec-review-loop-prompts --repeat 5 --save overhead.json
+
+Only the standard library is used.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, "spec-review-loop.sh")
+
+REVIEW_PHASE = "human-review"
+# Phases that time prompts waiting for the user, not the loop.
+HUMAN_PHASES = (REVIEW_PHASE, "human-reasoning", "human-edit")
+SHARD_KEY = re.compile(r"(\d\d-(?:outer|inner)-\d+-shard-\d+)(?:-output\.md|-raw\.txt)")
+HUMAN_REASONING = "replayed decision"
+
+# Played back for each agent call; the tape and state live in REPLAY_DIR.
+STUB = r'''#!/usr/bin/env python3
+import fcntl, json, os, re, sys, time
+replay_dir = os.environ["REPLAY_DIR"]
+with open(os.path.join(replay_dir, "tape.json")) as handle:
+    tape = json.load(handle)
+name = os.path.basename(sys.argv[0])
+agent = "codex" if name == "codex" else "claude" if "stream-json" in sys.argv else "claude-print"
+prompt = sys.argv[-1] if len(sys.argv) > 1 else ""
+match = re.search(r"([^\s`'\"]*?(\d\d-(?:outer|inner)-\d+-shard-\d+)-output\.md)", prompt)
+if match and agent == "codex":
+    entry = tape["shards"].get(match.group(2))
+else:
+    with open(os.path.join(replay_dir, "position"), "a+") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        handle.seek(0)
+        position = int(handle.read() or 0)
+        handle.seek(0)
+        handle.truncate()
+        handle.write(str(position + 1))
+    calls = tape["calls"]
+    entry = calls[position] if position < len(calls) else None
+if entry is None or entry["agent"] != agent:
+    sys.stderr.write("replay diverged: unexpected %s call (tape has %s)\n" % (
+        agent, entry and "%s in %s" % (entry["agent"], entry["phase"]) or "nothing left"))
+    with open(os.path.join(replay_dir, "diverged"), "a") as handle:
+        handle.write("%s\n" % agent)
+    sys.exit(1)
+delay = tape["agent_ms"] if tape["agent_ms"] is not None else entry["ms"]
+if delay:
+    time.sleep(delay / 1000.0)
+writes = list(entry["writes"])
+if match and entry.get("output"):
+    writes.append([match.group(1), entry["output"]])
+for destination, source in writes:
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        dst.write(src.read())
+if entry["raw"]:
+    with open(entry["raw"], "rb") as handle:
+        sys.stdout.buffer.write(handle.read())
+'''
+
+
+def load_events(logs_dir):
+    path = os.path.join(logs_dir, "timings.jsonl")
+    if not os.path.isfile(path):
+        raise SystemExit("No timings.jsonl in %s (recorded by spec-review-loop.sh with timing events)" % logs_dir)
+    events = []
+    with open(path) as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    pass  # torn last line of an interrupted run
+    return events
+
+
+def summarize(events):
+    """Wall/agent/overhead per run, phase and inner iteration (ms)."""
+    start = next((e for e in events if e["event"] == "run_start"), None)
+    end = next((e for e in events if e["event"] == "run_end"), None)
+    phases = [e for e in events if e["event"] == "phase"]
+    agent = sum(e["agent_ms"] for e in phases)
+    human = sum(e["ms"] for e in phases if e["phase"] in HUMAN_PHASES)
+    if end:
+        wall = end["ms"]
+    elif start and events:
+        wall = (events[-1]["ts"] - start["ts"]) * 1000.0
+    else:
+        wall = 0.0
+
+    by_phase = {}
+    for event in phases:
+        row = by_phase.setdefault(event["phase"], {"count": 0, "ms": 0.0, "agent_ms": 0.0, "overhead_ms": 0.0,
+                                                   "agent_calls": 0})
+        row["count"] += 1
+        row["ms"] += event["ms"]
+        row["agent_ms"] += event["agent_ms"]
+        row["overhead_ms"] += event["overhead_ms"]
+        row["agent_calls"] += event["agent_calls"]
+
+    # Iteration agent time: run_confirm_fix runs in a subshell, so the loop
+    # itself cannot add it up; the phase events carry it.
+    iterations = []
+    for event in events:
+        if event["event"] != "iteration":
+            continue
+        inside = [p for p in phases if p["step"] == event["step"]]
+        agent_ms = sum(p["agent_ms"] for p in inside)
+        human_ms = sum(p["ms"] for p in inside if p["phase"] in HUMAN_PHASES)
+        iterations.append({"step": event["step"], "outer": event["outer"], "inner": event["inner"],
+                           "ms": event["ms"], "agent_ms": agent_ms, "human_ms": human_ms,
+                           "overhead_ms": event["ms"] - agent_ms - human_ms, "signal": event["signal"]})
+
+    return {
+        "wall_ms": wall,
+        "agent_ms": agent,
+        "human_ms": human,
+        "overhead_ms": wall - agent - human,
+        "agent_calls": sum(1 for e in events if e["event"] == "agent" and e["agent"] != "codex-shards"),
+        "exit": end["exit"] if end else None,
+        "jobs": start["jobs"] if start else None,
+        "phases": by_phase,
+        "iterations": iterations,
+    }
+
+
+def print_summary(summary):
+    print("wall %.1f ms = agent %.1f + human %.1f + overhead %.1f ms; %d agent calls; exit %s" % (
+        summary["wall_ms"], summary["agent_ms"], summary["human_ms"], summary["overhead_ms"],
+        summary["agent_calls"], summary["exit"]))
+    print("\n%-24s %5s %11s %11s %12s %12s" % ("phase", "count", "wall ms", "agent ms", "overhead ms", "overhead/run"))
+    for name, row in summary["phases"].items():
+        print("%-24s %5d %11.1f %11.1f %12.1f %12.1f" % (
+            name, row["count"], row["ms"], row["agent_ms"], row["overhead_ms"], row["overhead_ms"] / row["count"]))
+    if summary["iterations"]:
+        print("\n%4s %5s %5s %11s %11s %11s %12s  %s" % (
+            "step", "outer", "inner", "wall ms", "agent ms", "human ms", "overhead ms", "signal"))
+        for row in summary["iterations"]:
+            print("%4d %5s %5s %11.1f %11.1f %11.1f %12.1f  %s" % (
+                row["step"], row["outer"], row["inner"], row["ms"], row["agent_ms"], row["human_ms"],
+                row["overhead_ms"], row["signal"] or ""))
+
+
+def cmd_report(args):
+    events = load_events(args.logs_dir)
+    summary = summarize(events)
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        print_summary(summary)
+    return 0
+
+
+def local_date(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+
+
+def build_tape(events, logs_dir, recorded_issues, replay_issues):
+    """Calls in recorded order plus the files each one wrote.
+
+    Returns (tape, produced): produced are the basenames of issue files the
+    recorded run created, which the replay copy must start without.
+    """
+    recorded_date = local_date(events[0]["ts"])
+    today = datetime.date.today().strftime("%Y-%m-%d")
+
+    def rename(name):
+        if name.startswith(recorded_date):
+            return today + name[len(recorded_date):]
+        return name
+
+    calls = []
+    shards = {}
+    produced = set()
+    pending = []
+    for event in events:
+        if event["event"] == "agent":
+            if event["agent"] != "codex-shards":
+                pending.append(event)
+            continue
+        if event["event"] != "phase":
+            continue
+
+        files = [event[key] for key in event if key.endswith("_file") and event[key]]
+        produced.update(files)
+        sequential = []
+        for call in pending:
+            raw = os.path.join(logs_dir, call["raw_file"]) if call["raw_file"] else None
+            entry = {"agent": call["agent"], "phase": call["phase"], "ms": call["ms"],
+                     "raw": raw if raw and os.path.isfile(raw) else None, "writes": []}
+            key = SHARD_KEY.search(call["raw_file"] or "") if call["shard"] else None
+            if key:
+                output = os.path.join(logs_dir, key.group(1) + "-output.md")
+                entry["output"] = output if os.path.isfile(output) else None
+                shards[key.group(1)] = entry
+            else:
+                sequential.append(entry)
+                calls.append(entry)
+        # Sharded phases merge the shard reports themselves; otherwise the
+        # (single) agent call of the phase wrote the phase's files.
+        if sequential:
+            for name in files:
+                source = os.path.join(recorded_issues, name)
+                if os.path.isfile(source):
+                    sequential[-1]["writes"].append([os.path.join(replay_issues, rename(name)), source])
+        pending = []
+
+    return {"calls": calls, "shards": shards}, produced
+
+
+def human_answers(events):
+    """Stdin for the loop's prompts: Enter, the decision, reasoning."""
+    answers = []
+    for event in events:
+        if event["event"] == "phase" and event["phase"] == REVIEW_PHASE:
+            decision = event.get("decision") or "M"
+            answers.append("")
+            answers.append(decision)
+            if decision.upper() in ("V", "I"):
+                answers.append(HUMAN_REASONING)
+            else:
+                answers.append("")
+    return "\n".join(answers) + "\n"
+
+
+def call_signature(events):
+    """What was called, in which phase; shards are compared as a set per phase."""
+    sequence = []
+    for event in events:
+        if event["event"] == "agent" and event["agent"] != "codex-shards":
+            sequence.append((event["step"], event["phase"], event["agent"], event["shard"] is not None))
+    return sorted(sequence, key=lambda item: (item[0] or 0, item[1], item[2], item[3]))
+
+
+def replay_once(args, events, workdir, index):
+    run_dir = os.path.join(workdir, "run-%d" % index)
+    specs = os.path.join(run_dir, "specs")
+    logs = os.path.join(run_dir, "logs")
+    state = os.path.join(run_dir, "state")
+    os.makedirs(state)
+    recorded_issues = os.path.join(args.specs_dir, "issues")
+    replay_issues = os.path.join(specs, "issues")
+
+    tape, produced = build_tape(events, args.logs_dir, recorded_issues, replay_issues)
+    shutil.copytree(args.specs_dir, specs)
+    for name in produced:
+        path = os.path.join(replay_issues, name)
+        if os.path.isfile(path):
+            os.remove(path)
+    tape["agent_ms"] = args.agent_ms
+    with open(os.path.join(state, "tape.json"), "w") as handle:
+        json.dump(tape, handle)
+
+    start = events[0]
+    command = ["bash", args.script, "--outer", str(start["outer_max"]), "--inner", str(start["inner_max"]),
+               "--jobs", str(start["jobs"]), "--index-db", os.path.join(run_dir, "index.sqlite"),
+               "--specs-dir", specs, "--guide-path", args.guide_path, "--prompt-dir", args.prompt_dir,
+               "--logs-dir", logs]
+    if not start.get("index"):
+        command.append("--no-index")
+    env = dict(os.environ, PATH=args.bin_dir + os.pathsep + os.environ["PATH"], REPLAY_DIR=state)
+    started = time.perf_counter()
+    process = subprocess.run(command, input=human_answers(events), env=env, text=True,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    elapsed = (time.perf_counter() - started) * 1000.0
+
+    replayed = load_events(logs)
+    summary = summarize(replayed)
+    summary["process_ms"] = elapsed
+    problems = []
+    if os.path.exists(os.path.join(state, "diverged")):
+        problems.append("agent calls diverged from the tape")
+    if call_signature(replayed) != call_signature(events):
+        problems.append("different agent calls than recorded")
+    recorded_end = next((e for e in events if e["event"] == "run_end"), None)
+    if recorded_end and recorded_end["exit"] != process.returncode:
+        problems.append("exit %d, recorded %d" % (process.returncode, recorded_end["exit"]))
+    if problems and args.verbose:
+        sys.stderr.write(process.stderr)
+    summary["problems"] = problems
+    return summary
+
+
+def median_summary(summaries):
+    """Median over repeats of the numbers the benchmark tracks."""
+    def median(values):
+        return statistics.median(values) if values else 0.0
+
+    first = summaries[0]
+    result = {key: median([s[key] for s in summaries])
+              for key in ("wall_ms", "agent_ms", "human_ms", "overhead_ms", "process_ms")}
+    result["agent_calls"] = first["agent_calls"]
+    result["exit"] = first["exit"]
+    result["phases"] = {}
+    for name in first["phases"]:
+        rows = [s["phases"][name] for s in summaries if name in s["phases"]]
+        result["phases"][name] = {key: median([row[key] for row in rows])
+                                  for key in ("count", "ms", "agent_ms", "overhead_ms", "agent_calls")}
+    result["iterations"] = []
+    for position, row in enumerate(first["iterations"]):
+        rows = [s["iterations"][position] for s in summaries if len(s["iterations"]) > position]
+        merged = dict(row)
+        merged.update({key: median([r[key] for r in rows]) for key in ("ms", "agent_ms", "human_ms", "overhead_ms")})
+        result["iterations"].append(merged)
+    result["overhead_ms_min"] = min(s["overhead_ms"] for s in summaries)
+    result["overhead_ms_max"] = max(s["overhead_ms"] for s in summaries)
+    return result
+
+
+def compare(result, baseline, threshold, floor_ms):
+    """Overhead regressions against a saved baseline (total and per phase)."""
+    regressions = []
+
+    def check(label, current, previous):
+        if current > previous * (1 + threshold) and current - previous > floor_ms:
+            regressions.append("%s overhead %.1f ms, baseline %.1f ms (+%.0f%%)" % (
+                label, current, previous, (current / previous - 1) * 100 if previous else float("inf")))
+
+    check("total", result["overhead_ms"], baseline["overhead_ms"])
+    for name, row in result["phases"].items():
+        if name in baseline.get("phases", {}):
+            check(name, row["overhead_ms"] / row["count"],
+                  baseline["phases"][name]["overhead_ms"] / baseline["phases"][name]["count"])
+    return regressions
+
+
+def parse_agent_time(value):
+    if value == "zero":
+        return 0.0
+    if value == "recorded":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected zero, recorded or milliseconds: %s" % value)
+
+
+def cmd_replay(args):
+    events = load_events(args.logs_dir)
+    if not events or events[0]["event"] != "run_start":
+        raise SystemExit("timings.jsonl in %s does not start with run_start" % args.logs_dir)
+    if not os.path.isdir(os.path.join(args.specs_dir, "issues")):
+        raise SystemExit("No issues/ folder in %s" % args.specs_dir)
+    args.logs_dir = os.path.abspath(args.logs_dir)
+    args.specs_dir = os.path.abspath(args.specs_dir)
+    args.guide_path = os.path.abspath(args.guide_path)
+    args.prompt_dir = os.path.abspath(args.prompt_dir)
+    args.script = os.path.abspath(args.script)
+
+    workdir = tempfile.mkdtemp(prefix="spec-review-replay-")
+    args.bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(args.bin_dir)
+    for name in ("codex", "claude"):
+        path = os.path.join(args.bin_dir, name)
+        with open(path, "w") as handle:
+            handle.write(STUB)
+        os.chmod(path, 0o755)
+
+    recorded = summarize(events)
+    summaries = []
+    failed = False
+    for index in range(args.repeat):
+        summary = replay_once(args, events, workdir, index)
+        summaries.append(summary)
+        if summary["problems"]:
+            failed = True
+            print("replay %d: %s" % (index + 1, "; ".join(summary["problems"])), file=sys.stderr)
+    if not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = median_summary(summaries)
+    result["script"] = args.script
+    result["agent_time"] = args.agent_time
+    result["repeat"] = args.repeat
+    print("recorded: wall %.1f ms, agent %.1f ms, overhead %.1f ms, %d agent calls" % (
+        recorded["wall_ms"], recorded["agent_ms"], recorded["overhead_ms"], recorded["agent_calls"]))
+    print("replayed %d time(s), agent time %s (median):" % (args.repeat, args.agent_time))
+    print_summary(result)
+    print("\noverhead per run: median %.1f ms, min %.1f, max %.1f" % (
+        result["overhead_ms"], result["overhead_ms_min"], result["overhead_ms_max"]))
+
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump(result, handle, indent=2)
+            handle.write("\n")
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        regressions = compare(result, baseline, args.threshold, args.floor_ms)
+        for line in regressions:
+            print("REGRESSION: %s" % line)
+        if not regressions:
+            print("no overhead regression against %s (threshold %.0f%%)" % (args.baseline, args.threshold * 100))
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    report = sub.add_parser("report", help="agent time vs overhead of a recorded run")
+    report.add_argument("logs_dir")
+    report.add_argument("--json", action="store_true", help="print the summary as JSON")
+    report.set_defaults(func=cmd_report)
+
+    replay = sub.add_parser("replay", help="re-run a recorded run against stub agents")
+    replay.add_argument("logs_dir")
+    replay.add_argument("--specs-dir", required=True, help="specs directory of the recorded run (with issues/)")
+    replay.add_argument("--guide-path", required=True)
+    replay.add_argument("--prompt-dir", required=True)
+    replay.add_argument("--script", default=SCRIPT, help="loop script to benchmark (default: next to this file)")
+    replay.add_argument("--repeat", type=int, default=3)
+    replay.add_argument("--agent-time", default="zero", type=str,
+                        help="stub call duration: zero, recorded, or a fixed number of ms (default: zero)")
+    replay.add_argument("--save", help="write the median result as JSON (a baseline for later runs)")
+    replay.add_argument("--baseline", help="compare overhead with a result saved by --save")
+    replay.add_argument("--threshold", type=float, default=0.2, help="allowed overhead growth (default: 0.2)")
+    replay.add_argument("--floor-ms", type=float, default=20.0,
+                        help="ignore overhead differences smaller than this (default: 20)")
+    replay.add_argument("--keep", action="store_true", help="keep the replay working directory")
+    replay.add_argument("--verbose", action="store_true", help="show the loop's stderr when a replay fails")
+    replay.set_defaults(func=cmd_replay)
+
+    args = parser.parse_args()
+    if args.command == "replay":
+        if args.repeat < 1:
+            parser.error("--repeat must be at least 1")
+        try:
+            args.agent_ms = parse_agent_time(args.agent_time)
+        except argparse.ArgumentTypeError as error:
+            parser.error(str(error))
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
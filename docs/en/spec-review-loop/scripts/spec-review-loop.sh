@@ -16,13 +16,37 @@ PROMPT_DIR="./spec-review-loop-prompts"
 LOGS_DIR=""
 OUTER_MAX=5
 INNER_MAX=10
+JOBS=1
+CACHE_ENABLED=0
+CACHE_DIR=""
+CACHE_MAX_MB=512
+CACHE_KEY=""
+CACHE_SNAPSHOT=""
+CACHE_PENDING=""
+STREAM_EVENTS="${STREAM_EVENTS:-}"
+ISSUE_INDEX=""
+ISSUE_INDEX_ENABLED=1
+ISSUE_INDEX_DB=""
 CURRENT_OUTER=""
 CURRENT_INNER=""
 INNER_COUNTER=0
+TIMINGS_FILE=""
+RUN_START_US=0
+ITERATION_START_US=0
+PHASE=""
+PHASE_START_US=0
+PHASE_AGENT_US=0
+PHASE_AGENT_CALLS=0
+PHASE_FIRST_AGENT_US=0
+PHASE_LAST_AGENT_US=0
+AGENT_START_US=0
+SHARD=""
 
 usage() {
   cat <<USAGE
-Usage: $0 [--outer N] [--inner N] [--specs-dir PATH] [--guide-path PATH] [--prompt-dir PATH] [--logs-dir PATH]
+Usage: $0 [--outer N] [--inner N] [--jobs N] [--cache|--resume] [--cache-dir PATH] [--cache-max-mb N]
+          [--no-index] [--index-db PATH]
+          [--specs-dir PATH] [--guide-path PATH] [--prompt-dir PATH] [--logs-dir PATH]
 
 Runs the spec review loop:
   01-find-issues -> 02-fix-issues -> 03-confirm-fix
@@ -30,10 +54,18 @@ Runs the spec review loop:
 Options:
   --outer N       Max outer iterations (default: 5)
   --inner N       Max inner iterations (default: 10)
+  --jobs N        Parallel Codex shards for 01-find-issues/03-confirm-fix (default: 1)
+  --cache         Replay agent calls whose prompt, specs and guide are unchanged
+  --resume        Alias for --cache (re-run an interrupted loop without repeating finished calls)
+  --cache-dir     Cache directory (default: ./logs/spec-review-cache)
+  --cache-max-mb  Cache size limit; least recently used entries are evicted (default: 512)
+  --no-index      Always use the LLM for re-raise detection (skip the local issue index)
+  --index-db      Issue index database (default: ./logs/spec-review-index.sqlite)
   --specs-dir     Specs directory (default: ./specs)
   --guide-path    SPEC_GENERATION_GUIDE.md path (default: ./references/SPEC_GENERATION_GUIDE.md)
   --prompt-dir    Prompt directory (default: ./spec-review-loop-prompts)
-  --logs-dir      Logs directory (default: ./logs/spec-review-loop-<timestamp>)
+  --logs-dir      Logs directory (default: ./logs/spec-review-loop-<timestamp>);
+                  per-phase timings go to timings.jsonl (see replay_spec_review_loop.py)
   -h, --help      Show this help
 USAGE
   exit 1
@@ -70,6 +102,39 @@ resolve_root() {
   PROJECT_ROOT="$SCRIPT_DIR"
 }
 
+# Single-pass stream-json processor (docs/en/shared-scripts/stream_events.py).
+# Falls back to the awk | tee | jq pipeline when python3 or the module is missing.
+resolve_stream_events() {
+  if [ -n "$STREAM_EVENTS" ]; then
+    [ -f "$STREAM_EVENTS" ] || die "STREAM_EVENTS not found: $STREAM_EVENTS"
+    return
+  fi
+  command -v python3 >/dev/null 2>&1 || return 0
+
+  local candidate
+  for candidate in "$SCRIPT_DIR/stream_events.py" "$SCRIPT_DIR/../../shared-scripts/stream_events.py"; do
+    if [ -f "$candidate" ]; then
+      STREAM_EVENTS="$candidate"
+      return
+    fi
+  done
+}
+
+# Persistent issue index (issue_index.py next to this script): deterministic re-raise
+# pre-detection. Report lookups stay on the glob below, which is cheaper than
+# starting python3. Disabled without python3.
+resolve_issue_index() {
+  [ "$ISSUE_INDEX_ENABLED" -eq 1 ] || return 0
+  command -v python3 >/dev/null 2>&1 || return 0
+  if [ -f "$SCRIPT_DIR/issue_index.py" ]; then
+    ISSUE_INDEX="$SCRIPT_DIR/issue_index.py"
+  fi
+}
+
+run_issue_index() {
+  python3 "$ISSUE_INDEX" --issues-dir "$(issues_dir)" --db "$ISSUE_INDEX_DB" "$@"
+}
+
 normalize_path() {
   local path="$1"
   if [[ "$path" = /* ]]; then
@@ -144,38 +209,22 @@ reraise_file_for() {
 
 check_control_signal() {
   local input="$1"
+  local pattern='^<promise>(COMPLETE|ALL_RESOLVED|ISSUES_REMAINING)</promise>$'
+  local found
   # Use ^...$ anchors to match standalone lines only (avoid prompt template text)
+  # Single grep pass; priority is COMPLETE > ALL_RESOLVED > ISSUES_REMAINING.
   if [ -f "$input" ]; then
-    if grep -qE '^<promise>COMPLETE</promise>$' "$input"; then
-      echo "COMPLETE"
-      return
-    fi
-    if grep -qE '^<promise>ALL_RESOLVED</promise>$' "$input"; then
-      echo "ALL_RESOLVED"
-      return
-    fi
-    if grep -qE '^<promise>ISSUES_REMAINING</promise>$' "$input"; then
-      echo "ISSUES_REMAINING"
-      return
-    fi
-    echo ""
-    return
-  fi
-
-  if echo "$input" | grep -qE '^<promise>COMPLETE</promise>$'; then
-    echo "COMPLETE"
-    return
-  fi
-  if echo "$input" | grep -qE '^<promise>ALL_RESOLVED</promise>$'; then
-    echo "ALL_RESOLVED"
-    return
-  fi
-  if echo "$input" | grep -qE '^<promise>ISSUES_REMAINING</promise>$'; then
-    echo "ISSUES_REMAINING"
-    return
+    found="$(grep -oE "$pattern" "$input" || true)"
+  else
+    found="$(printf "%s\n" "$input" | grep -oE "$pattern" || true)"
   fi
 
-  echo ""
+  case "$found" in
+    *"<promise>COMPLETE</promise>"*) echo "COMPLETE" ;;
+    *"<promise>ALL_RESOLVED</promise>"*) echo "ALL_RESOLVED" ;;
+    *"<promise>ISSUES_REMAINING</promise>"*) echo "ISSUES_REMAINING" ;;
+    *) echo "" ;;
+  esac
 }
 
 read_prompt() {
@@ -198,10 +247,310 @@ normalize_prompt_paths() {
   printf "%s" "$prompt"
 }
 
+hash_stdin() {
+  if command -v sha256sum >/dev/null 2>&1; then
+    sha256sum | cut -d' ' -f1
+  else
+    shasum -a 256 | cut -d' ' -f1
+  fi
+}
+
+# "<sha256>  <path relative to SPECS_DIR>" for every file under SPECS_DIR.
+snapshot_specs() {
+  local hasher="sha256sum"
+  command -v sha256sum >/dev/null 2>&1 || hasher="shasum -a 256"
+  (cd "$SPECS_DIR" && find . -type f -print0 | LC_ALL=C sort -z | xargs -0 $hasher)
+}
+
+# Timing events: one JSON object per line in $LOGS_DIR/timings.jsonl.
+#   run_start / run_end  the whole run (run_end carries the exit status)
+#   phase                01-find, 02-fix, 03-confirm, reraise-detect, human-override-valid,
+#                        human-override-invalid, decline-log: wall time, agent time,
+#                        and the orchestration overhead before the first agent call
+#                        (pre) and after the last (post); human-review, human-reasoning
+#                        and human-edit time the prompts that wait for the user
+#   agent                one codex/claude call or cache hit, with prompt/output sizes
+#   iteration            one inner iteration (fix, confirm, re-raise handling)
+# Times come from $EPOCHREALTIME (bash 5+); older bash only has whole seconds.
+clock_us() {
+  if [ -n "${EPOCHREALTIME:-}" ]; then
+    printf -v "$1" "%s" "${EPOCHREALTIME/[.,]/}"
+  else
+    printf -v "$1" "%s" "$(($(date +%s) * 1000000))"
+  fi
+}
+
+us_to_ms() {
+  printf -v "$1" "%d.%03d" "$(($2 / 1000))" "$(($2 % 1000))"
+}
+
+byte_length() {
+  local LC_ALL=C
+  printf -v "$1" "%s" "${#2}"
+}
+
+# timing_event <event> [key value]...: numbers are written as JSON numbers,
+# empty values as null, everything else as strings. A key ending in _file
+# takes a path and is written as <name>_file (basename) and <name>_bytes.
+timing_event() {
+  [ -n "$TIMINGS_FILE" ] || return 0
+  local now
+  clock_us now
+  local line="{\"ts\":${now:0:${#now}-6}.${now:${#now}-6:3},\"event\":\"$1\""
+  shift
+
+  local key value size
+  while [ $# -ge 2 ]; do
+    key="$1"
+    value="$2"
+    shift 2
+    if [[ "$key" == *_file ]]; then
+      size=0
+      [ -n "$value" ] && [ -f "$value" ] && size="$(wc -c < "$value")"
+      line+=",\"${key%_file}_bytes\":$((size))"
+      value="${value##*/}"
+    fi
+    if [ -z "$value" ]; then
+      value=null
+    elif ! [[ "$value" =~ ^-?[0-9]+(\.[0-9]+)?$ ]]; then
+      value="${value//\\/\\\\}"
+      value="${value//\"/\\\"}"
+      value="${value//$'\n'/\\n}"
+      value="${value//$'\t'/\\t}"
+      value="\"$value\""
+    fi
+    line+=",\"$key\":$value"
+  done
+  printf "%s}\n" "$line" >> "$TIMINGS_FILE"
+}
+
+phase_begin() {
+  PHASE="$1"
+  PHASE_AGENT_US=0
+  PHASE_AGENT_CALLS=0
+  PHASE_FIRST_AGENT_US=0
+  PHASE_LAST_AGENT_US=0
+  clock_us PHASE_START_US
+}
+
+# phase_end [key value]...: extra fields for the phase event.
+phase_end() {
+  local end
+  clock_us end
+  local total=$((end - PHASE_START_US))
+  local pre=$total
+  local post=0
+  if [ "$PHASE_AGENT_CALLS" -gt 0 ]; then
+    pre=$((PHASE_FIRST_AGENT_US - PHASE_START_US))
+    post=$((end - PHASE_LAST_AGENT_US))
+  fi
+
+  local ms agent_ms overhead_ms pre_ms post_ms
+  us_to_ms ms "$total"
+  us_to_ms agent_ms "$PHASE_AGENT_US"
+  us_to_ms overhead_ms "$((total - PHASE_AGENT_US))"
+  us_to_ms pre_ms "$pre"
+  us_to_ms post_ms "$post"
+  timing_event phase phase "$PHASE" outer "$CURRENT_OUTER" inner "$CURRENT_INNER" \
+    step "${CURRENT_INNER:+$INNER_COUNTER}" ms "$ms" agent_ms "$agent_ms" overhead_ms "$overhead_ms" \
+    pre_ms "$pre_ms" post_ms "$post_ms" agent_calls "$PHASE_AGENT_CALLS" "$@"
+  PHASE=""
+}
+
+agent_begin() {
+  clock_us AGENT_START_US
+}
+
+# agent_end <agent> <prompt> <raw output> [hit]: a cache hit adds no agent time.
+agent_end() {
+  local elapsed=0
+  local cache="off"
+  if [ "${4:-}" = "hit" ]; then
+    cache="hit"
+  else
+    local end
+    clock_us end
+    elapsed=$((end - AGENT_START_US))
+    PHASE_AGENT_US=$((PHASE_AGENT_US + elapsed))
+    PHASE_AGENT_CALLS=$((PHASE_AGENT_CALLS + 1))
+    [ "$PHASE_FIRST_AGENT_US" -gt 0 ] || PHASE_FIRST_AGENT_US="$AGENT_START_US"
+    PHASE_LAST_AGENT_US="$end"
+    [ -n "$CACHE_KEY" ] && cache="miss"
+  fi
+
+  local ms prompt_bytes
+  us_to_ms ms "$elapsed"
+  byte_length prompt_bytes "$2"
+  timing_event agent phase "$PHASE" outer "$CURRENT_OUTER" inner "$CURRENT_INNER" \
+    step "${CURRENT_INNER:+$INNER_COUNTER}" shard "$SHARD" agent "$1" ms "$ms" cache "$cache" \
+    prompt_bytes "$prompt_bytes" raw_file "$3"
+}
+
+iteration_end() {
+  local end ms
+  clock_us end
+  us_to_ms ms "$((end - ITERATION_START_US))"
+  timing_event iteration outer "$CURRENT_OUTER" inner "$CURRENT_INNER" step "$INNER_COUNTER" \
+    ms "$ms" signal "$1"
+}
+
+# EXIT trap; command substitutions and shard subshells do not report.
+run_end() {
+  local status="$1"
+  [ "${BASHPID:-$$}" = "$$" ] || return 0
+  cache_discard
+  rm -f "$CACHE_PENDING"
+  local end ms
+  clock_us end
+  us_to_ms ms "$((end - RUN_START_US))"
+  timing_event run_end ms "$ms" exit "$status" outer "$CURRENT_OUTER" steps "$INNER_COUNTER"
+}
+
+# Cache entries live in $CACHE_DIR/<key>/:
+#   raw          agent output (codex text or claude stream-json)
+#   specs.tar    files the agent created or changed under SPECS_DIR
+#   logs.tar     extra outputs the agent wrote under LOGS_DIR (shard reports)
+#   deleted.txt  files the agent removed under SPECS_DIR
+#   complete     marker written once the caller validated the outputs; its
+#                mtime drives LRU eviction
+#
+# cache_save stores an entry without the marker and lists it in
+# $CACHE_PENDING (shared with command substitutions and shard subshells).
+# The caller runs cache_commit after checking the report/summary/promise tag;
+# anything still pending when the script exits is dropped by cache_discard, so
+# a failed result is never replayed by --cache/--resume.
+#
+# The key hashes the agent command, the prompt (with LOGS_DIR masked so a new
+# --logs-dir still hits), the guide and every file under SPECS_DIR.
+# Sets CACHE_KEY and CACHE_SNAPSHOT; returns 0 and restores outputs on a hit.
+cache_lookup() {
+  local agent="$1"
+  local prompt="$2"
+  local raw_out="$3"
+
+  CACHE_KEY=""
+  [ "$CACHE_ENABLED" -eq 1 ] || return 1
+
+  CACHE_SNAPSHOT="$(snapshot_specs)"
+  CACHE_KEY="$({
+    echo "agent: $agent"
+    printf "%s\n" "${prompt//"$LOGS_DIR"/@LOGS_DIR@}"
+    echo "guide: $(hash_stdin < "$GUIDE_PATH")"
+    printf "%s\n" "$CACHE_SNAPSHOT"
+  } | hash_stdin)"
+
+  local entry="$CACHE_DIR/$CACHE_KEY"
+  [ -f "$entry/complete" ] || return 1
+
+  cp "$entry/raw" "$raw_out"
+  [ -f "$entry/specs.tar" ] && tar -xf "$entry/specs.tar" -C "$SPECS_DIR"
+  [ -f "$entry/logs.tar" ] && tar -xf "$entry/logs.tar" -C "$LOGS_DIR"
+  if [ -s "$entry/deleted.txt" ]; then
+    local file
+    while IFS= read -r file; do
+      rm -f "$SPECS_DIR/$file"
+    done < "$entry/deleted.txt"
+  fi
+  touch "$entry/complete"
+  echo "Cache hit: $CACHE_KEY ($(basename "$raw_out"))" >&2
+  return 0
+}
+
+# Stores the result of the call that missed in cache_lookup as pending.
+cache_save() {
+  local raw_out="$1"
+  shift
+  local outputs=("$@")
+
+  [ -n "$CACHE_KEY" ] || return 0
+
+  local tmp="$CACHE_DIR/.tmp-$CACHE_KEY-$$"
+  rm -rf "$tmp"
+  mkdir -p "$tmp"
+  cp "$raw_out" "$tmp/raw"
+
+  local after
+  after="$(snapshot_specs)"
+
+  local changed=()
+  local file
+  while IFS= read -r file; do
+    [ -n "$file" ] && changed+=("$file")
+  done < <(LC_ALL=C comm -13 <(printf "%s\n" "$CACHE_SNAPSHOT" | LC_ALL=C sort) \
+    <(printf "%s\n" "$after" | LC_ALL=C sort) | sed 's/^[0-9a-f]*  //')
+  if [ ${#changed[@]} -gt 0 ]; then
+    tar -cf "$tmp/specs.tar" -C "$SPECS_DIR" "${changed[@]}"
+  fi
+
+  LC_ALL=C comm -23 <(printf "%s\n" "$CACHE_SNAPSHOT" | sed 's/^[0-9a-f]*  //') \
+    <(printf "%s\n" "$after" | sed 's/^[0-9a-f]*  //') > "$tmp/deleted.txt"
+
+  local logs=()
+  for file in ${outputs[@]+"${outputs[@]}"}; do
+    [ -f "$file" ] && logs+=("${file#"$LOGS_DIR"/}")
+  done
+  if [ ${#logs[@]} -gt 0 ]; then
+    tar -cf "$tmp/logs.tar" -C "$LOGS_DIR" "${logs[@]}"
+  fi
+
+  rm -rf "$CACHE_DIR/$CACHE_KEY"
+  mv "$tmp" "$CACHE_DIR/$CACHE_KEY"
+  echo "$CACHE_KEY" >> "$CACHE_PENDING"
+}
+
+# Marks pending entries complete once their outputs passed validation.
+cache_commit() {
+  [ -s "$CACHE_PENDING" ] || return 0
+  local key
+  while IFS= read -r key; do
+    [ -d "$CACHE_DIR/$key" ] && touch "$CACHE_DIR/$key/complete"
+  done < "$CACHE_PENDING"
+  : > "$CACHE_PENDING"
+  cache_evict
+}
+
+# Drops pending entries whose outputs failed validation (or were never checked).
+cache_discard() {
+  [ -s "$CACHE_PENDING" ] || return 0
+  local key
+  while IFS= read -r key; do
+    [ -n "$key" ] && rm -rf "${CACHE_DIR:?}/$key"
+  done < "$CACHE_PENDING"
+  : > "$CACHE_PENDING"
+}
+
+# Drops least recently used entries until the cache fits in CACHE_MAX_MB.
+cache_evict() {
+  local limit_kb=$((CACHE_MAX_MB * 1024))
+  local total
+  total="$(du -sk "$CACHE_DIR" | cut -f1)"
+  [ "$total" -gt "$limit_kb" ] || return 0
+
+  local entry
+  local size
+  while IFS= read -r entry; do
+    [ "$total" -gt "$limit_kb" ] || break
+    entry="$(dirname "$entry")"
+    size="$(du -sk "$entry" | cut -f1)"
+    rm -rf "$entry"
+    total=$((total - size))
+  done < <(ls -1tr "$CACHE_DIR"/*/complete 2>/dev/null)
+}
+
+# Extra arguments are output files under LOGS_DIR to store with the result.
 run_codex() {
   local prompt="$1"
   local raw_out="$2"
+  shift 2
+
+  if cache_lookup "codex exec --profile claude" "$prompt" "$raw_out"; then
+    agent_end codex "$prompt" "$raw_out" hit
+    return 0
+  fi
+  agent_begin
   codex exec --profile claude -C "$PROJECT_ROOT" "$prompt" > "$raw_out" 2>&1
+  agent_end codex "$prompt" "$raw_out"
+  cache_save "$raw_out" "$@"
 }
 
 run_claude() {
@@ -210,14 +559,469 @@ run_claude() {
 
   local stream_text='select(.type == "assistant").message.content[]? | select(.type == "text").text // empty | gsub("\n"; "\r\n") | . + "\r\n\n"'
 
-  claude --permission-mode acceptEdits --verbose --print --output-format stream-json "$prompt" \
-    | awk '/^{/ { print; fflush(); }' \
-    | tee "$raw_json" \
-    | jq --unbuffered -rj "$stream_text"
+  if cache_lookup "claude --output-format stream-json" "$prompt" "$raw_json"; then
+    agent_end claude "$prompt" "$raw_json" hit
+    if [ -n "$STREAM_EVENTS" ]; then
+      python3 "$STREAM_EVENTS" "$raw_json"
+    else
+      jq -rj "$stream_text" "$raw_json"
+    fi
+    return 0
+  fi
+
+  agent_begin
+  if [ -n "$STREAM_EVENTS" ]; then
+    claude --permission-mode acceptEdits --verbose --print --output-format stream-json "$prompt" \
+      | python3 "$STREAM_EVENTS" --raw "$raw_json" \
+          --log "${raw_json%-raw.json}-events.log" --summary "${raw_json%-raw.json}-usage.json"
+  else
+    claude --permission-mode acceptEdits --verbose --print --output-format stream-json "$prompt" \
+      | awk '/^{/ { print; fflush(); }' \
+      | tee "$raw_json" \
+      | jq --unbuffered -rj "$stream_text"
+  fi
+  agent_end claude "$prompt" "$raw_json"
+  cache_save "$raw_json"
+}
+
+run_claude_print() {
+  local prompt="$1"
+  local raw_out="$2"
+
+  if cache_lookup "claude --print" "$prompt" "$raw_out"; then
+    agent_end claude-print "$prompt" "$raw_out" hit
+    return 0
+  fi
+  agent_begin
+  claude --permission-mode acceptEdits --print "$prompt" > "$raw_out" 2>&1
+  agent_end claude-print "$prompt" "$raw_out"
+  cache_save "$raw_out"
+}
+
+# Shared files are read by every shard and reviewed by the "shared" shard.
+is_shared_spec() {
+  case "$(basename "$1")" in
+    README.md|questions-and-answers.md|interfaces.md) return 0 ;;
+  esac
+  return 1
+}
+
+# One shard per top-level spec file and one per file under contracts/.
+list_spec_shards() {
+  local file
+  shopt -s nullglob
+  for file in "$SPECS_DIR"/*.md "$SPECS_DIR"/contracts/*.md; do
+    is_shared_spec "$file" && continue
+    echo "$file"
+  done
+  shopt -u nullglob
+}
+
+# Shards owning at least one issue in the report; "shared" owns the rest.
+shards_for_issues() {
+  local issues_file="$1"
+  local locations=()
+  local line
+  while IFS= read -r line; do
+    locations+=("$line")
+  done < <(grep -E '^\*\*Location\*\*:' "$issues_file" || true)
+
+  [ ${#locations[@]} -gt 0 ] || return 0
+
+  local shards=()
+  local shard
+  while IFS= read -r shard; do
+    shards+=("$shard")
+  done < <(list_spec_shards)
+
+  local owned=()
+  local needs_shared=0
+  local matched
+  for line in "${locations[@]}"; do
+    matched=""
+    for shard in ${shards[@]+"${shards[@]}"}; do
+      if [[ "$line" == *"/${shard#"$SPECS_DIR"/}"* ]]; then
+        matched="$shard"
+        break
+      fi
+    done
+    if [ -z "$matched" ]; then
+      needs_shared=1
+    elif [[ " ${owned[*]-} " != *" $matched "* ]]; then
+      owned+=("$matched")
+    fi
+  done
+
+  for shard in ${shards[@]+"${shards[@]}"}; do
+    [[ " ${owned[*]-} " == *" $shard "* ]] && echo "$shard"
+  done
+  if [ "$needs_shared" -eq 1 ]; then
+    echo "shared"
+  fi
+}
+
+shard_scope_note() {
+  local phase="$1"
+  local shard="$2"
+  shift 2
+  local file_shards=("$@")
+
+  echo ""
+  echo "## Parallel Shard Scope (MUST)"
+  echo ""
+  echo "This run is one of several parallel reviewers. Each reviewer owns one spec file; a \"shared\" reviewer owns the shared files and cross-spec consistency. The orchestrator merges all shard reports."
+  echo ""
+  echo "- Always read \`$SPECS_DIR/README.md\`, \`$SPECS_DIR/questions-and-answers.md\` and \`$SPECS_DIR/contracts/\` for context."
+
+  if [ "$shard" = "shared" ]; then
+    local others=""
+    local file
+    for file in ${file_shards[@]+"${file_shards[@]}"}; do
+      others="$others \`$file\`"
+    done
+    if [ "$phase" = "find" ]; then
+      echo "- Review ONLY the shared files (\`README.md\`, \`questions-and-answers.md\`, \`interfaces.md\` if present) and Cross-Spec Consistency between spec files."
+      echo "- Do NOT raise issues that are local to a single spec file; other reviewers own them."
+    else
+      echo "- Verify ONLY issues whose Location is NOT one of:${others:- (none)}"
+      echo "- Omit every other issue from your report, including the Summary table."
+    fi
+  else
+    if [ "$phase" = "find" ]; then
+      echo "- Review ONLY: \`$shard\`"
+      echo "- Only raise issues whose Location is that file."
+    else
+      echo "- Verify ONLY issues whose Location is \`$shard\`."
+      echo "- Omit every other issue from your report, including the Summary table."
+      echo "- Raise regressions only for \`$shard\`."
+    fi
+  fi
+}
+
+# Runs one Codex agent per shard under a pool of $JOBS workers.
+# Shard i writes <prefix>-shard-<i>-{prompt.txt,raw.txt,output.md}.
+run_codex_shards() {
+  local phase="$1"
+  local prompt="$2"
+  local prefix="$3"
+  shift 3
+  local shards=("$@")
+
+  local file_shards=()
+  local shard
+  for shard in "${shards[@]}"; do
+    [ "$shard" = "shared" ] || file_shards+=("$shard")
+  done
+
+  # The pool counts as one agent call; each shard also logs its own.
+  agent_begin
+  local pids=()
+  local failed=0
+  local i
+  for ((i=1; i<=${#shards[@]}; i++)); do
+    shard="${shards[$((i - 1))]}"
+
+    if [ ${#pids[@]} -ge "$JOBS" ]; then
+      wait "${pids[0]}" || failed=1
+      pids=(${pids[@]+"${pids[@]:1}"})
+    fi
+
+    local shard_prompt
+    shard_prompt="$(replace_placeholder "$prompt" "{Output file}" "$prefix-shard-$i-output.md")"
+    shard_prompt="$shard_prompt"$'\n'"$(shard_scope_note "$phase" "$shard" ${file_shards[@]+"${file_shards[@]}"})"
+
+    printf "%s" "$shard_prompt" > "$prefix-shard-$i-prompt.txt"
+    echo "Shard $i/${#shards[@]}: $shard" >&2
+    SHARD="$i"
+    run_codex "$shard_prompt" "$prefix-shard-$i-raw.txt" "$prefix-shard-$i-output.md" &
+    pids+=($!)
+  done
+  SHARD=""
+
+  for pid in ${pids[@]+"${pids[@]}"}; do
+    wait "$pid" || failed=1
+  done
+  CACHE_KEY=""
+  agent_end codex-shards "$prompt" ""
+
+  [ "$failed" -eq 0 ] || die "One or more Codex shards failed (see $prefix-shard-*-raw.txt)"
+}
+
+# Merges shard reports into one issue report.
+#   merge_issue_reports find "" <output> <shard reports...>
+#   merge_issue_reports confirm <issues file> <output> <shard reports...>
+# Duplicate issues (same title, or same location + guide rule from another
+# shard) are dropped. In find mode issues are renumbered from 1; in confirm
+# mode original IDs are kept, issues no shard reported are carried over, new
+# regressions are numbered after the highest input ID, and the promise tag is
+# derived from the merged statuses.
+merge_issue_reports() {
+  local mode="$1"
+  local input_file="$2"
+  local output_file="$3"
+  shift 3
+
+  local program
+  read -r -d '' program <<'AWK_EOF' || true
+function trim(s) { sub(/^[ \t\r]+/, "", s); sub(/[ \t\r]+$/, "", s); return s }
+function norm(s) { s = tolower(s); gsub(/[^a-z0-9]+/, " ", s); return trim(s) }
+function value(line) { sub(/^\*\*[^*]+\*\*:[ \t]*/, "", line); gsub(/[\[\]`]/, "", line); return trim(line) }
+function resolved(s) { s = tolower(s); return s ~ /^fixed/ || s ~ /^declined-accepted/ }
+function loc_file(s) { sub(/[ \t]*>.*$/, "", s); return s }
+
+function start_block(line, kind) {
+  flush_block()
+  in_block = 1; bkind = kind; blen = 0
+  bhead = line; bsev = ""; bstatus = ""; bloc = ""; brule = ""
+  if (kind == "issue") {
+    bid = line; sub(/^### Issue[ \t]*/, "", bid); sub(/:.*$/, "", bid); gsub(/[^0-9]/, "", bid)
+    btitle = line; sub(/^### Issue[^:]*:[ \t]*/, "", btitle); btitle = trim(btitle)
+  }
+}
+
+function flush_block(   body, first, i) {
+  if (!in_block) return
+  in_block = 0
+  while (blen > 0 && trim(bl[blen]) == "") blen--
+  first = 1
+  while (first <= blen && trim(bl[first]) == "") first++
+  body = ""
+  for (i = first; i <= blen; i++) body = body bl[i] "\n"
+  if (bkind == "feedback") {
+    if (!(norm(bhead) in seen_feedback)) {
+      seen_feedback[norm(bhead)] = 1
+      nfeedback++; feedback_head[nfeedback] = bhead; feedback_body[nfeedback] = body
+    }
+  } else if (FILENAME == input_file) {
+    if (bid != "" && !(bid in orig)) {
+      orig[bid] = 1; norig++; orig_order[norig] = bid
+      store("orig_" bid, body)
+      if (bid + 0 > max_id) max_id = bid + 0
+      seen_title[norm(btitle)] = "input"
+    }
+  } else if (mode == "confirm" && section !~ /new issues/) {
+    if (bid != "" && !(bid in found)) {
+      found[bid] = 1; nfound++; found_order[nfound] = bid
+      store("found_" bid, body)
+    }
+  } else {
+    add_new(body)
+  }
+}
+
+function store(key, body) {
+  title[key] = btitle; sev[key] = bsev; status[key] = bstatus; loc[key] = bloc; rule[key] = brule; text[key] = body
+}
+
+function add_new(body,   k1, k2, key) {
+  k1 = norm(btitle)
+  k2 = norm(bloc) "|" norm(brule)
+  if (k1 in seen_title) return
+  if (bloc != "" && (k2 in seen_loc) && seen_loc[k2] != FILENAME) return
+  seen_title[k1] = FILENAME
+  if (bloc != "") seen_loc[k2] = FILENAME
+  nnew++; key = "new_" nnew
+  store(key, body)
+}
+
+function header(id, key) { return "### Issue " id ": " title[key] }
+function print_block(head, body) { print head; print ""; printf "%s", body; print "" }
+
+function summary_row(id, key) {
+  if (mode == "find")
+    printf "| %s | %s | %s | %s | %s | %s |\n", id, title[key], sev[key], loc_file(loc[key]), rule[key], status[key]
+  else
+    printf "| %s | %s | %s | %s | %s | %s | |\n", id, title[key], sev[key], loc_file(loc[key]), rule[key], status[key]
+}
+
+FNR == 1 { flush_block(); section = "" }
+
+/^## / { flush_block(); section = tolower($0); next }
+/^### Issue / { start_block($0, "issue"); next }
+/^### / && section ~ /feedback review/ && FILENAME != input_file { start_block($0, "feedback"); next }
+/^---[ \t]*$/ || /^<promise>/ { flush_block(); next }
+
+section ~ /files reviewed/ && /^- \[[ xX]\]/ && FILENAME != input_file {
+  if (!(norm($0) in seen_file)) { seen_file[norm($0)] = 1; nfiles++; files[nfiles] = $0 }
+  next
+}
+
+in_block {
+  if ($0 ~ /^\*\*Severity\*\*:/) bsev = value($0)
+  else if ($0 ~ /^\*\*Status\*\*:/) bstatus = value($0)
+  else if ($0 ~ /^\*\*Location\*\*:/) bloc = value($0)
+  else if ($0 ~ /^\*\*Guide Rule ID\*\*:/) brule = value($0)
+  bl[++blen] = $0
+}
+
+END {
+  flush_block()
+
+  if (mode == "find") {
+    n = 0
+    for (i = 1; i <= nnew; i++) if (tolower(sev["new_" i]) ~ /critical/) order[++n] = "new_" i
+    for (i = 1; i <= nnew; i++) if (tolower(sev["new_" i]) !~ /critical/) order[++n] = "new_" i
+
+    print "# Spec Review: Thresholded Issues"
+    print ""
+    print "Identified by Codex analysis on " date_str " (merged from " shard_count " parallel review shards)."
+    print ""
+    print "---"
+    print ""
+    print "## Critical Issues"
+    print ""
+    for (i = 1; i <= n; i++) if (tolower(sev[order[i]]) ~ /critical/) print_block(header(i, order[i]), text[order[i]])
+    print "---"
+    print ""
+    print "## High Priority Issues"
+    print ""
+    for (i = 1; i <= n; i++) if (tolower(sev[order[i]]) !~ /critical/) print_block(header(i, order[i]), text[order[i]])
+    print "---"
+    print ""
+    print "## Summary"
+    print ""
+    print "| ID | Issue | Severity | Location | Guide Rule | Status |"
+    print "| --- | ----- | -------- | -------- | ---------- | ------ |"
+    for (i = 1; i <= n; i++) summary_row(i, order[i])
+    print ""
+    print "---"
+    print ""
+    print "## Files Reviewed"
+    print ""
+    for (i = 1; i <= nfiles; i++) print files[i]
+    exit
+  }
+
+  # confirm: original IDs in input order, then carried-over and new issues.
+  n = 0
+  for (i = 1; i <= norig; i++) {
+    id = orig_order[i]
+    if (id in found) { ids[++n] = id; keys[n] = "found_" id }
+    else { ids[++n] = id; keys[n] = "orig_" id; carried = carried " " id }
+  }
+  for (i = 1; i <= nfound; i++) {
+    id = found_order[i]
+    if (!(id in orig)) { ids[++n] = id; keys[n] = "found_" id; if (id + 0 > max_id) max_id = id + 0 }
+  }
+  nbase = n
+  for (i = 1; i <= nnew; i++) { ids[++n] = ++max_id; keys[n] = "new_" i }
+
+  remaining = ""
+  for (i = 1; i <= n; i++) if (!resolved(status[keys[i]])) remaining = remaining (remaining == "" ? "" : ", ") ids[i]
+
+  print "# Spec Verification Report"
+  print ""
+  print "Verified by Codex on " date_str " (merged from " shard_count " parallel review shards)."
+  print ""
+  print "---"
+  print ""
+  print "## Summary"
+  print "| ID | Issue | Severity | Location | Guide Rule | Status | Notes |"
+  print "|----|-------|----------|----------|------------|--------|-------|"
+  for (i = 1; i <= n; i++) summary_row(ids[i], keys[i])
+  print ""
+  print "## Detailed Findings"
+  print ""
+  for (i = 1; i <= nbase; i++) print_block(header(ids[i], keys[i]), text[keys[i]])
+  if (carried != "") {
+    print "Note: issue(s)" carried " were not reported by any shard and are carried over unchanged."
+    print ""
+  }
+  print "## Feedback Review"
+  print ""
+  for (i = 1; i <= nfeedback; i++) print_block(feedback_head[i], feedback_body[i])
+  print "## New Issues (Regressions)"
+  print ""
+  for (i = nbase + 1; i <= n; i++) print_block(header(ids[i], keys[i]), text[keys[i]])
+  print "## Completion Status"
+  print ""
+  if (remaining == "") {
+    print "<promise>ALL_RESOLVED</promise>"
+  } else {
+    print "<promise>ISSUES_REMAINING</promise>"
+    print ""
+    print "Remaining issue IDs: " remaining
+  }
+}
+AWK_EOF
+
+  local inputs=("$@")
+  if [ "$mode" = "confirm" ]; then
+    inputs=("$input_file" "$@")
+  fi
+
+  awk -v mode="$mode" -v input_file="$input_file" -v date_str="$(date +%Y-%m-%d)" -v shard_count="$#" \
+    "$program" "${inputs[@]}" > "$output_file"
+}
+
+run_find_issues_sharded() {
+  local prompt="$1"
+  local output_file="$2"
+  local prefix="$LOGS_DIR/01-outer-${CURRENT_OUTER}"
+
+  local shards=()
+  local shard
+  while IFS= read -r shard; do
+    shards+=("$shard")
+  done < <(list_spec_shards)
+  shards+=("shared")
+
+  run_codex_shards find "$prompt" "$prefix" "${shards[@]}"
+
+  local reports=()
+  local report
+  local i
+  for ((i=1; i<=${#shards[@]}; i++)); do
+    report="$prefix-shard-$i-output.md"
+    if [ "$(check_control_signal "$prefix-shard-$i-raw.txt")" = "COMPLETE" ]; then
+      [ -e "$report" ] && warn "Output file created despite COMPLETE signal: $report"
+      continue
+    fi
+    [ -s "$report" ] || die "Output file not created by Codex: $report (see $prefix-shard-$i-raw.txt)"
+    reports+=("$report")
+  done
+  cache_commit
+
+  [ ${#reports[@]} -gt 0 ] || return 0
+
+  merge_issue_reports find "" "$output_file" "${reports[@]}"
+  if ! grep -qE '^### Issue ' "$output_file"; then
+    rm -f "$output_file"
+    return 0
+  fi
+  echo "$output_file" > "$prefix-output-path.txt"
+
+  return 1
+}
+
+run_confirm_fix_sharded() {
+  local prompt="$1"
+  local issues_file="$2"
+  local output_file="$3"
+  local prefix="$LOGS_DIR/03-inner-${INNER_COUNTER}"
+
+  local shards=()
+  local shard
+  while IFS= read -r shard; do
+    shards+=("$shard")
+  done < <(shards_for_issues "$issues_file")
+  [ ${#shards[@]} -gt 0 ] || shards=("shared")
+
+  run_codex_shards confirm "$prompt" "$prefix" "${shards[@]}"
+
+  local reports=()
+  local i
+  for ((i=1; i<=${#shards[@]}; i++)); do
+    [ -s "$prefix-shard-$i-output.md" ] || die "Output file not created by Codex: $prefix-shard-$i-output.md (see $prefix-shard-$i-raw.txt)"
+    reports+=("$prefix-shard-$i-output.md")
+  done
+
+  merge_issue_reports confirm "$issues_file" "$output_file" "${reports[@]}"
 }
 
 run_find_issues() {
   local prompt_file="$1"
+  phase_begin 01-find
   local output_file
   output_file="$(next_issue_file)"
 
@@ -226,6 +1030,18 @@ run_find_issues() {
   [ -n "$prompt" ] || die "Failed to load prompt from $prompt_file"
 
   prompt="$(normalize_prompt_paths "$prompt")"
+
+  if [ "$JOBS" -gt 1 ]; then
+    local status=0
+    run_find_issues_sharded "$prompt" "$output_file" || status=$?
+    if [ "$status" -eq 0 ]; then
+      phase_end result complete
+    else
+      phase_end result issues report_file "$output_file"
+    fi
+    return "$status"
+  fi
+
   prompt="$(replace_placeholder "$prompt" "{Output file}" "$output_file")"
 
   local log_prompt="$LOGS_DIR/01-outer-${CURRENT_OUTER}-prompt.txt"
@@ -241,17 +1057,22 @@ run_find_issues() {
     if [ -e "$output_file" ]; then
       warn "Output file created despite COMPLETE signal: $output_file"
     fi
+    cache_commit
+    phase_end result complete
     return 0
   fi
 
   [ -s "$output_file" ] || die "Output file not created by Codex: $output_file (see $log_raw)"
+  cache_commit
   echo "$output_file" > "$log_out_path"
 
+  phase_end result issues report_file "$output_file"
   return 1
 }
 
 run_fix_issues() {
   local prompt_file="$1"
+  phase_begin 02-fix
   local issues_file
   issues_file="$(latest_issue_file)"
   [ -n "$issues_file" ] || die "No issues file found"
@@ -277,10 +1098,14 @@ run_fix_issues() {
   run_claude "$prompt" "$log_raw"
 
   [ -s "$summary_file" ] || die "Summary file not created: $summary_file"
+  cache_commit
+  phase_end summary_file "$summary_file" feedback_file "$feedback_file"
 }
 
+# Runs in a command substitution, so it records its own phase event.
 run_confirm_fix() {
   local prompt_file="$1"
+  phase_begin 03-confirm
   local issues_file
   issues_file="$(latest_issue_file)"
   [ -n "$issues_file" ] || die "No issues file found"
@@ -297,14 +1122,20 @@ run_confirm_fix() {
   prompt="$(normalize_prompt_paths "$prompt")"
   prompt="$(replace_placeholder "$prompt" "{Issues file}" "$issues_file")"
   prompt="$(replace_placeholder "$prompt" "{Feedback file}" "$feedback_file")"
-  prompt="$(replace_placeholder "$prompt" "{Output file}" "$output_file")"
 
   local log_prompt="$LOGS_DIR/03-inner-${INNER_COUNTER}-prompt.txt"
   local log_raw="$LOGS_DIR/03-inner-${INNER_COUNTER}-raw.txt"
   local log_out_path="$LOGS_DIR/03-inner-${INNER_COUNTER}-output-path.txt"
 
-  printf "%s" "$prompt" > "$log_prompt"
-  run_codex "$prompt" "$log_raw"
+  if [ "$JOBS" -gt 1 ]; then
+    run_confirm_fix_sharded "$prompt" "$issues_file" "$output_file"
+    # Shards keep one raw log each; point error messages at them.
+    log_raw="$LOGS_DIR/03-inner-${INNER_COUNTER}-shard-*-raw.txt"
+  else
+    prompt="$(replace_placeholder "$prompt" "{Output file}" "$output_file")"
+    printf "%s" "$prompt" > "$log_prompt"
+    run_codex "$prompt" "$log_raw"
+  fi
 
   [ -s "$output_file" ] || die "Output file not created by Codex: $output_file (see $log_raw)"
   echo "$output_file" > "$log_out_path"
@@ -318,6 +1149,8 @@ run_confirm_fix() {
   if [ -z "$signal" ]; then
     die "Missing promise tag in confirmation output: $log_raw"
   fi
+  cache_commit
+  phase_end result "$signal" report_file "$output_file"
   echo "$signal"
 }
 
@@ -326,10 +1159,33 @@ run_reraise_detection() {
   local curr_report="$2"
   local prev_feedback="$3"
   local output_file="$4"
+  phase_begin reraise-detect
 
   [ -n "$prev_report" ] || die "Missing previous report for re-raise detection"
   [ -n "$curr_report" ] || die "Missing current report for re-raise detection"
 
+  # The issue index settles exact and near-duplicate re-raises (and clear
+  # non-matches) itself; the LLM only sees the ambiguous candidates.
+  local candidates_file=""
+  if [ -n "$ISSUE_INDEX" ]; then
+    local index_status=0
+    candidates_file="$LOGS_DIR/reraise-candidates-inner-$INNER_COUNTER.md"
+    run_issue_index reraise --curr "$curr_report" --feedback "$prev_feedback" \
+      --output "$output_file" --candidates "$candidates_file" || index_status=$?
+    case "$index_status" in
+      0)
+        phase_end method index reraise_file "$output_file"
+        return
+        ;;
+      3)
+        ;;
+      *)
+        warn "Issue index failed (exit $index_status); using the LLM for re-raise detection"
+        candidates_file=""
+        ;;
+    esac
+  fi
+
   local prompt
   prompt=$(cat <<'PROMPT_EOF'
 You are analyzing two consecutive issue reports from a spec review loop to detect **re-raised issues**.
@@ -392,7 +1248,18 @@ PROMPT_EOF
   prompt="${prompt//\{prev_feedback\}/$prev_feedback}"
   prompt="${prompt//\{output_file\}/$output_file}"
 
-  claude --permission-mode acceptEdits --print "$prompt" > "$LOGS_DIR/reraise-detection-inner-$INNER_COUNTER.txt" 2>&1
+  if [ -n "$candidates_file" ]; then
+    prompt+=$'\n\n## Pre-screened Candidates\n\n'"A similarity index already paired declined issues with issues in the current report: $candidates_file. Treat its Confirmed pairs as re-raises and decide the Ambiguous pairs; other issues did not match any declined item."
+  fi
+
+  run_claude_print "$prompt" "$LOGS_DIR/reraise-detection-inner-$INNER_COUNTER.txt"
+  # The prompt always writes the report; a missing one is not a cacheable answer.
+  if [ -s "$output_file" ]; then
+    cache_commit
+  else
+    cache_discard
+  fi
+  phase_end method "${candidates_file:+index+}llm" reraise_file "$output_file"
 }
 
 handle_valid_reraise() {
@@ -403,7 +1270,10 @@ handle_valid_reraise() {
   echo "You chose: Re-raise is VALID"
   echo ""
   echo "Please provide your reasoning (why Claude Code should fix this):"
+  phase_begin human-reasoning
   read -p "Reasoning: " human_reasoning
+  phase_end
+  phase_begin human-override-valid
 
   local prompt
   prompt=$(cat <<'PROMPT_EOF'
@@ -440,7 +1310,9 @@ PROMPT_EOF
 
   echo ""
   echo "Creating new issue report with Human Override..."
-  claude --permission-mode acceptEdits --print "$prompt" > "$LOGS_DIR/human-override-valid-inner-$INNER_COUNTER.txt" 2>&1
+  run_claude_print "$prompt" "$LOGS_DIR/human-override-valid-inner-$INNER_COUNTER.txt"
+  cache_commit
+  phase_end report_file "$(latest_issue_file)"
 
   echo "Done. New issue report created."
 }
@@ -455,8 +1327,11 @@ handle_invalid_reraise() {
     echo "You chose: Re-raise is INVALID"
     echo ""
     echo "Please provide your reasoning (why Claude Code was right to decline):"
+    phase_begin human-reasoning
     read -p "Reasoning: " human_reasoning
+    phase_end
   fi
+  phase_begin human-override-invalid
 
   local prompt
   prompt=$(cat <<'PROMPT_EOF'
@@ -500,7 +1375,9 @@ PROMPT_EOF
 
   echo ""
   echo "Creating new issue report with Declined-Accepted status..."
-  claude --permission-mode acceptEdits --print "$prompt" > "$LOGS_DIR/human-override-invalid-inner-$INNER_COUNTER.txt" 2>&1
+  run_claude_print "$prompt" "$LOGS_DIR/human-override-invalid-inner-$INNER_COUNTER.txt"
+  cache_commit
+  phase_end report_file "$(latest_issue_file)"
 
   echo "Done. New issue report created."
 }
@@ -509,6 +1386,7 @@ append_to_decline_log() {
   local reraise_file="$1"
   local human_reasoning="$2"
   local log_file="$SPECS_DIR/issues/human-approved-declines.md"
+  phase_begin decline-log
 
   if [ ! -f "$log_file" ]; then
     cat > "$log_file" <<'HEADER'
@@ -551,7 +1429,10 @@ PROMPT_EOF
   prompt="${prompt//\{log_file\}/$log_file}"
   prompt="${prompt//\{human_reasoning\}/$human_reasoning}"
 
+  agent_begin
   claude --permission-mode acceptEdits --print "$prompt" >> "$LOGS_DIR/append-decline-log-$INNER_COUNTER.txt" 2>&1
+  agent_end claude-print "$prompt" "$LOGS_DIR/append-decline-log-$INNER_COUNTER.txt"
+  phase_end log_file "$log_file"
 }
 
 handle_manual_edit() {
@@ -572,11 +1453,14 @@ handle_manual_edit() {
   echo "To force loop exit:"
   echo "  Add: <promise>ALL_RESOLVED</promise>"
   echo ""
+  phase_begin human-edit
   read -p "Press Enter when done editing..."
+  phase_end
 }
 
 handle_reraise_escalation() {
   local reraise_file="$1"
+  phase_begin human-review
   local latest_report="$(latest_issue_file)"
 
   echo ""
@@ -608,6 +1492,7 @@ handle_reraise_escalation() {
   echo "  [M] Mixed - I'll handle some of each (manual edit)"
   echo ""
   read -p "Decision [V/I/M]: " decision
+  phase_end decision "$decision"
 
   case "$decision" in
     [Vv])
@@ -616,7 +1501,9 @@ handle_reraise_escalation() {
     [Ii])
       echo ""
       echo "Please provide your reasoning (why Claude Code was right to decline):"
+      phase_begin human-reasoning
       read -p "Reasoning: " human_reasoning
+      phase_end
       handle_invalid_reraise "$reraise_file" "$latest_report" "$human_reasoning"
       append_to_decline_log "$reraise_file" "$human_reasoning"
       ;;
@@ -636,6 +1523,9 @@ on_interrupt() {
   [ -n "$CURRENT_OUTER" ] && echo "Outer iteration: $CURRENT_OUTER"
   [ -n "$CURRENT_INNER" ] && echo "Inner iteration: $CURRENT_INNER"
   [ -n "$LOGS_DIR" ] && echo "Logs directory: $LOGS_DIR"
+  local running
+  running="$(jobs -p)"
+  [ -n "$running" ] && kill $running 2>/dev/null
   exit 130
 }
 
@@ -651,6 +1541,30 @@ while [ $# -gt 0 ]; do
       INNER_MAX="$2"
       shift 2
       ;;
+    --jobs)
+      JOBS="$2"
+      shift 2
+      ;;
+    --cache|--resume)
+      CACHE_ENABLED=1
+      shift
+      ;;
+    --cache-dir)
+      CACHE_DIR="$2"
+      shift 2
+      ;;
+    --cache-max-mb)
+      CACHE_MAX_MB="$2"
+      shift 2
+      ;;
+    --no-index)
+      ISSUE_INDEX_ENABLED=0
+      shift
+      ;;
+    --index-db)
+      ISSUE_INDEX_DB="$2"
+      shift 2
+      ;;
     --specs-dir)
       SPECS_DIR="$2"
       shift 2
@@ -677,9 +1591,13 @@ while [ $# -gt 0 ]; do
 done
 
 resolve_root
+resolve_stream_events
+resolve_issue_index
 
 validate_positive_int "$OUTER_MAX" "--outer"
 validate_positive_int "$INNER_MAX" "--inner"
+validate_positive_int "$JOBS" "--jobs"
+validate_positive_int "$CACHE_MAX_MB" "--cache-max-mb"
 
 SPECS_DIR="$(normalize_path "$SPECS_DIR")"
 GUIDE_PATH="$(normalize_path "$GUIDE_PATH")"
@@ -691,6 +1609,18 @@ else
   LOGS_DIR="$(normalize_path "$LOGS_DIR")"
 fi
 
+if [ -z "$ISSUE_INDEX_DB" ]; then
+  ISSUE_INDEX_DB="$PROJECT_ROOT/logs/spec-review-index.sqlite"
+else
+  ISSUE_INDEX_DB="$(normalize_path "$ISSUE_INDEX_DB")"
+fi
+
+if [ -z "$CACHE_DIR" ]; then
+  CACHE_DIR="$PROJECT_ROOT/logs/spec-review-cache"
+else
+  CACHE_DIR="$(normalize_path "$CACHE_DIR")"
+fi
+
 ensure_cmd codex
 ensure_cmd claude
 ensure_cmd jq
@@ -700,6 +1630,17 @@ ensure_cmd jq
 [ -d "$PROMPT_DIR" ] || die "Prompt directory not found: $PROMPT_DIR"
 
 mkdir -p "$LOGS_DIR"
+TIMINGS_FILE="$LOGS_DIR/timings.jsonl"
+clock_us RUN_START_US
+trap 'run_end $?' EXIT
+timing_event run_start jobs "$JOBS" cache "$CACHE_ENABLED" index "${ISSUE_INDEX:+1}" \
+  outer_max "$OUTER_MAX" inner_max "$INNER_MAX" bash "$BASH_VERSION"
+if [ "$CACHE_ENABLED" -eq 1 ]; then
+  mkdir -p "$CACHE_DIR"
+  CACHE_PENDING="$CACHE_DIR/.pending-$$"
+  : > "$CACHE_PENDING"
+  cache_evict
+fi
 mkdir -p "$(issues_dir)"
 
 FIND_PROMPT_FILE="$PROMPT_DIR/01-find-issues.md"
@@ -712,6 +1653,7 @@ CONFIRM_PROMPT_FILE="$PROMPT_DIR/03-confirm-fix.md"
 
 for ((outer=1; outer<=OUTER_MAX; outer++)); do
   CURRENT_OUTER="$outer"
+  CURRENT_INNER=""
   echo "=== Outer iteration $outer/$OUTER_MAX ==="
 
   if run_find_issues "$FIND_PROMPT_FILE"; then
@@ -723,12 +1665,14 @@ for ((outer=1; outer<=OUTER_MAX; outer++)); do
   for ((inner=1; inner<=INNER_MAX; inner++)); do
     CURRENT_INNER="$inner"
     INNER_COUNTER=$((INNER_COUNTER + 1))
+    clock_us ITERATION_START_US
     echo "--- Inner iteration $inner/$INNER_MAX ---"
 
     run_fix_issues "$FIX_PROMPT_FILE"
     signal="$(run_confirm_fix "$CONFIRM_PROMPT_FILE")"
 
     if [ "$signal" = "ALL_RESOLVED" ]; then
+      iteration_end "$signal"
       break
     fi
 
@@ -746,11 +1690,13 @@ for ((outer=1; outer<=OUTER_MAX; outer++)); do
           # If human override produced a fully resolved report, exit inner loop early.
           signal="$(check_control_signal "$(latest_issue_file)")"
           if [ "$signal" = "ALL_RESOLVED" ]; then
+            iteration_end "$signal"
             break
           fi
         fi
       fi
     fi
+    iteration_end "$signal"
   done
 
   if [ "$inner" -ge "$INNER_MAX" ] && [ "$signal" != "ALL_RESOLVED" ]; then
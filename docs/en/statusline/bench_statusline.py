@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Render-time benchmark: statusline.sh vs the basic script in context_window_track.md.
+
+Runs each script as Claude Code does (a fresh process, payload on stdin) and
+reports p50/p99 wall time per render:
+
+    python3 bench_statusline.py --renders 300
+
+The basic script is taken from the first ```bash block of
+context_window_track.md unless --baseline points at another file. Payloads
+grow the context between renders so the engine's trend and burn-rate paths
+are exercised.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ENGINE = os.path.join(HERE, "statusline.sh")
+GUIDE = os.path.join(HERE, "context_window_track.md")
+
+
+def extract_baseline(workdir):
+    with open(GUIDE) as handle:
+        match = re.search(r"```bash\n(.*?)```", handle.read(), re.S)
+    path = os.path.join(workdir, "statusline-basic.sh")
+    with open(path, "w") as handle:
+        handle.write(match.group(1))
+    return path
+
+
+def payload(render):
+    context = 20000 + render * 150
+    return json.dumps({
+        "session_id": "bench-session",
+        "model": {"display_name": "Opus"},
+        "cost": {"total_duration_ms": 60000 + render * 2000},
+        "context_window": {
+            "context_window_size": 200000,
+            "total_input_tokens": 500000 + render * 9000,
+            "total_output_tokens": 20000 + render * 400,
+            "current_usage": {
+                "input_tokens": 200,
+                "output_tokens": 400,
+                "cache_creation_input_tokens": 1500,
+                "cache_read_input_tokens": context,
+            },
+        },
+    }).encode()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def bench(script, renders, env):
+    timings = []
+    output = b""
+    for render in range(renders):
+        data = payload(render)
+        started = time.perf_counter()
+        output = subprocess.run(["bash", script], input=data, env=env, stdout=subprocess.PIPE, check=True).stdout
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, output.decode().strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=200)
+    parser.add_argument("--baseline", help="script to compare against (default: the one in the guide)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="statusline-bench-")
+    env = dict(os.environ, STATUSLINE_CACHE_DIR=os.path.join(workdir, "cache"))
+    scripts = [("basic", args.baseline or extract_baseline(workdir)), ("engine", ENGINE)]
+
+    results = {}
+    for name, script in scripts:
+        bench(script, 5, env)  # warm the page cache
+        results[name] = bench(script, args.renders, env)
+
+    print("%-7s %9s %9s %9s" % ("script", "p50 ms", "p99 ms", "max ms"))
+    for name, _ in scripts:
+        timings, _ = results[name]
+        print("%-7s %9.2f %9.2f %9.2f" % (name, percentile(timings, 50), percentile(timings, 99), max(timings)))
+    basic, engine = percentile(results["basic"][0], 50), percentile(results["engine"][0], 50)
+    print("p50 speedup: %.1fx" % (basic / engine))
+    for name, _ in scripts:
+        print("%-7s last render: %s" % (name, results[name][1]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
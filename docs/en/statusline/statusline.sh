@@ -0,0 +1,70 @@
+#!/bin/bash
+# Low-latency Claude Code statusline.
+#
+# One jq process per render parses the payload once and computes every field:
+# context %, cumulative input/output tokens, cache-hit ratio, burn rate and the
+# context trend since the previous render. Everything else uses bash builtins
+# (no cat/awk/sed/date forks).
+#
+# Per-session cache: $STATUSLINE_CACHE_DIR/<pid of Claude Code> holds one line
+#   <session_id> <first_seen_epoch> <first_total_tokens> <last_context_tokens>
+# Set STATUSLINE_CACHE=0 to disable it (no trend, burn rate from cost.total_duration_ms only).
+
+CACHE_DIR="${STATUSLINE_CACHE_DIR:-${TMPDIR:-/tmp}/claude-statusline}"
+CACHE_FILE="$CACHE_DIR/$PPID"
+
+prev=""
+if [ "${STATUSLINE_CACHE:-1}" != "0" ] && [ -f "$CACHE_FILE" ]; then
+  read -r prev < "$CACHE_FILE"
+fi
+
+# jq prints two lines: the statusline and the new cache record.
+program='
+def fmt($v; $unit):
+  (($v * 10 + 0.5) | floor / 10) as $r
+  | (if $r == ($r | floor) then ($r | floor | tostring) else ($r | tostring) end) + $unit;
+def k:
+  if . >= 1000000 then fmt(. / 1000000; "M")
+  elif . >= 1000 then fmt(. / 1000; "K")
+  else tostring end;
+
+(.session_id // "") as $session
+| (.model.display_name // "?") as $model
+| (.context_window // {}) as $cw
+| ($cw.context_window_size // 0) as $size
+| ($cw.current_usage) as $usage
+| (($cw.total_input_tokens // 0) + ($cw.total_output_tokens // 0)) as $total
+| ($prev | split(" ")) as $p
+| (if ($p | length) == 4 and $p[0] == $session
+   then {start: ($p[1] | tonumber), start_total: ($p[2] | tonumber), last_ctx: ($p[3] | tonumber)}
+   else {start: now, start_total: $total, last_ctx: null} end) as $c
+| (if $usage == null then 0
+   else ($usage.input_tokens // 0) + ($usage.cache_creation_input_tokens // 0) + ($usage.cache_read_input_tokens // 0)
+   end) as $ctx
+| (if $usage == null or $size == 0 then "Context: 0%"
+   else "Context: \(($ctx * 100 / $size) | floor)% \($ctx | k)/\($size | k)"
+     + (if $c.last_ctx == null or $c.last_ctx == $ctx then ""
+        elif $ctx > $c.last_ctx then " ↑" else " ↓" end)
+   end) as $context
+| (if $usage == null or $ctx == 0 then ""
+   else " | Cache \((($usage.cache_read_input_tokens // 0) * 100 / $ctx) | floor)%" end) as $cache
+| ((.cost.total_duration_ms // 0) / 60000) as $session_min
+| (if $session_min > 0 then $total / $session_min
+   elif (now - $c.start) >= 60 then ($total - $c.start_total) / ((now - $c.start) / 60)
+   else null end) as $burn
+| "[\($model)] \($context) | In \(($cw.total_input_tokens // 0) | k) Out \(($cw.total_output_tokens // 0) | k)\($cache)"
+  + (if $burn == null then "" else " | \($burn | floor | k) tok/min" end),
+  "\($session) \($c.start | floor) \($c.start_total) \($ctx)"
+'
+
+{
+  IFS= read -r line
+  IFS= read -r record
+} < <(jq -r --arg prev "$prev" "$program")
+
+printf '%s\n' "$line"
+
+if [ "${STATUSLINE_CACHE:-1}" != "0" ] && [ -n "$record" ]; then
+  [ -d "$CACHE_DIR" ] || mkdir -p "$CACHE_DIR"
+  printf '%s\n' "$record" > "$CACHE_FILE"
+fi